@@ -0,0 +1,111 @@
+# Dir_expander.py
+import threading
+import time
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from .Dir_walker import DirWalk
+
+_CHUNK_SIZE = 1000      # 每积累这么多文件回传一次
+_CHUNK_INTERVAL = 0.1   # 或者距上次回传超过这么多秒
+
+
+class _ExpandSignals(QObject):
+    chunk = Signal(int, list) # job_id, files
+    progress = Signal(int, int, object) # job_id, files, bytes (object: totals can exceed a 32-bit int)
+    done = Signal(int, bool) # job_id, truncated
+
+
+class _ExpandTask(QRunnable):
+    def __init__(self, job_id: int, walk: DirWalk, signals: _ExpandSignals):
+        super().__init__()
+        self._job_id = job_id
+        self._walk = walk
+        self._signals = signals
+
+    def run(self):
+        chunk = []
+        last_emit = time.monotonic()
+        for path, _size in self._walk:
+            chunk.append(path)
+            now = time.monotonic()
+            if len(chunk) >= _CHUNK_SIZE or now - last_emit >= _CHUNK_INTERVAL:
+                self._signals.chunk.emit(self._job_id, chunk)
+                self._signals.progress.emit(self._job_id, self._walk.files, self._walk.bytes)
+                chunk = []
+                last_emit = now
+        if chunk:
+            self._signals.chunk.emit(self._job_id, chunk)
+        self._signals.progress.emit(self._job_id, self._walk.files, self._walk.bytes)
+        self._signals.done.emit(self._job_id, self._walk.truncated)
+
+
+class DirExpander(QObject):
+    """
+    在后台线程中把目录递归展开为文件列表，分块通过 `files_expanded` 回传。
+    每个目录是一个独立任务（各自计算深度/数量/字节限制），任务按提交顺序依次执行；
+    cancel() 可以只取消指定目录的任务，其余目录照常展开。每个任务恰好发出一次 `finished`，被取消的任务也不例外。
+    """
+    files_expanded = Signal(list) # 一块展开得到的文件
+    progress = Signal(int, object) # 当前任务已展开的文件数、字节数（字节数可能超过 32 位整数，用 object 传递）
+    finished = Signal(bool) # 一个任务结束；True 表示因限制或取消而被截断
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1) # 顺序执行，避免多个大目录同时抢占磁盘
+        self._signals = _ExpandSignals(self)
+        self._signals.chunk.connect(self._on_chunk)
+        self._signals.progress.connect(self._on_progress)
+        self._signals.done.connect(self._on_done)
+        self._jobs = {} # 未完成的任务：job_id -> (目录, cancel_event)；被取消的任务移出后，其在途结果被丢弃
+        self._next_job_id = 0
+        self.max_depth = None
+        self.max_items = 100_000
+        self.max_bytes = None
+        self.path_filter = None
+
+    def set_limits(self, max_depth=None, max_items=100_000, max_bytes=None):
+        """设置之后提交的任务使用的限制，None 表示不限"""
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+
+    def set_path_filter(self, path_filter):
+        """设置之后提交的任务使用的 PathFilter（None 表示不过滤）"""
+        self.path_filter = path_filter
+
+    def expand(self, dirs: list):
+        """为每个目录提交一个展开任务"""
+        for d in dirs:
+            self._next_job_id += 1
+            cancel_event = threading.Event()
+            self._jobs[self._next_job_id] = (d, cancel_event)
+            walk = DirWalk([d], self.max_depth, self.max_items, self.max_bytes, cancel_event, self.path_filter)
+            self._pool.start(_ExpandTask(self._next_job_id, walk, self._signals))
+
+    def cancel(self, dirs=None):
+        """
+        取消 dirs 中目录的未完成任务（None 表示全部）：正在执行的尽快停止，排队中的直接结束。
+        每个被取消的任务随即发出 finished(True)。
+        """
+        dirs = None if dirs is None else set(dirs)
+        cancelled = [job_id for job_id, (d, _) in self._jobs.items() if dirs is None or d in dirs]
+        for job_id in cancelled:
+            _, cancel_event = self._jobs.pop(job_id)
+            cancel_event.set()
+        for _ in cancelled:
+            self.finished.emit(True)
+
+    def is_running(self) -> bool:
+        return bool(self._jobs)
+
+    def _on_chunk(self, job_id: int, files: list):
+        if job_id in self._jobs:
+            self.files_expanded.emit(files)
+
+    def _on_progress(self, job_id: int, files: int, size: int):
+        if job_id in self._jobs:
+            self.progress.emit(files, size)
+
+    def _on_done(self, job_id: int, truncated: bool):
+        if self._jobs.pop(job_id, None) is not None:
+            self.finished.emit(truncated)
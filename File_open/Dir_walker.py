@@ -0,0 +1,65 @@
+# Dir_walker.py
+import os
+import threading
+
+
+class DirWalk:
+    """
+    基于 os.scandir 的迭代式目录遍历，逐个产出 (文件路径, 字节数)。
+    不依赖 Qt，不递归调用（深目录不会爆栈），不跟随目录符号链接（避免循环）。
+
+    max_depth: 向下进入子目录的最大层数，0 表示只列出根目录下的文件，None 表示不限
+    max_items: 最多产出的文件数，None 表示不限
+    max_bytes: 产出文件的累计字节数上限，None 表示不限
+    path_filter: 可选的 PathFilter，不满足条件的文件不产出、也不计入限制
+    遍历结束后可通过 truncated / files / bytes 查看是否因限制或取消而提前结束以及统计信息。
+    """
+
+    def __init__(self, roots, max_depth=None, max_items=None, max_bytes=None, cancel_event: threading.Event = None,
+                 path_filter=None):
+        self._roots = list(roots)
+        self._path_filter = path_filter
+        self._max_depth = max_depth
+        self._max_items = max_items
+        self._max_bytes = max_bytes
+        self._cancel_event = cancel_event or threading.Event()
+        self.truncated = False # 因达到限制或被取消而提前结束
+        self.files = 0
+        self.bytes = 0
+
+    def __iter__(self):
+        stack = [(root, 0) for root in reversed(self._roots)]
+        while stack:
+            directory, depth = stack.pop()
+            subdirs = []
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if self._cancel_event.is_set():
+                            self.truncated = True
+                            return
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self._max_depth is None or depth < self._max_depth:
+                                    subdirs.append(entry.path)
+                                continue
+                            if not entry.is_file():
+                                continue # 断开的链接、设备文件等
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        if self._path_filter is not None and not self._path_filter.matches(entry.path, False, st):
+                            continue
+                        size = st.st_size
+                        if self._max_items is not None and self.files >= self._max_items:
+                            self.truncated = True
+                            return
+                        if self._max_bytes is not None and self.bytes + size > self._max_bytes:
+                            self.truncated = True
+                            return
+                        self.files += 1
+                        self.bytes += size
+                        yield entry.path, size
+            except OSError:
+                continue # 无权限或已被删除的目录直接跳过
+            stack.extend((d, depth + 1) for d in reversed(sorted(subdirs)))
@@ -0,0 +1,246 @@
+# Drop_classifier.py
+import threading
+from collections import deque
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from .Selection_core import FILE, DIR, MISSING, iter_classified, plan_groups, revalidate_paths
+
+_BATCH_SIZE = 512        # 工作线程每积累这么多结果就回传一次，便于界面逐步显示
+
+
+class _ClassifySignals(QObject):
+    """工作线程回传结果用的信号载体（QRunnable 本身不能发信号）"""
+    batch = Signal(int, list, list, list, int) # job_id, files, dirs, missing, 被过滤掉的数量
+    done = Signal(int) # job_id
+
+
+class _ClassifyTask(QRunnable):
+    def __init__(self, job_id: int, groups: list, cancel_event: threading.Event, signals: _ClassifySignals, path_filter=None,
+                 resolver=None):
+        super().__init__()
+        self._job_id = job_id
+        self._path_filter = path_filter
+        self._resolver = resolver
+        self._groups = groups # [(parent, [paths...]), ...]
+        self._cancel_event = cancel_event
+        self._signals = signals
+
+    def run(self):
+        files, dirs, missing, skipped = [], [], [], 0
+        for path, kind in iter_classified(self._groups, self._cancel_event, self._path_filter, self._resolver):
+            if kind == FILE:
+                files.append(path)
+            elif kind == DIR:
+                dirs.append(path)
+            elif kind == MISSING:
+                missing.append(path)
+            else:
+                skipped += 1
+            if len(files) + len(dirs) + len(missing) + skipped >= _BATCH_SIZE:
+                self._signals.batch.emit(self._job_id, files, dirs, missing, skipped)
+                files, dirs, missing, skipped = [], [], [], 0
+        if not self._cancel_event.is_set() and (files or dirs or missing or skipped):
+            self._signals.batch.emit(self._job_id, files, dirs, missing, skipped)
+        self._signals.done.emit(self._job_id)
+
+
+class DropClassifier(QObject):
+    """
+    在后台线程池中把拖入的路径识别为文件/目录/不存在。
+    结果通过 `batch_ready` 分批回到 GUI 线程，全部完成后发出 `finished`。
+    给定 PathFilter 时，过滤在工作线程中完成，不满足条件的路径不会回传；
+    给定 PathResolver 时，回传的路径的规范键也在工作线程中预先解析好。
+    新任务开始或调用 cancel() 时，旧任务的剩余结果会被丢弃。
+    """
+    batch_ready = Signal(list, list, list) # files, dirs, missing
+    finished = Signal()
+
+    def __init__(self, parent=None, max_threads: int = 4):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._signals = _ClassifySignals(self)
+        self._signals.batch.connect(self._on_batch)
+        self._signals.done.connect(self._on_task_done)
+        self._job_id = 0
+        self._pending_tasks = 0
+        self._cancel_event = threading.Event()
+        self._total = 0
+        self._processed = 0
+
+    def start(self, paths: list, path_filter=None, resolver=None):
+        """取消正在进行的任务，并开始识别新的一批路径（可选 PathFilter 过滤、PathResolver 预解析）"""
+        self.cancel()
+        self._job_id += 1
+        self._cancel_event = threading.Event()
+        self._total = len(paths)
+        self._processed = 0
+
+        tasks = plan_groups(paths) # 识别逻辑本身在不依赖 Qt 的 Selection_core 中
+        self._pending_tasks = len(tasks)
+        if not tasks:
+            self.finished.emit()
+            return
+        for groups_of_task in tasks:
+            self._pool.start(_ClassifyTask(self._job_id, groups_of_task, self._cancel_event, self._signals, path_filter,
+                                             resolver))
+
+    def cancel(self):
+        """取消当前任务；已回传的结果保留，未回传的结果被丢弃"""
+        if self._pending_tasks:
+            self._cancel_event.set()
+            self._job_id += 1 # 让仍在途中的旧结果失效
+            self._pending_tasks = 0
+
+    def is_running(self) -> bool:
+        return self._pending_tasks > 0
+
+    def progress(self) -> tuple[int, int]:
+        """返回 (已处理数量, 总数量)"""
+        return self._processed, self._total
+
+    def _on_batch(self, job_id: int, files: list, dirs: list, missing: list, skipped: int):
+        if job_id != self._job_id:
+            return
+        self._processed += len(files) + len(dirs) + len(missing) + skipped
+        self.batch_ready.emit(files, dirs, missing)
+
+    def _on_task_done(self, job_id: int):
+        if job_id != self._job_id or not self._pending_tasks:
+            return
+        self._pending_tasks -= 1
+        if not self._pending_tasks:
+            self.finished.emit()
+
+
+class _RevalidateSignals(QObject):
+    done = Signal(int, list, list, list) # job_id, files, dirs, missing
+
+
+class _RevalidateTask(QRunnable):
+    def __init__(self, job_id: int, paths: list, timeout: float, signals: _RevalidateSignals):
+        super().__init__()
+        self._job_id = job_id
+        self._paths = paths
+        self._timeout = timeout
+        self._signals = signals
+
+    def run(self):
+        files, dirs, missing, _ = revalidate_paths(self._paths, timeout=self._timeout, total_timeout=None) # 在后台运行，不限总时长
+        self._signals.done.emit(self._job_id, files, dirs, missing)
+
+
+class SelectionRevalidator(QObject):
+    """
+    在后台核对一批已在选择中的路径（例如从会话文件恢复的选择）是否仍然存在、类型是否变化。
+    结果通过 `finished(files, dirs, missing)` 回到 GUI 线程，超时未能核对的路径不出现在任何列表中；
+    新任务开始或调用 cancel() 时，旧任务的结果被丢弃。
+    """
+    finished = Signal(list, list, list) # files, dirs, missing
+
+    def __init__(self, parent=None, timeout: float = 2.0):
+        super().__init__(parent)
+        self._timeout = timeout
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1) # revalidate_paths 自己开并行的守护线程
+        self._signals = _RevalidateSignals(self)
+        self._signals.done.connect(self._on_done)
+        self._job_id = 0
+        self._running = False
+
+    def start(self, paths: list):
+        self._job_id += 1
+        self._running = True
+        self._pool.start(_RevalidateTask(self._job_id, paths, self._timeout, self._signals))
+
+    def cancel(self):
+        if self._running:
+            self._job_id += 1
+            self._running = False
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def _on_done(self, job_id: int, files: list, dirs: list, missing: list):
+        if job_id != self._job_id:
+            return
+        self._running = False
+        self.finished.emit(files, dirs, missing)
+
+
+class _PrefetchSignals(QObject):
+    done = Signal(int) # job_id
+
+
+class _PrefetchTask(QRunnable):
+    def __init__(self, job_id: int, paths: list, resolver, signals: _PrefetchSignals):
+        super().__init__()
+        self._job_id = job_id
+        self._paths = paths
+        self._resolver = resolver
+        self._signals = signals
+
+    def run(self):
+        canonical = self._resolver.canonical
+        for path in self._paths:
+            canonical(path) # 只为写入缓存，结果在 GUI 线程中再取
+        self._signals.done.emit(self._job_id)
+
+
+class KeyPrefetcher(QObject):
+    """
+    在后台线程中预先解析一批路径的规范键（写入 PathResolver 的缓存），解析完成后在 GUI 线程执行对应的操作，
+    操作中再取这些路径的规范键就只是查缓存，十万条目的选择开启规范路径去重也不会卡住界面。
+    操作严格按提交顺序执行：前面的操作还在等待解析时，后提交的操作（即使不需要解析）也排在它之后。
+    flush() 立即按顺序执行所有排队的操作（尚未解析的键在当前线程解析），discard() 丢弃它们。
+    """
+
+    def __init__(self, resolver, parent=None):
+        super().__init__(parent)
+        self._resolver = resolver
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1) # 按提交顺序解析，排在前面的操作先就绪
+        self._signals = _PrefetchSignals(self)
+        self._signals.done.connect(self._on_done)
+        self._job_id = 0
+        self._queue = deque() # [job_id, 操作, 是否已解析]
+        self._draining = False
+
+    def submit(self, paths, apply):
+        """在 paths 的规范键解析完成、且之前提交的操作都执行之后，在 GUI 线程调用 apply()"""
+        self._job_id += 1
+        paths = list(paths)
+        self._queue.append([self._job_id, apply, not paths])
+        if paths:
+            self._pool.start(_PrefetchTask(self._job_id, paths, self._resolver, self._signals))
+        else:
+            self._drain()
+
+    def flush(self):
+        self._pool.clear() # 尚未开始的解析不必再做，由操作自己在当前线程完成
+        for entry in self._queue:
+            entry[2] = True
+        self._drain()
+
+    def discard(self):
+        self._pool.clear()
+        self._queue.clear()
+
+    def is_pending(self) -> bool:
+        return bool(self._queue)
+
+    def _on_done(self, job_id: int):
+        for entry in self._queue:
+            if entry[0] == job_id:
+                entry[2] = True
+                break
+        self._drain()
+
+    def _drain(self):
+        if self._draining:
+            return # 操作中又提交了新操作：由外层循环在当前操作结束后接着执行
+        self._draining = True
+        try:
+            while self._queue and self._queue[0][2]:
+                self._queue.popleft()[1]()
+        finally:
+            self._draining = False
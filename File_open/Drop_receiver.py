@@ -1,34 +1,74 @@
 # Drop_receiver.py
+import logging
 import sys
+from itertools import islice
 from pathlib import Path
-from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QScrollArea, QPushButton, QSizePolicy, QMainWindow
-from PySide6.QtCore import Qt, Signal, QEvent
-from PySide6.QtGui import QMouseEvent
-from enum import Enum
-
-class DropMode(Enum):
-    """定义拖放接收模式"""
-    ONE_SHOT = 1    # 一次性模式：每次拖放都清除旧的，只显示新的
-    ACCUMULATE = 2  # 积累模式：每次拖放都添加到现有列表中
+from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QScrollArea, QPushButton, QSizePolicy, QMainWindow, QListView, QStackedWidget, QAbstractItemView
+from PySide6.QtCore import Qt, Signal, QEvent, QTimer
+from PySide6.QtGui import QMouseEvent, QKeySequence, QShortcut
+from .Drop_classifier import DropClassifier, SelectionRevalidator, KeyPrefetcher
+from .Path_resolver import shared_path_resolver
+from .Selection_core import DropMode
+from .Selection_store import SelectionStore, SelectionSnapshot
+from .Selection_history import SelectionHistory
+from .Dir_expander import DirExpander
+from .Instrumentation import stage, stage_start, stage_end
+
+logger = logging.getLogger(__name__)
 
 class DropReceiverWidget(QWidget):
     """
     一个专门接收拖拽文件/目录的UI组件，支持一次性或积累模式。
-    界面包含：顶部显示接收列表（通过一个QLabel作为拖拽区和点击触发区），
-    底部显示当前模式，底部提供模式切换和清除按钮。
-    当有项目被拖入或内部列表被清除时，发射 `dropped` 信号。
+    界面包含：顶部显示接收列表（通过一个QLabel作为拖拽区和点击触发区），底部显示当前模式并提供模式切换和清除按钮。
+    选择变化时发射完整列表信号 `dropped` 和增量信号 `items_added`/`items_removed`，各项功能见对应的方法。
+    use_list_view=True 时非空列表改用只渲染可见行的 QListView 显示（适合上万条目），
+    compact_paths=True 时选择存储改用共享父目录前缀的紧凑表示（见 CompactPathSet，适合上百万条目）。
     """
-    dropped = Signal(list, list) # 信号发出所有积累的文件和目录
+    # 列表类信号声明为 object：Python 列表原样传递，不逐项转换为 Qt 列表（百万条目时每次发出可省下半秒以上）
+    dropped = Signal(object, object) # 信号发出所有积累的文件和目录（list，每次发出新的列表）
     display_area_clicked = Signal() # 新增信号：当显示区域被点击时发出
-
-    def __init__(self, parent=None):
+    items_added = Signal(object, object) # 增量信号：本次新增的文件和目录（list）
+    items_removed = Signal(object, object) # 增量信号：本次移除的文件和目录（list）
+    selection_reset = Signal(int) # 选择被整体替换（load_items），代替增量信号；参数为新的选择代数
+    files_expanded = Signal(list) # 目录展开模式：一块展开得到的文件
+    expansion_progress = Signal(int, object) # 目录展开模式：当前任务已展开的文件数、字节数（object：可能超过 2 GiB）
+    expansion_finished = Signal(bool) # 目录展开模式：一个目录的展开结束（每个目录一次），True 表示因限制或取消被截断
+    disk_changes = Signal(list, list) # 监视模式：磁盘上已删除的路径、[(旧路径, 新路径)...]，对应的增量信号已先发出
+    history_changed = Signal(bool, bool) # 撤销历史变化：是否可撤销、是否可重做
+    LABEL_MAX_ITEMS = 1000 # QLabel 显示模式每个分区最多列出的条目数（更大的选择请使用 use_list_view=True）
+
+    def __init__(self, parent=None, use_list_view: bool = False, compact_paths: bool = False):
         super().__init__(parent)
         self.setAcceptDrops(True) # 允许QWidget整体接收外部拖放
         self.setMinimumSize(300, 200)
+        self._use_list_view = use_list_view
 
-        self._current_files = []
-        self._current_dirs = []
+        # 有序去重的文件/目录存储，可与 FileOpenWidget 共享
+        self._selection = SelectionStore(track_changes=True, compact=compact_paths)
         self._mode = DropMode.ONE_SHOT # 默认模式为一次性
+        self._path_filter = None # 可选的 PathFilter，在后台识别阶段生效
+        self._resolver = None # 开启规范路径去重时的 PathResolver
+        self._prefetcher = None # 开启规范路径去重时的 KeyPrefetcher，选择变化先在后台解析规范键再应用
+        self._classify_started = None # 本次拖放开始识别的时间（计时关闭时为 None）
+        self._watcher = None # 监视模式下的 SelectionWatcher
+        self._revalidator = None # revalidate_items() 首次调用时创建
+        self._history = SelectionHistory() # 以增量形式保存的撤销/重做历史
+
+        # 后台识别拖入的路径，结果分批回到 GUI 线程
+        self._classifier = DropClassifier(self)
+        self._classifier.batch_ready.connect(self._on_classified_batch)
+        self._classifier.finished.connect(self._on_classification_finished)
+        # 目录展开（默认关闭）
+        self._expand_dirs = False
+        self._expander = DirExpander(self)
+        self._expander.files_expanded.connect(self.files_expanded)
+        self._expander.progress.connect(self.expansion_progress)
+        self._expander.finished.connect(self.expansion_finished)
+        # 识别过程中节流刷新显示，避免每一批结果都重新排版
+        self._display_timer = QTimer(self)
+        self._display_timer.setSingleShot(True)
+        self._display_timer.setInterval(100)
+        self._display_timer.timeout.connect(self._update_display)
 
         self._build_ui()
         self._connect_internal_signals() # 连接内部按钮信号
@@ -38,6 +78,8 @@ class DropReceiverWidget(QWidget):
         self._display_label.setAutoFillBackground(True)
         # 在 QLabel 上安装事件过滤器，使其能够捕获点击事件
         self._display_label.installEventFilter(self)
+        if self._list_view is not None:
+            self._list_view.viewport().installEventFilter(self) # 列表视图同样作为点击触发区
 
     def _build_ui(self):
         main_layout = QVBoxLayout(self)
@@ -71,7 +113,25 @@ class DropReceiverWidget(QWidget):
         scroll_area.setWidget(self._display_label) # 将 QLabel 放入 QScrollArea
         scroll_area.setFrameShape(QScrollArea.Shape.NoFrame) # 无边框
 
-        main_layout.addWidget(scroll_area, 1) # 占据大部分空间
+        # 大列表显示：QListView 只渲染可见行，和提示区放在同一个 QStackedWidget 中切换
+        self._list_model = None
+        self._list_view = None
+        if self._use_list_view:
+            from .Selection_view import SelectionListModel # 只有列表视图模式才需要
+            self._list_model = SelectionListModel(self._selection, self)
+            self._list_view = QListView()
+            self._list_view.setModel(self._list_model)
+            self._list_view.setUniformItemSizes(True)
+            self._list_view.setLayoutMode(QListView.LayoutMode.Batched)
+            self._list_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+            self._list_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+            self._list_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+            self._display_stack = QStackedWidget()
+            self._display_stack.addWidget(scroll_area)
+            self._display_stack.addWidget(self._list_view)
+            main_layout.addWidget(self._display_stack, 1) # 占据大部分空间
+        else:
+            main_layout.addWidget(scroll_area, 1) # 占据大部分空间
 
         # 底部模式提示区域
         self._mode_label = QLabel()
@@ -95,6 +155,8 @@ class DropReceiverWidget(QWidget):
         """连接内部按钮的信号"""
         self._mode_toggle_btn.clicked.connect(self._toggle_mode)
         self._clear_btn.clicked.connect(self.clear_dropped_items)
+        QShortcut(QKeySequence.Undo, self, self.undo, context=Qt.WidgetWithChildrenShortcut)
+        QShortcut(QKeySequence.Redo, self, self.redo, context=Qt.WidgetWithChildrenShortcut)
 
     def _toggle_mode(self):
         """在一次性模式和积累模式之间切换"""
@@ -105,13 +167,42 @@ class DropReceiverWidget(QWidget):
 
     def _update_display(self):
         """更新显示文件列表和模式提示"""
+        started = stage_start()
+        if self._list_view is not None:
+            # 列表视图由模型增量更新，这里只在空/非空之间切换提示区和列表
+            if self._selection and self._display_stack.currentWidget() is not self._list_view:
+                self._display_stack.setCurrentWidget(self._list_view)
+                self._set_display_style(text_color="#333")
+            elif not self._selection:
+                self._display_label.setText("将文件或目录拖拽到此处 或 点击选择")
+                self._display_stack.setCurrentIndex(0)
+                self._set_display_style()
+        else:
+            self._update_label_display()
+
+        mode_text = f"当前模式: {'一次性返回' if self._mode == DropMode.ONE_SHOT else '积累模式'}"
+        if self._classifier.is_running():
+            processed, total = self._classifier.progress()
+            mode_text += f"（正在识别 {processed}/{total}）"
+        self._mode_label.setText(mode_text)
+
+        # 更新模式切换按钮的文本，显示“下次”将切换到的模式
+        if self._mode == DropMode.ONE_SHOT:
+            self._mode_toggle_btn.setText("切换到积累模式")
+        else:
+            self._mode_toggle_btn.setText("切换到一次性模式")
+        stage_end("render", started, len(self._selection))
+
+    def _update_label_display(self):
+        """QLabel 显示模式：把列表渲染为 HTML 文本，每个分区最多列出 LABEL_MAX_ITEMS 项，其余只显示数量"""
         display_text = []
-        if self._current_files:
-            display_text.append("<b>文件:</b>")
-            display_text.extend([f"- {Path(f).name}" for f in self._current_files])
-        if self._current_dirs:
-            display_text.append("<b>目录:</b>")
-            display_text.extend([f"- {Path(d).name}" for d in self._current_dirs])
+        for title, paths in (("文件", self._selection.files), ("目录", self._selection.dirs)):
+            if not paths:
+                continue
+            display_text.append(f"<b>{title}:</b>")
+            display_text.extend([f"- {Path(p).name}" for p in islice(paths, self.LABEL_MAX_ITEMS)])
+            if len(paths) > self.LABEL_MAX_ITEMS:
+                display_text.append(f"……以及另外 {len(paths) - self.LABEL_MAX_ITEMS} 项")
 
         if not display_text:
             self._display_label.setText("将文件或目录拖拽到此处 或 点击选择") # 恢复默认提示文本
@@ -124,20 +215,10 @@ class DropReceiverWidget(QWidget):
             # 保持边框样式，只恢复文字颜色
             self._display_label.setStyleSheet(self._get_default_display_label_stylesheet(text_color="#333", bg_color="#f8f8f8"))
 
-
-        mode_text = f"当前模式: {'一次性返回' if self._mode == DropMode.ONE_SHOT else '积累模式'}"
-        self._mode_label.setText(mode_text)
-
-        # 更新模式切换按钮的文本，显示“下次”将切换到的模式
-        if self._mode == DropMode.ONE_SHOT:
-            self._mode_toggle_btn.setText("切换到积累模式")
-        else:
-            self._mode_toggle_btn.setText("切换到一次性模式")
-
-    def _get_default_display_label_stylesheet(self, border_color="#aaa", bg_color="#f8f8f8", text_color="#777"):
-        """生成 _display_label 的默认样式表，方便在不同状态间切换"""
+    def _get_default_display_label_stylesheet(self, border_color="#aaa", bg_color="#f8f8f8", text_color="#777", selector="QLabel"):
+        """生成 _display_label（或列表视图）的默认样式表，方便在不同状态间切换"""
         return f"""
-            QLabel {{
+            {selector} {{
                 border: 2px dashed {border_color};
                 border-radius: 10px;
                 background-color: {bg_color};
@@ -161,84 +242,398 @@ class DropReceiverWidget(QWidget):
         """获取当前拖放接收模式"""
         return self._mode
 
+    def _when_keys_ready(self, paths, apply, *args):
+        """
+        规范路径去重开启时，先在后台解析 paths 的规范键，再在 GUI 线程按提交顺序执行 apply(*args)；
+        未开启时立即执行。所有修改选择的操作都经过这里，排队中的操作不会被后来的操作越过。
+        """
+        if self._prefetcher is None:
+            apply(*args)
+        else:
+            self._prefetcher.submit(paths, lambda: apply(*args))
+
+    def when_applied(self, callback):
+        """
+        在此前发起的选择变化（set_items、add_items 等）都应用之后调用 callback()。
+        规范路径去重关闭时这些变化是同步完成的，callback 立即被调用。
+        """
+        self._when_keys_ready((), callback)
+
     def set_items(self, files: list, dirs: list):
         """
         外部方法：直接设置显示区域的文件和目录。
-        用于从其他选择器同步数据。
+        用于从其他选择器同步数据。规范路径去重开启时，规范键解析完成后才应用（见 when_applied）。
         """
-        self._current_files = list(files)
-        self._current_dirs = list(dirs)
-        self._current_files.sort()
-        self._current_dirs.sort()
+        self._when_keys_ready([*files, *dirs], self._set_items_now, files, dirs)
+
+    def _set_items_now(self, files: list, dirs: list):
+        with stage("dedup_sort", len(files) + len(dirs)):
+            self._selection.replace(files, dirs)
         self._update_display()
+        self._emit_changes()
         # 注意：这里不应该发出 'dropped' 信号，因为这不是用户拖放操作。
 
+    def load_items(self, files: list, dirs: list):
+        """
+        外部方法：用已排序且无重复的文件和目录整体替换选择（例如 load_selection() 读回的会话），
+        跳过去重、排序和增量日志，百万条目也能很快载入。不发出逐项的增量信号，而是发出一次
+        selection_reset（需要时用 get_snapshot() 重新读取）；撤销历史中的这一步直接引用这两个列表（不复制）。
+        与 set_items 一样不发出 'dropped' 信号。
+        规范路径去重开启时要按规范键去重，与 set_items 一样在后台解析完成后才应用。
+        """
+        self._when_keys_ready([*files, *dirs], self._load_items_now, files, dirs)
+
+    def _load_items_now(self, files: list, dirs: list):
+        self._emit_changes() # 之前未发出的变化先单独成为一步
+        with stage("dedup_sort", len(files) + len(dirs)):
+            change = self._selection.replace_sorted(files, dirs)
+        self._update_display()
+        self._publish(change, reset=True)
+
+    def add_items(self, files: list, dirs: list):
+        """
+        外部方法：把文件和目录追加到显示区域（自动去重并保持排序）。
+        与 set_items 一样不发出 'dropped' 信号。
+        """
+        self._when_keys_ready([*files, *dirs], self._add_items_now, files, dirs)
+
+    def _add_items_now(self, files: list, dirs: list):
+        with stage("dedup_sort", len(files) + len(dirs)):
+            self._selection.add(files, dirs)
+        self._update_display()
+        self._emit_changes()
+
+    def remove_items(self, files: list, dirs: list):
+        """
+        外部方法：从显示区域移除指定的文件和目录（不存在的忽略）。
+        与 set_items 一样不发出 'dropped' 信号。
+        """
+        self._when_keys_ready([*files, *dirs], self._remove_items_now, files, dirs)
+
+    def _remove_items_now(self, files: list, dirs: list):
+        with stage("dedup_sort", len(files) + len(dirs)):
+            self._selection.remove(files, dirs)
+        self._update_display()
+        self._emit_changes()
+
+    def selection_generation(self) -> int:
+        """返回当前选择代数（单调递增），未变化时可据此跳过处理"""
+        return self._selection.generation
+
+    def set_expand_dirs(self, enabled: bool, max_depth=None, max_items=100_000, max_bytes=None):
+        """
+        开启/关闭目录展开模式，并设置每个目录展开的深度、文件数和字节数限制（None 表示不限）。
+        开启后新加入选择的目录在后台递归展开，其中的文件通过 `files_expanded` 分块发出（不放入选择列表），
+        进度见 `expansion_progress`。关闭时取消正在进行的展开。
+        """
+        self._expand_dirs = enabled
+        self._expander.set_limits(max_depth, max_items, max_bytes)
+        if not enabled:
+            self._expander.cancel()
+
+    def set_path_filter(self, path_filter):
+        """
+        设置 PathFilter（None 表示不过滤）。过滤在后台识别线程中完成，
+        不满足条件的拖入项不会进入选择；目录展开得到的文件同样经过过滤。
+        """
+        self._path_filter = path_filter
+        self._expander.set_path_filter(path_filter)
+
+    def get_path_filter(self):
+        return self._path_filter
+
+    def set_canonicalize(self, enabled: bool):
+        """
+        开启/关闭规范路径去重：经由符号链接、".." 或不同大小写（大小写不敏感的文件系统上）
+        指向同一对象的路径只保留一个，显示的仍是原始路径。规范键都在后台线程中解析并缓存：
+        拖入的路径在识别时解析，其他来源（set_items、会话、对话框结果）在应用前解析，GUI 线程只查缓存。
+        开启时已有选择的规范键同样先在后台解析，完成后移除其中等价的重复项。
+        """
+        if enabled == (self._resolver is not None):
+            return
+        if enabled:
+            self._resolver = shared_path_resolver()
+            self._prefetcher = KeyPrefetcher(self._resolver, self)
+            snapshot = self._selection.snapshot()
+            self._prefetcher.submit([*snapshot.files, *snapshot.dirs], self._apply_key_func)
+        else:
+            self._prefetcher.flush() # 排队中的操作按开启时的语义完成
+            self._prefetcher.deleteLater()
+            self._prefetcher = None
+            self._resolver = None
+            self._apply_key_func()
+
+    def _apply_key_func(self):
+        with stage("dedup_sort", len(self._selection)):
+            self._selection.set_key_func(self._resolver.canonical if self._resolver is not None else None)
+        self._update_display()
+        self._emit_changes()
+
+    def get_canonicalize(self) -> bool:
+        return self._resolver is not None
+
+    def set_watch_selection(self, enabled: bool, max_watched: int = 1000):
+        """
+        开启/关闭监视模式：监视选中条目的父目录（最多 max_watched 个，避免超出系统的监视数量限制），
+        变化经防抖合并后在后台核对，被删除的条目从选择中移除，改名的条目替换为新路径；
+        选择的变化通过增量信号通知，随后发出 `disk_changes`。
+        """
+        if enabled and self._watcher is None:
+            from .Selection_watcher import SelectionWatcher
+            self._watcher = SelectionWatcher(self, max_watched)
+            self._watcher.changes_found.connect(self._on_disk_changes)
+            self._watcher.track(self._selection.files, self._selection.dirs)
+        elif not enabled and self._watcher is not None:
+            self._watcher.clear()
+            self._watcher.deleteLater()
+            self._watcher = None
+
+    def is_watching(self) -> bool:
+        return self._watcher is not None
+
+    def _on_disk_changes(self, removed_files: list, removed_dirs: list, renamed: list):
+        """把监视到的删除和改名作为一次变更应用到选择上（改名后的新路径需要先解析规范键）"""
+        self._when_keys_ready([new for _, new, _ in renamed], self._apply_disk_changes, removed_files, removed_dirs, renamed)
+
+    def _apply_disk_changes(self, removed_files: list, removed_dirs: list, renamed: list):
+        gone_files = removed_files + [old for old, _, is_dir in renamed if not is_dir]
+        gone_dirs = removed_dirs + [old for old, _, is_dir in renamed if is_dir]
+        with stage("dedup_sort", len(gone_files) + len(gone_dirs) + len(renamed)):
+            self._selection.remove(gone_files, gone_dirs)
+            self._selection.add([new for _, new, is_dir in renamed if not is_dir],
+                                [new for _, new, is_dir in renamed if is_dir])
+        self._update_display()
+        self._emit_changes()
+        self.disk_changes.emit(removed_files + removed_dirs, [(old, new) for old, new, _ in renamed])
+
+    def revalidate_items(self):
+        """
+        在后台重新核对当前选择（例如刚从会话文件恢复、未经识别的路径）：已不存在的条目被移除，
+        类型变化（文件变成目录或相反）的条目换到对应分区，超时未能核对的条目保持不变。
+        变化通过增量信号通知，随后发出 disk_changes（改名列表为空）。
+        """
+        if self._revalidator is None:
+            self._revalidator = SelectionRevalidator(self)
+            self._revalidator.finished.connect(self._on_revalidated)
+        self._when_keys_ready((), self._start_revalidation) # 核对排队中的变化（例如刚恢复的会话）应用之后的选择
+
+    def _start_revalidation(self):
+        snapshot = self._selection.snapshot()
+        if snapshot.files or snapshot.dirs:
+            self._revalidator.start([*snapshot.files, *snapshot.dirs])
+
+    def _on_revalidated(self, files: list, dirs: list, missing: list):
+        self._when_keys_ready((), self._apply_revalidated, files, dirs, missing)
+
+    def _apply_revalidated(self, files: list, dirs: list, missing: list):
+        sel = self._selection
+        # 核对期间选择可能已经变化：只处理仍在原分区中的路径
+        now_dirs = [p for p in dirs if p in sel.files]
+        now_files = [p for p in files if p in sel.dirs]
+        gone_files = [p for p in missing if p in sel.files]
+        gone_dirs = [p for p in missing if p in sel.dirs]
+        if not (now_dirs or now_files or gone_files or gone_dirs):
+            return
+        with stage("dedup_sort", len(now_dirs) + len(now_files) + len(gone_files) + len(gone_dirs)):
+            sel.remove(gone_files + now_dirs, gone_dirs + now_files)
+            sel.add(now_files, now_dirs)
+        self._update_display()
+        self._emit_changes()
+        self.disk_changes.emit(gone_files + gone_dirs, []) # 只有类型变化时删除列表为空
+
+    def is_expanding(self) -> bool:
+        """是否有目录仍在后台展开中"""
+        return self._expander.is_running()
+
+    def cancel_expansion(self):
+        """取消所有未完成的目录展开，每个被取消的目录发出 expansion_finished(True)"""
+        self._expander.cancel()
+
+    def _emit_changes(self, record: bool = True):
+        """
+        发出自上次发出以来的净增量信号并记入撤销历史（撤销/重做本身不记录）；目录展开模式下同时调度展开。
+        按顺序应用这些增量即可得到与完整列表一致的结果。
+        """
+        self._publish(self._selection.take_changes(), record)
+
+    def _publish(self, change, record: bool = True, reset: bool = False):
+        if record and not change.is_empty() and self._history.max_depth > 0:
+            self._history.record(change)
+            self.history_changed.emit(True, False)
+        if self._watcher is not None:
+            self._watcher.untrack(change.removed_files, change.removed_dirs)
+            self._watcher.track(change.added_files, change.added_dirs)
+        if self._expand_dirs:
+            if change.removed_dirs:
+                self._expander.cancel(change.removed_dirs) # 只停止被移出选择的目录，其余目录继续展开
+            if change.added_dirs:
+                self._expander.expand(change.added_dirs)
+        if change.is_empty():
+            return
+        if reset:
+            with stage("signal_emit", len(self._selection)):
+                self.selection_reset.emit(change.generation)
+            return
+        with stage("signal_emit") as timing:
+            timing.count = sum(map(len, change[:4])) # 四个增量列表的总长度
+            if change.removed_files or change.removed_dirs:
+                self.items_removed.emit(change.removed_files, change.removed_dirs)
+            if change.added_files or change.added_dirs:
+                self.items_added.emit(change.added_files, change.added_dirs)
+
+    def undo(self) -> bool:
+        """
+        撤销最近一次选择变化（例如误点清除，或一次性模式下拖放替换了积累的列表）；没有可撤销的步骤时返回 False。
+        每次选择变化（拖放、清除、set_items 等）都记为一步（默认 20 步，见 set_history_depth），
+        焦点在本组件内时 Ctrl+Z/Ctrl+Shift+Z 同样可用；撤销/重做之后像清除一样发出 `dropped`。
+        """
+        return self._apply_history(self._history.undo)
+
+    def redo(self) -> bool:
+        """重做最近撤销的一步；没有可重做的步骤时返回 False"""
+        return self._apply_history(self._history.redo)
+
+    def can_undo(self) -> bool:
+        return self._history.can_undo()
+
+    def can_redo(self) -> bool:
+        return self._history.can_redo()
+
+    def set_history_depth(self, depth: int):
+        """设置撤销历史最多保留的步数，0 表示不记录（同时丢弃已有历史）"""
+        self._history.set_max_depth(depth)
+        self.history_changed.emit(self._history.can_undo(), self._history.can_redo())
+
+    def clear_history(self):
+        self._history.clear()
+        self.history_changed.emit(False, False)
+
+    def _apply_history(self, step) -> bool:
+        self._classifier.cancel() # 未识别完的拖放不再继续并入
+        if self._prefetcher is not None:
+            self._prefetcher.flush() # 撤销针对的是用户已经发起的全部变化
+        self._display_timer.stop()
+        self._emit_changes() # 已并入但尚未发出的部分先作为独立的一步记录下来
+        with stage("dedup_sort"):
+            applied = step(self._selection)
+        if not applied:
+            return False
+        self._update_display()
+        self._emit_changes(record=False)
+        self.history_changed.emit(self._history.can_undo(), self._history.can_redo())
+        with stage("signal_emit", len(self._selection)):
+            self.dropped.emit(list(self._selection.files), list(self._selection.dirs))
+        return True
+
+    def selection_store(self) -> SelectionStore:
+        """返回内部的选择存储，供外层组件共享而不必复制列表"""
+        return self._selection
+
     def clear_dropped_items(self):
         """清除所有已积累的文件和目录"""
-        self._current_files = []
-        self._current_dirs = []
+        self._classifier.cancel()
+        if self._revalidator is not None:
+            self._revalidator.cancel()
+        self._display_timer.stop()
+        self._when_keys_ready((), self._clear_now)
+
+    def _clear_now(self):
+        self._selection.clear()
         self._update_display()
+        self._emit_changes()
         self.dropped.emit([], []) # 发送空列表表示清除
 
     def get_dropped_items(self) -> tuple[list, list]:
-        """获取当前积累的所有文件和目录"""
-        return list(self._current_files), list(self._current_dirs)
+        """获取当前积累的所有文件和目录（每次调用都复制为新列表，频繁读取请用 get_snapshot()）"""
+        return list(self._selection.files), list(self._selection.dirs)
+
+    def get_snapshot(self) -> SelectionSnapshot:
+        """获取当前选择的不可变快照（files/dirs 元组 + generation），选择未变化时多次调用返回同一个对象"""
+        return self._selection.snapshot()
 
     # --- 拖放事件处理 (QWidget整体接收，视觉反馈应用到 _display_label) ---
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
             # --- 关键修改：动态修改 _display_label 的样式表 ---
-            self._display_label.setStyleSheet(self._get_default_display_label_stylesheet(
+            self._set_display_style(
                 border_color="#0078d7", # 蓝色虚线
                 bg_color="#e6f2fa",    # 浅蓝色背景
                 text_color="#005a9e"   # 蓝色文字
-            ))
+            )
             # --- 关键修改结束 ---
         else:
             event.ignore()
 
     def dragLeaveEvent(self, event):
         # --- 关键修改：恢复 _display_label 的默认样式 ---
-        self._display_label.setStyleSheet(self._get_default_display_label_stylesheet())
+        if self._list_view is not None and self._selection:
+            self._set_display_style(text_color="#333")
+        else:
+            self._set_display_style()
         # --- 关键修改结束 ---
 
+    def _set_display_style(self, **colors):
+        """把样式应用到当前可见的显示控件（提示区 QLabel 或列表视图）"""
+        if self._list_view is not None and self._display_stack.currentWidget() is self._list_view:
+            self._list_view.setStyleSheet(self._get_default_display_label_stylesheet(selector="QListView", **colors))
+        else:
+            self._display_label.setStyleSheet(self._get_default_display_label_stylesheet(**colors))
+
     def dropEvent(self, event):
+        """
+        拖入路径的识别（存在性、文件/目录）在后台线程中进行，识别过程中界面分批刷新，全部完成后只发射一次 `dropped`；
+        识别未完成时再次拖放会取消上一次的识别。
+        """
         self.dragLeaveEvent(event) # 恢复样式
 
-        dropped_files, dropped_dirs = [], []
-        for url in event.mimeData().urls():
-            path = url.toLocalFile()
-            if path:
-                if Path(path).exists():
-                    if Path(path).is_dir():
-                        dropped_dirs.append(path)
-                    else:
-                        dropped_files.append(path)
-                else:
-                    print(f"Warning: Dropped item '{path}' does not exist.")
-
+        # GUI 线程只提取 URL，存在性和类型的判断交给后台识别
+        with stage("url_extract") as timing:
+            paths = [path for path in (url.toLocalFile() for url in event.mimeData().urls()) if path]
+            timing.count = len(paths)
+        if not paths:
+            return
 
+        self._classifier.cancel() # 上一次拖放尚未识别完时，丢弃它剩余的结果
         if self._mode == DropMode.ONE_SHOT:
-            self._current_files = dropped_files
-            self._current_dirs = dropped_dirs
-        elif self._mode == DropMode.ACCUMULATE:
-            for f in dropped_files:
-                if f not in self._current_files:
-                    self._current_files.append(f)
-            for d in dropped_dirs:
-                if d not in self._current_dirs:
-                    self._current_dirs.append(d)
-
-        self._current_files.sort()
-        self._current_dirs.sort()
+            self._when_keys_ready((), self._selection.clear)
+        self._classify_started = stage_start()
+        self._classifier.start(paths, self._path_filter, self._resolver)
+        self._update_display()
 
+    def is_classifying(self) -> bool:
+        """是否有拖入的项目仍在后台识别中"""
+        return self._classifier.is_running()
+
+    def _on_classified_batch(self, files: list, dirs: list, missing: list):
+        """后台识别回传一批结果：合并到当前列表，并节流刷新显示"""
+        if missing:
+            logger.warning("%d dropped item(s) do not exist: %s", len(missing), missing)
+        self._when_keys_ready((), self._merge_batch, files, dirs) # 规范键已在识别线程中解析
+
+    def _merge_batch(self, files: list, dirs: list):
+        with stage("dedup_sort", len(files) + len(dirs)):
+            self._selection.add(files, dirs)
+        if not self._display_timer.isActive():
+            self._display_timer.start()
+
+    def _on_classification_finished(self):
+        """本次拖放全部识别完成：刷新显示并发出一次 dropped 信号"""
+        stage_end("classify", self._classify_started, self._classifier.progress()[1])
+        self._classify_started = None
+        self._when_keys_ready((), self._finish_drop)
+
+    def _finish_drop(self):
+        self._display_timer.stop()
         self._update_display() # 更新UI显示
-        self.dropped.emit(self._current_files, self._current_dirs) # 发送当前所有积累的结果
+        self._emit_changes()
+        with stage("signal_emit", len(self._selection)):
+            self.dropped.emit(list(self._selection.files), list(self._selection.dirs)) # 发送当前所有积累的结果
 
     # --- 事件过滤器，用于捕获 QLabel 的点击事件 ---
     def eventFilter(self, source, event):
-        if source == self._display_label and event.type() == QEvent.MouseButtonPress:
+        is_display = source == self._display_label or (self._list_view is not None and source == self._list_view.viewport())
+        if is_display and event.type() == QEvent.MouseButtonPress:
             mouse_event: QMouseEvent = event # Type hint for clarity
             if mouse_event.button() == Qt.LeftButton:
                 self.display_area_clicked.emit()
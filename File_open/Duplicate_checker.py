@@ -0,0 +1,71 @@
+# Duplicate_checker.py
+import threading
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QCoreApplication, Signal
+from .Duplicate_finder import DuplicateFinder
+
+
+class _CheckSignals(QObject):
+    done = Signal(int, object) # job_id, 重复分组列表（被取消时为 None）
+
+
+class _CheckTask(QRunnable):
+    def __init__(self, job_id: int, paths: list, finder: DuplicateFinder, cancel_event: threading.Event,
+                 signals: _CheckSignals):
+        super().__init__()
+        self._job_id = job_id
+        self._paths = paths
+        self._finder = finder
+        self._cancel_event = cancel_event
+        self._signals = signals
+
+    def run(self):
+        self._signals.done.emit(self._job_id, self._finder.find(self._paths, self._cancel_event))
+
+
+class DuplicateChecker(QObject):
+    """
+    在后台线程中用 DuplicateFinder 查找内容重复的文件，结果通过 `duplicates_found` 回传。
+    新的 check() 会取消尚未完成的旧任务，只有最后一次检查的结果会被发出；摘要缓存在多次检查之间共享。
+    """
+    duplicates_found = Signal(list) # 重复分组列表，每组第一个路径为保留项；没有重复时为空列表
+
+    def __init__(self, parent=None, partial_bytes: int = 4096):
+        super().__init__(parent)
+        self._finder = DuplicateFinder(partial_bytes)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _CheckSignals(self)
+        self._signals.done.connect(self._on_done)
+        self._cancel_event = threading.Event()
+        self._job_id = 0
+        self._running = False
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown) # 退出前关闭哈希进程池
+
+    def check(self, paths: list):
+        """提交一次检查（paths 为要比较的文件路径）"""
+        self.cancel()
+        self._job_id += 1
+        self._running = True
+        self._pool.start(_CheckTask(self._job_id, list(paths), self._finder, self._cancel_event, self._signals))
+
+    def cancel(self):
+        """取消未完成的检查"""
+        if self._running:
+            self._cancel_event.set()
+            self._cancel_event = threading.Event()
+            self._running = False
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def shutdown(self):
+        self.cancel()
+        self._finder.shutdown()
+
+    def _on_done(self, job_id: int, groups):
+        if job_id != self._job_id or not self._running or groups is None:
+            return
+        self._running = False
+        self.duplicates_found.emit(groups)
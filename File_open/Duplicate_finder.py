@@ -0,0 +1,163 @@
+# Duplicate_finder.py
+import hashlib
+import logging
+import mmap
+import multiprocessing
+import os
+import stat
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .Stat_cache import StatCache
+
+logger = logging.getLogger(__name__)
+
+_HASH_BATCH = 64 # 每个进程任务处理的文件数，减少进程间往返
+_INLINE_BYTES = 32 * 1024 * 1024 # 待读取的总字节数低于此值时直接在当前线程计算，省去启动进程池的开销
+
+
+def _digest(path: str, nbytes):
+    """计算文件前 nbytes 字节（None 表示整个文件）的 blake2b 摘要，通过内存映射读取；失败返回 None"""
+    h = hashlib.blake2b(digest_size=20)
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    h.update(mm if nbytes is None or nbytes >= size else mm[:nbytes])
+    except (OSError, ValueError):
+        return None
+    return h.digest()
+
+
+def _digest_batch(paths: list, nbytes) -> list:
+    """进程池任务：批量计算摘要"""
+    return [_digest(p, nbytes) for p in paths]
+
+
+class DuplicateFinder:
+    """
+    查找内容重复的文件，不依赖 Qt。
+    步骤：同一 (设备, inode) 的不同路径直接视为重复（硬链接、符号链接、同一文件的不同写法）；
+    其余文件先按大小分组，大小相同的再比较前 partial_bytes 字节的摘要，仍相同的才计算整个文件的摘要。
+    摘要计算在进程池中通过内存映射读取完成，结果按 (dev, inode, mtime) 缓存，文件未修改时不会重复读取。
+    """
+
+    def __init__(self, partial_bytes: int = 4096, max_workers: int = None, cache_size: int = 100_000):
+        self.partial_bytes = partial_bytes
+        self._max_workers = max_workers
+        self._cache = StatCache(cache_size) # 键 -> (前部摘要, 完整摘要)，未计算的为 None
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def shutdown(self):
+        """关闭进程池（之后再次使用时会重新创建）"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn：GUI 进程中有多个线程，fork 出的子进程可能继承被占用的锁
+                self._pool = ProcessPoolExecutor(self._max_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _hash_all(self, paths: list, nbytes, total_bytes: int, cancel_event: threading.Event) -> list:
+        """计算一组文件的摘要：数据量小时直接计算，否则分批交给进程池；被取消时返回 None"""
+        if total_bytes < _INLINE_BYTES or len(paths) < 2:
+            digests = []
+            for p in paths:
+                if cancel_event.is_set():
+                    return None
+                digests.append(_digest(p, nbytes))
+            return digests
+        batches = [paths[i:i + _HASH_BATCH] for i in range(0, len(paths), _HASH_BATCH)]
+        try:
+            futures = [self._executor().submit(_digest_batch, b, nbytes) for b in batches]
+            digests = []
+            for fut in futures:
+                if cancel_event.is_set():
+                    for f in futures:
+                        f.cancel()
+                    return None
+                digests.extend(fut.result())
+            return digests
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning("Duplicate hashing process pool failed (%s), hashing in this process instead.", e)
+            self.shutdown()
+            return [_digest(p, nbytes) for p in paths]
+
+    def _refine(self, groups: list, stats: dict, full: bool, cancel_event: threading.Event) -> list:
+        """用前部摘要（full=False）或完整摘要（full=True）把每组继续细分，只保留仍有多个成员的组"""
+        slot = 1 if full else 0
+        todo, sizes = [], 0
+        for group in groups:
+            for p in group:
+                cached = self._cache.get(StatCache.key_of(stats[p]))
+                if cached is None or cached[slot] is None:
+                    todo.append(p)
+                    sizes += stats[p].st_size if full else min(stats[p].st_size, self.partial_bytes)
+        digests = self._hash_all(todo, None if full else self.partial_bytes, sizes, cancel_event)
+        if digests is None:
+            return None
+        for p, d in zip(todo, digests):
+            if d is None:
+                continue # 读取失败的文件不参与比较
+            key = StatCache.key_of(stats[p])
+            old = self._cache.get(key) or (None, None)
+            self._cache.put(key, (d, old[1]) if slot == 0 else (old[0], d))
+        refined = []
+        for group in groups:
+            buckets = {}
+            for p in group:
+                cached = self._cache.get(StatCache.key_of(stats[p]))
+                if cached is not None and cached[slot] is not None:
+                    buckets.setdefault(cached[slot], []).append(p)
+            refined.extend(b for b in buckets.values() if len(b) > 1)
+        return refined
+
+    def find(self, paths, cancel_event: threading.Event = None) -> list:
+        """
+        返回重复文件分组列表，每组是内容相同的路径列表（保持输入顺序，第一个可视为保留项）；
+        没有重复时返回空列表，被取消时返回 None。不存在或无法读取的路径被忽略。
+        """
+        cancel_event = cancel_event or threading.Event()
+        paths = list(dict.fromkeys(paths))
+        stats, by_inode = {}, {}
+        for p in paths:
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            aliases = by_inode.setdefault((st.st_dev, st.st_ino), [])
+            if not aliases:
+                stats[p] = st # 每个 inode 只用第一个路径参与内容比较
+            aliases.append(p)
+        by_size = {}
+        for p, st in stats.items():
+            by_size.setdefault(st.st_size, []).append(p)
+        groups = self._refine([g for g in by_size.values() if len(g) > 1], stats, False, cancel_event)
+        if groups is None:
+            return None
+        done = [g for g in groups if stats[g[0]].st_size <= self.partial_bytes] # 前部摘要已覆盖整个文件
+        rest = self._refine([g for g in groups if stats[g[0]].st_size > self.partial_bytes], stats, True, cancel_event)
+        if rest is None:
+            return None
+        result, grouped = [], set()
+        for g in done + rest:
+            members = [a for p in g for a in by_inode[(stats[p].st_dev, stats[p].st_ino)]]
+            result.append(members)
+            grouped.update(g)
+        for p, st in stats.items(): # 只有路径别名、内容没有其他副本的文件
+            aliases = by_inode[(st.st_dev, st.st_ino)]
+            if p not in grouped and len(aliases) > 1:
+                result.append(list(aliases))
+        order = {p: i for i, p in enumerate(paths)}
+        for g in result:
+            g.sort(key=order.__getitem__)
+        result.sort(key=lambda g: order[g[0]])
+        return result
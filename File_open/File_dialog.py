@@ -1,69 +1,184 @@
 #File_dialog
+import logging
 import sys
 import os
+import warnings
+from concurrent.futures import Future
 from pathlib import Path
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit,
-    QTreeView, QListWidget, QListWidgetItem, QFileSystemModel,
-    QLabel, QAbstractItemView, QCheckBox, QApplication,
-    QDialog, QDialogButtonBox, QMainWindow, QMessageBox
+    QTreeView, QListView, QFileSystemModel,
+    QLabel, QAbstractItemView, QCheckBox, QApplication, QHeaderView,
+    QDialog, QDialogButtonBox, QMainWindow, QMessageBox, QMenu
 )
-from PySide6.QtCore import Qt, QStandardPaths, Signal, QDir
-from PySide6.QtGui import QDragEnterEvent, QDropEvent, QKeyEvent
+from PySide6.QtCore import Qt, QStandardPaths, Signal, QDir, QTimer, QStringListModel
+from PySide6.QtGui import QDragEnterEvent, QDropEvent, QKeyEvent, QKeySequence, QShortcut
+from .Staging_model import StagingModel
+from .File_tree import FileTreeProxyModel, DirectoryRefresher
+from .File_search import FileSearchService
+from .Path_completer import PathCompleter
+from .File_preview import PreviewPane
+from .Path_resolver import shared_path_resolver
+from .Drop_classifier import KeyPrefetcher
+from .Instrumentation import stage
+from .Selection_core import revalidate_paths
+from .Selection_session import RecentLocations
+logger = logging.getLogger(__name__)
+_shared_model = None # Process-wide QFileSystemModel, see shared_file_system_model()
+_pooled_dialog = None # The one reusable FilePickerDialog, see acquire_picker_dialog()
+_recent_locations = None # Process-wide RecentLocations, see shared_recent_locations()
+def shared_file_system_model() -> QFileSystemModel:
+    """Returns the process-wide QFileSystemModel, creating and warming it (rooted at cwd) on first use.
+    Sharing it means one directory cache and one set of watcher threads no matter how many pickers exist."""
+    global _shared_model
+    if _shared_model is None:
+        _shared_model = QFileSystemModel(QApplication.instance()) # Parented to the app so it dies with it
+        _shared_model.setRootPath(str(Path.cwd()))
+    return _shared_model
+def shared_recent_locations() -> RecentLocations:
+    """Returns the process-wide most-recently-used locations, persisted as JSON in the app config directory
+    (kept in memory only when Qt has no writable config location)."""
+    global _recent_locations
+    if _recent_locations is None:
+        config_dir = QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation)
+        _recent_locations = RecentLocations(os.path.join(config_dir, "file_open_recent.json") if config_dir else None)
+    return _recent_locations
 class FilePickerWidget(QWidget):
     picked = Signal(list, list)
-    def __init__(self, parent=None):
+    REVALIDATE_TIMEOUT = 2.0 # Seconds one path's stat may take in get_result before it is reported as unverified
+    REVALIDATE_TOTAL_TIMEOUT = 10.0 # Upper bound on the whole get_result revalidation, however the mount behaves
+    RECENT_WARM_DELAY = 500 # ms after prefetching recent listings before confirmed directories are loaded into the model
+    def __init__(self, parent=None, model: QFileSystemModel = None):
         super().__init__(parent)
+        self._kind_hints = {} # path -> is_dir as known when staged, used for paths get_result cannot verify
+        self._unverified = []
+        self._prefetcher = None # KeyPrefetcher while canonicalization is on: batches are keyed off the GUI thread
         self.setAcceptDrops(True) # Enable drop events for this widget (for general window dropping)
+        self._model_is_warm = model is not None and model.rootPath() not in ("", ".") # "." is the unset default
+        self._external_model = model
+        self._path_filter = None # Optional PathFilter; its globs filter the tree in this picker's proxy
+        self._search_roots = None # None: index the model's root path lazily on the first query
+        self.search_service = FileSearchService(self)
+        self.recent = shared_recent_locations()
         self._build_ui()
         self._connect_signals()
-        self.model.setRootPath(str(Path.cwd()))
-        self.model.directoryLoaded.connect(self._on_dir_loaded)
+        if self._model_is_warm and self.model.index(str(Path.cwd())).isValid():
+            self.goto_path(str(Path.cwd()), remember=False) # Shared model already has cwd cached, no need to wait
+        else:
+            self.model.setRootPath(str(Path.cwd()))
+            self.model.directoryLoaded.connect(self._on_dir_loaded)
+        QTimer.singleShot(0, self.prefetch_recent_locations) # After the first frame, so startup is not delayed
     def _build_ui(self):
         main = QVBoxLayout(self)
         nav = QHBoxLayout()
         self.btn_desktop = QPushButton("桌面")
         self.btn_download = QPushButton("下载")
         self.btn_project = QPushButton("项目目录")
+        self.btn_recent = QPushButton("最近")
+        self.recent_menu = QMenu(self.btn_recent) # Filled from self.recent each time it opens
+        self.btn_recent.setMenu(self.recent_menu)
         self.cb_hidden = QCheckBox("显示隐藏项")
         self.cb_hidden.setChecked(False) # Default to not showing hidden items
+        self.cb_details = QCheckBox("显示大小/修改时间")
+        self.cb_preview = QCheckBox("预览")
+        self.cb_preview.setChecked(True)
         self.btn_refresh = QPushButton("刷新")
-        for w in (self.btn_desktop, self.btn_download, self.btn_project, self.cb_hidden, self.btn_refresh):
+        for w in (self.btn_desktop, self.btn_download, self.btn_project, self.btn_recent, self.cb_hidden, self.cb_details,
+                  self.cb_preview, self.btn_refresh):
             nav.addWidget(w)
         nav.addStretch()
         main.addLayout(nav)
         path = QHBoxLayout()
         path.addWidget(QLabel("路径："))
         self.line_path = QLineEdit()
+        self.completer = PathCompleter(self) # Listings are read off the GUI thread and cached
+        self.completer.attach(self.line_path)
         path.addWidget(self.line_path)
         main.addLayout(path)
+        search = QHBoxLayout()
+        search.addWidget(QLabel("搜索："))
+        self.line_search = QLineEdit()
+        self.line_search.setPlaceholderText("输入文件名片段，双击或回车添加结果")
+        self.line_search.setClearButtonEnabled(True)
+        self.cb_fuzzy = QCheckBox("模糊匹配")
+        search.addWidget(self.line_search)
+        search.addWidget(self.cb_fuzzy)
+        main.addLayout(search)
+        self.search_model = QStringListModel(self)
+        self.search_results = QListView()
+        self.search_results.setModel(self.search_model)
+        self.search_results.setUniformItemSizes(True)
+        self.search_results.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.search_results.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.search_results.setVisible(False) # Only shown while there is a query
+        main.addWidget(self.search_results, 1)
+        self._search_timer = QTimer(self) # Debounces keystrokes so each query runs once typing pauses
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
         mid = QHBoxLayout()
         left = QVBoxLayout()
-        left.addWidget(QLabel("显示区（双击添加）"))
-        self.model = QFileSystemModel()
+        left.addWidget(QLabel("显示区（双击添加，可多选后按回车或“添加选中”批量添加）"))
+        self.model = self._external_model if self._external_model is not None else QFileSystemModel()
+        self.proxy = FileTreeProxyModel(self) # Hidden entries are filtered here, so toggling them never rescans
+        self.proxy.setSourceModel(self.model)
+        self.refresher = DirectoryRefresher(self.model, self)
         self._apply_filter()
         self.tree = QTreeView()
-        self.tree.setModel(self.model)
+        self.tree.setModel(self.proxy)
         self.tree.setSortingEnabled(True)
-        for i in range(1, self.model.columnCount()):
+        self.tree.setSelectionMode(QAbstractItemView.ExtendedSelection) # Ctrl/Shift multi-select, staged in one batch
+        for i in range(1, self.proxy.columnCount()):
             self.tree.setColumnHidden(i, True) # Hide Type, Size, Date Modified columns
         left.addWidget(self.tree)
+        self.btn_stage_selected = QPushButton("添加选中")
+        left.addWidget(self.btn_stage_selected)
         mid.addLayout(left, 2)
         right = QVBoxLayout()
-        right.addWidget(QLabel("暂存区（双击删除）"))
-        self.staging = QListWidget()
+        right.addWidget(QLabel("暂存区（双击或按 Delete 删除）"))
+        self.staging_model = StagingModel(self)
+        self.staging = QListView()
+        self.staging.setModel(self.staging_model)
+        self.staging.setUniformItemSizes(True)
+        self.staging.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.staging.setEditTriggers(QAbstractItemView.NoEditTriggers)
         right.addWidget(self.staging)
         mid.addLayout(right, 1)
+        self.preview = PreviewPane(self) # Current tree or staging item; decoded off the GUI thread
+        mid.addWidget(self.preview, 1)
         main.addLayout(mid, 1)
         self.drag_hint_label = QLabel("可拖动文件/文件夹到此窗口任意位置快速定位")
         self.drag_hint_label.setAlignment(Qt.AlignCenter)
         self.drag_hint_label.setStyleSheet("color: gray;")
         main.addWidget(self.drag_hint_label)
     def _apply_filter(self):
-        f = QDir.AllEntries | QDir.NoDotAndDotDot
-        if self.cb_hidden.isChecked():
-            f |= QDir.Hidden
-        self.model.setFilter(f)
+        # The model always loads hidden entries (AllDirs: name filters never hide directories); the proxy hides them
+        f = QDir.AllEntries | QDir.AllDirs | QDir.NoDotAndDotDot | QDir.Hidden
+        if self.model.filter() != f:
+            self.model.setFilter(f)
+        self.proxy.set_show_hidden(self.cb_hidden.isChecked())
+        # Globs are matched in this picker's own proxy: the model may be shared with pickers using other filters
+        self.proxy.set_name_filter(self._path_filter.matches_name if self._path_filter else None)
+    def set_path_filter(self, path_filter):
+        """Restricts selectable files to a PathFilter (None clears it). Name globs hide non-matching files in the
+        tree; regex/size/mtime predicates are applied when staging and in get_result."""
+        self._path_filter = path_filter
+        self._apply_filter()
+    def set_canonicalize(self, enabled: bool):
+        """Identifies staged paths by their canonical form (symlinks, "..", case on case-insensitive mounts), so
+        one file reached through different spellings is staged once. Resolution is memoized process-wide and done
+        on a worker thread: the staged rows are re-keyed, and later batches staged, once their keys are resolved."""
+        if enabled == (self._prefetcher is not None):
+            return
+        if enabled:
+            resolver = shared_path_resolver()
+            self._prefetcher = KeyPrefetcher(resolver, self)
+            self._prefetcher.submit(list(self.staging_model.paths()),
+                                    lambda: self.staging_model.set_key_func(resolver.canonical))
+        else:
+            self._prefetcher.flush()
+            self._prefetcher.deleteLater()
+            self._prefetcher = None
+            self.staging_model.set_key_func(None)
     def _connect_signals(self):
         self.btn_desktop.clicked.connect(
             lambda: self.goto_path(QStandardPaths.writableLocation(QStandardPaths.DesktopLocation)))
@@ -71,9 +186,87 @@ class FilePickerWidget(QWidget):
             lambda: self.goto_path(QStandardPaths.writableLocation(QStandardPaths.DownloadLocation)))
         self.btn_project.clicked.connect(lambda: self.goto_path(str(Path.cwd())))
         self.btn_refresh.clicked.connect(self.refresh)
-        self.cb_hidden.toggled.connect(lambda: (self._apply_filter(), self.refresh()))
+        self.recent_menu.aboutToShow.connect(self._fill_recent_menu)
+        self.cb_hidden.toggled.connect(self.proxy.set_show_hidden)
+        self.cb_details.toggled.connect(self.set_detail_columns)
+        self.cb_preview.toggled.connect(self.set_preview_enabled)
+        self.tree.selectionModel().currentChanged.connect(
+            lambda idx, _: self._preview(self.model.filePath(self.proxy.mapToSource(idx)) if idx.isValid() else None))
+        self.staging.selectionModel().currentChanged.connect(
+            lambda idx, _: self._preview(self.staging_model.path_at(idx.row()) if idx.isValid() else None))
+        self.refresher.finished.connect(lambda dirs: [self.proxy.invalidate_dir_sizes(d) for d in dirs])
         self.tree.doubleClicked.connect(self.add_to_staging)
-        self.staging.itemDoubleClicked.connect(self.remove_from_staging)
+        self.btn_stage_selected.clicked.connect(self.stage_selected)
+        for key in (Qt.Key_Return, Qt.Key_Enter):
+            QShortcut(QKeySequence(key), self.tree, self.stage_selected, context=Qt.WidgetShortcut)
+        self.staging.doubleClicked.connect(self.remove_from_staging)
+        QShortcut(QKeySequence.Delete, self.staging, self.remove_selected_from_staging, context=Qt.WidgetShortcut)
+        self.line_search.textChanged.connect(lambda _: self._search_timer.start())
+        self.cb_fuzzy.toggled.connect(lambda _: self._run_search())
+        self._search_timer.timeout.connect(self._run_search)
+        self.search_service.index_ready.connect(lambda _: self._run_search())
+        self.search_service.index_updated.connect(self._run_search)
+        self.search_results.doubleClicked.connect(lambda idx: self.add_to_staging(idx.data()))
+        for key in (Qt.Key_Return, Qt.Key_Enter):
+            QShortcut(QKeySequence(key), self.search_results, self.stage_selected_search_results,
+                      context=Qt.WidgetShortcut)
+    def set_search_roots(self, roots=None, include_bookmarks: bool = False):
+        """Sets the directories indexed for the search box (None: the model's root path) and rebuilds the index
+        in the background. include_bookmarks also indexes the Desktop and Downloads locations."""
+        roots = list(roots) if roots is not None else [self.model.rootPath() or str(Path.cwd())]
+        if include_bookmarks:
+            for loc in (QStandardPaths.DesktopLocation, QStandardPaths.DownloadLocation):
+                p = QStandardPaths.writableLocation(loc)
+                if p and os.path.isdir(p) and p not in roots:
+                    roots.append(p)
+        self._search_roots = roots
+        self.search_service.set_roots(roots)
+    def _run_search(self):
+        query = self.line_search.text().strip()
+        self.search_results.setVisible(bool(query))
+        if not query:
+            self.search_model.setStringList([])
+            return
+        if self._search_roots is None:
+            self.set_search_roots() # Build the index on first use only
+        if self._path_filter is None:
+            results = self.search_service.search(query, fuzzy=self.cb_fuzzy.isChecked())
+        else: # The index already knows each hit's kind, so filtering needs no stat here
+            results = self.search_service.search(query, fuzzy=self.cb_fuzzy.isChecked(), with_kind=True)
+            results = [p for p, is_dir in results if self._path_filter.matches(p, is_dir)]
+        self.search_model.setStringList(results)
+    def stage_selected_search_results(self):
+        """Stages every selected search result in one operation."""
+        self.add_many_to_staging([idx.data() for idx in self.search_results.selectionModel().selectedRows()])
+    def set_detail_columns(self, show: bool, dir_sizes: bool = True):
+        """Shows the Size and Date Modified columns; dir_sizes also fills in recursive sizes for directories.
+        Values are only computed for rows that get painted, and sorting by them reuses what is already known."""
+        self.cb_details.blockSignals(True) # Keep the checkbox in sync when called programmatically
+        self.cb_details.setChecked(show)
+        self.cb_details.blockSignals(False)
+        self.tree.setColumnHidden(1, not show)
+        self.tree.setColumnHidden(3, not show)
+        self.proxy.set_dir_sizes_enabled(show and dir_sizes)
+        if show:
+            self.tree.header().setStretchLastSection(False)
+            self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        else:
+            self.tree.header().setSectionResizeMode(0, QHeaderView.Interactive)
+            self.tree.header().setStretchLastSection(True)
+    def set_preview_enabled(self, enabled: bool):
+        """Shows/hides the preview pane; while hidden nothing is decoded."""
+        if self.cb_preview.isChecked() != enabled:
+            self.cb_preview.setChecked(enabled) # Re-enters through toggled
+            return
+        self.preview.setVisible(enabled)
+        if not enabled:
+            self.preview.show_path(None)
+    def set_thumbnail_cache_dir(self, directory: str = None):
+        """Also caches image thumbnails as PNG files in directory, keyed by (path, mtime, size); None disables it."""
+        self.preview.loader.disk_cache_dir = directory
+    def _preview(self, path):
+        if self.cb_preview.isChecked():
+            self.preview.show_path(path)
     def _show_error_message(self, title: str, message: str):
         """Helper method to display a QMessageBox error."""
         dialog_parent = self.window() # Get the top-level QWidget (FilePickerDialog)
@@ -84,22 +277,53 @@ class FilePickerWidget(QWidget):
         msg_box.setStandardButtons(QMessageBox.Ok)
         msg_box.setDefaultButton(QMessageBox.Ok)
         msg_box.exec()
-    def goto_path(self, path: str):
+    def _fill_recent_menu(self):
+        self.recent_menu.clear()
+        for location in self.recent.locations():
+            self.recent_menu.addAction(location, lambda location=location: self.goto_path(location))
+        if self.recent_menu.isEmpty():
+            self.recent_menu.addAction("（无）").setEnabled(False)
+        else:
+            self.recent_menu.addSeparator()
+            self.recent_menu.addAction("清除最近位置", self.recent.clear)
+    def prefetch_recent_locations(self):
+        """Lists the recent locations (and their parents, which goto_path consults) in the background, then
+        has the model load those confirmed to be directories, so jumping to one needs no disk access.
+        Locations that no longer exist, or sit on a mount that does not answer, are never touched on the GUI thread."""
+        locations = self.recent.locations()
+        for location in locations:
+            self.completer.prefetch(os.path.dirname(location) or location)
+            self.completer.prefetch(location)
+        if locations:
+            QTimer.singleShot(self.RECENT_WARM_DELAY, lambda: self._warm_recent_in_model(locations))
+    def _warm_recent_in_model(self, locations: list):
+        for location in locations:
+            if self.completer.known_kind(location) is not True:
+                continue # Not listed yet, gone, or no longer a directory
+            idx = self.model.index(location)
+            if idx.isValid() and self.model.canFetchMore(idx):
+                self.model.fetchMore(idx) # Queued on the model's gatherer thread
+    def goto_path(self, path: str, remember: bool = True):
+        """Shows path (or a file's parent directory) in the tree; remember=True records it in the recent locations."""
         path_str = str(path)
-        if not os.path.isdir(path_str) and not os.path.isfile(path_str):
-            print(f"DEBUG: Path does not exist or is not a file/directory: {path_str}")
+        kind = self.completer.known_kind(path_str) # Answered from the completer's cache, no blocking stat
+        if kind is not None:
+            target_path = Path(path_str) if kind else Path(path_str).parent
+        elif not os.path.isdir(path_str) and not os.path.isfile(path_str):
+            logger.debug("Path does not exist or is not a file/directory: %s", path_str)
             self._show_error_message("路径错误", f"文件/文件夹路径 '{path_str}' 不存在或不是有效的文件/目录，请检查。")
             return
-        target_path = Path(path_str)
-        if target_path.is_file():
-            target_path = target_path.parent
-        if not target_path.is_dir():
-            print(f"DEBUG: Target path is not a directory after adjustment: {target_path}")
+        else:
+            target_path = Path(path_str)
+            if target_path.is_file():
+                target_path = target_path.parent
+        if kind is None and not target_path.is_dir():
+            logger.debug("Target path is not a directory after adjustment: %s", target_path)
             self._show_error_message("路径错误", f"文件/文件夹路径 '{target_path}' 无效，请检查。")
             return
         idx = self.model.index(str(target_path))
         if not idx.isValid():
-            print(f"DEBUG: Model index is not valid for path: {target_path}")
+            logger.debug("Model index is not valid for path: %s", target_path)
             if sys.platform == "win32":
                 drive_root = target_path.anchor # e.g., "C:\"
                 if drive_root and self.model.rootPath() != drive_root:
@@ -110,47 +334,109 @@ class FilePickerWidget(QWidget):
                      self.model.setRootPath("/")
                      idx = self.model.index(str(target_path)) # 再次尝试获取索引
             if not idx.isValid(): # 修复后如果仍然无效
-                print(f"DEBUG: Model index still not valid after root adjustment for path: {target_path}")
+                logger.debug("Model index still not valid after root adjustment for path: %s", target_path)
                 self._show_error_message("路径错误", f"无法访问路径 '{target_path}'，可能权限不足或路径无效。请检查。")
                 return
         self.line_path.setText(str(target_path)) # 路径栏更新为实际导航的有效路径
+        self.completer.prefetch(str(target_path)) # Typing below the new location completes instantly
+        self.proxy.set_pinned_path(str(target_path)) # Keep the target reachable even if it is a hidden directory
+        idx = self.proxy.mapFromSource(idx)
         self.tree.expand(idx)
         self.tree.setCurrentIndex(idx)
         self.tree.scrollTo(idx, QAbstractItemView.PositionAtCenter)
+        if remember:
+            self.recent.touch(str(target_path))
     def refresh(self):
-        cur = self.line_path.text()
-        self.model.setRootPath("") # Clear cache and force re-scan
-        if os.path.isdir(cur):
-            self.goto_path(cur)
+        """Re-reads only the loaded directories whose mtime changed; the cache and expanded state are kept."""
+        self.refresher.refresh()
     def add_to_staging(self, idx_or_path):
         """Adds a path to the staging area. Can accept a QModelIndex or a string path."""
         if isinstance(idx_or_path, str):
             path = idx_or_path
-        else: # Assume QModelIndex
-            path = self.model.filePath(idx_or_path)
+        else: # Assume QModelIndex of the tree view (proxy) or of the model itself
+            idx = idx_or_path
+            if idx.model() is self.proxy:
+                idx = self.proxy.mapToSource(idx)
+            path = self.model.filePath(idx)
+        if path in self.staging_model:
+            return # Prevent duplicates (O(1) hash lookup)
         if not os.path.exists(path):
-            print(f"Warning: Attempted to add non-existent path to staging: {path}")
+            logger.warning("Attempted to add non-existent path to staging: %s", path)
             return
-        if self.staging.findItems(path, Qt.MatchExactly):
-            return # Prevent duplicates
-        self.staging.addItem(path)
-    def remove_from_staging(self, item: QListWidgetItem):
-        self.staging.takeItem(self.staging.row(item))
+        if self._path_filter is not None and not self._path_filter.matches(path, os.path.isdir(path)):
+            return
+        self.staging_model.add(path)
+    def add_many_to_staging(self, paths, validate: bool = True, is_dir: bool = None):
+        """Stages many paths in one batch (one row insertion, one repaint). validate=False skips the existence check
+        for paths that are already known to be valid; is_dir records their known kind, which get_result falls back
+        on if it cannot verify them in time. With canonicalization on, the batch is staged once its keys have been
+        resolved in the background (batches keep their order; get_result waits for any still pending)."""
+        paths = list(paths)
+        if self._prefetcher is None:
+            self._stage_now(paths, validate, is_dir)
+        else:
+            self._prefetcher.submit(paths, lambda: self._stage_now(paths, validate, is_dir))
+    def _stage_now(self, paths: list, validate: bool, is_dir):
+        paths = [p for p in paths if p not in self.staging_model]
+        if validate:
+            valid = []
+            for p in paths:
+                if not os.path.exists(p):
+                    logger.warning("Attempted to add non-existent path to staging: %s", p)
+                elif self._path_filter is None or self._path_filter.matches(p, os.path.isdir(p)):
+                    valid.append(p)
+            paths = valid
+        added = self.staging_model.add_many(paths)
+        if is_dir is not None:
+            self._kind_hints.update(dict.fromkeys(added, is_dir))
+    def stage_selected(self):
+        """Stages every row currently selected in the tree in one operation."""
+        rows = self.tree.selectionModel().selectedRows(0)
+        self.add_many_to_staging([self.model.filePath(self.proxy.mapToSource(idx)) for idx in rows])
+    def remove_from_staging(self, idx_or_path):
+        """Removes a path from the staging area. Can accept a QModelIndex of the staging view or a string path."""
+        if isinstance(idx_or_path, str):
+            self.staging_model.remove(idx_or_path)
+        elif idx_or_path.isValid():
+            self.staging_model.remove_rows((idx_or_path.row(),))
+    def remove_selected_from_staging(self):
+        self.staging_model.remove_rows(idx.row() for idx in self.staging.selectionModel().selectedRows())
+    def clear_staging(self):
+        self.staging_model.clear()
+        if self._prefetcher is not None:
+            self._prefetcher.discard() # Batches still waiting for their keys would only be cleared again
+            self.staging_model.set_key_func(shared_path_resolver().canonical) # Possibly still pending; free now
+        self._kind_hints.clear()
     def _on_dir_loaded(self, path: str):
         if Path(path) == Path.cwd():
             self.model.directoryLoaded.disconnect(self._on_dir_loaded) # Disconnect after first use
-            self.goto_path(str(Path.cwd()))
+            self.goto_path(str(Path.cwd()), remember=False)
         else:
             pass # Keep relying on goto_path's robustness
     def get_result(self):
-        files, dirs = [], []
-        for i in range(self.staging.count()):
-            p = self.staging.item(i).text()
-            if os.path.exists(p):
-                (dirs if os.path.isdir(p) else files).append(p)
-            else:
-                print(f"Warning: Path '{p}' in staging area no longer exists, skipping.")
+        """Revalidates the staged paths in one parallel stat pass, which also classifies them, and returns
+        (files, dirs). Paths whose stat takes longer than REVALIDATE_TIMEOUT (e.g. on a stalled network mount), or
+        that are still pending after REVALIDATE_TOTAL_TIMEOUT, are not waited for: they keep the kind they were
+        staged with, if known, and are listed in unverified_paths()."""
+        if self._prefetcher is not None:
+            self._prefetcher.flush() # Batches still waiting for their keys are part of what the user picked
+        paths = self.staging_model.paths()
+        with stage("revalidate", len(paths)):
+            files, dirs, missing, unverified = revalidate_paths(paths, self._path_filter, self.REVALIDATE_TIMEOUT,
+                                                                 total_timeout=self.REVALIDATE_TOTAL_TIMEOUT)
+        if missing:
+            logger.warning("%d path(s) in staging area no longer exist, skipping: %s", len(missing), missing)
+        if unverified:
+            logger.warning("%d path(s) in staging area could not be verified in time: %s", len(unverified), unverified)
+            for p in unverified:
+                is_dir = self._kind_hints.get(p)
+                if is_dir is not None:
+                    (dirs if is_dir else files).append(p)
+        self._unverified = unverified
         return files, dirs
+    def unverified_paths(self) -> list:
+        """Staged paths the last get_result() could not verify before its timeout."""
+        return self._unverified
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
@@ -169,11 +455,13 @@ class FilePickerWidget(QWidget):
 class FilePickerDialog(QDialog):
     """独立窗口壳，解决‘确定/取消’无法关闭问题"""
     picked = Signal(list, list)  # 转发
-    def __init__(self, parent=None):
+    unverified = Signal(list) # Paths get_result could not verify in time; emitted before picked, only if any
+    def __init__(self, parent=None, model: QFileSystemModel = None):
         super().__init__(parent)
         self.setWindowTitle("文件选择器")
         self.resize(900, 700)
-        self.picker = FilePickerWidget(self) # Pass self as parent to the picker
+        self.picker = FilePickerWidget(self, model=model) # Pass self as parent to the picker
+        self._result = ([], [])
         self.btn_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel) # Store btn_box as instance variable
         self.btn_box.accepted.connect(self._forward_and_accept)
         self.btn_box.rejected.connect(self.reject)
@@ -183,20 +471,103 @@ class FilePickerDialog(QDialog):
     def _forward_and_accept(self):
         """Gathers results from the picker, emits the dialog's signal, and accepts the dialog."""
         files, dirs = self.picker.get_result()
+        self._result = (files, dirs) # Read by pick() once the dialog has finished
+        if self.picker.unverified_paths():
+            self.unverified.emit(self.picker.unverified_paths())
         self.picked.emit(files, dirs)
-        print("[FilePickerDialog]: Dialog accepted (explicitly by button).") # Debug print
+        logger.debug("Dialog accepted (explicitly by button).")
         super().accept() # Call the QDialog's accept method directly
     def reject(self):
-        print("[FilePickerDialog]: Dialog rejected (explicitly).") # Debug print
+        logger.debug("Dialog rejected (explicitly).")
         super().reject()
+    def pick(self) -> Future:
+        """Shows the dialog without blocking (QDialog.open(), no nested event loop) and returns a Future that
+        resolves to (files, dirs) on OK and is cancelled on reject, or if the dialog is deleted (e.g. together with
+        its parent) while open. Cancelling the Future closes the dialog.
+        Callbacks run on the GUI thread; from asyncio use pick_async() or asyncio.wrap_future()."""
+        future = Future()
+        alive = [True]
+        def on_destroyed():
+            alive[0] = False # finished never comes; the C++ dialog must not be touched any more
+            future.cancel()
+        def on_finished(result):
+            self.finished.disconnect(on_finished)
+            self.destroyed.disconnect(on_destroyed)
+            if future.done():
+                return # Cancelled by the caller, which is what closed the dialog
+            if result == QDialog.Accepted:
+                future.set_result(self._result)
+            else:
+                future.cancel()
+        def on_done(f):
+            if f.cancelled() and alive[0] and self.isVisible():
+                self.reject()
+        self.finished.connect(on_finished)
+        self.destroyed.connect(on_destroyed)
+        future.add_done_callback(on_done)
+        self.open()
+        return future
+    async def pick_async(self):
+        """Awaitable pick(): returns (files, dirs), raises asyncio.CancelledError on reject. Needs an asyncio event
+        loop running on the Qt event loop (e.g. PySide6.QtAsyncio or qasync)."""
+        import asyncio
+        return await asyncio.wrap_future(self.pick())
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() in (Qt.Key_Return, Qt.Key_Enter):
             if self.picker.line_path.hasFocus():
-                print("[FilePickerDialog]: Enter key pressed in path line edit, calling goto_path.")
+                logger.debug("Enter key pressed in path line edit, calling goto_path.")
                 self.picker.goto_path(self.picker.line_path.text())
                 event.accept() # Crucially, accept the event to prevent it from propagating further
                 return # Stop processing this event
+            if self.picker.line_search.hasFocus():
+                self.picker._search_timer.stop()
+                self.picker._run_search() # Search now and move to the results instead of closing the dialog
+                self.picker.search_results.setFocus()
+                event.accept()
+                return
         super().keyPressEvent(event)
+def acquire_picker_dialog(parent=None) -> FilePickerDialog:
+    """Returns a ready-to-show FilePickerDialog backed by the shared model.
+    The pooled instance is reused (keeping its expanded state, scroll position and location) with an empty
+    staging area; if it is already on screen a throw-away dialog sharing the same model is returned instead.
+    picked connections made by the caller are dropped when the dialog finishes."""
+    if _pooled_dialog is None:
+        warm_up_picker_dialog()
+    dialog = _pooled_dialog
+    if dialog.isVisible():
+        dialog = FilePickerDialog(parent, model=shared_file_system_model())
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+    elif parent is not None:
+        dialog.setParent(parent, dialog.windowFlags()) # Borrow the caller as parent for modality and placement
+    dialog.picker.clear_staging()
+    return dialog
+def warm_up_picker_dialog():
+    """Creates the pooled dialog (and the shared model) ahead of time so the first open is already warm."""
+    global _pooled_dialog
+    if _pooled_dialog is not None:
+        return
+    dialog = _pooled_dialog = FilePickerDialog(model=shared_file_system_model())
+    dialog.finished.connect(_release_pooled_dialog)
+    # The borrowed parent may be deleted while the dialog is open, taking the dialog with it before finished fires
+    dialog.destroyed.connect(lambda: _forget_pooled_dialog(dialog))
+    QApplication.instance().aboutToQuit.connect(_drop_pooled_dialog)
+def _release_pooled_dialog():
+    with warnings.catch_warnings(): # Callers using pick() have no picked slots; PySide6 warns or raises then
+        warnings.simplefilter("ignore", RuntimeWarning)
+        try:
+            _pooled_dialog.picked.disconnect() # Forget the previous caller's slots
+        except RuntimeError:
+            pass
+    _pooled_dialog.setParent(None, _pooled_dialog.windowFlags()) # Don't die with the borrowed parent
+def _forget_pooled_dialog(dialog):
+    global _pooled_dialog
+    if _pooled_dialog is dialog: # A replacement may already have been pooled
+        _pooled_dialog = None
+def _drop_pooled_dialog():
+    global _pooled_dialog
+    if _pooled_dialog is not None:
+        _pooled_dialog.deleteLater()
+        _pooled_dialog = None
 if __name__ == "__main__":
     class MainWindow(QMainWindow):
         def __init__(self):
@@ -216,12 +587,14 @@ if __name__ == "__main__":
             self.open_picker_button.clicked.connect(self._open_file_picker)
         def _open_file_picker(self):
             dialog = FilePickerDialog(self) # Pass self as parent for proper dialog modality
-            dialog.picked.connect(self._handle_picked_result)
-            result = dialog.exec()
-            if result == QDialog.Accepted:
-                print("\n[MainWindow]: 文件选择器对话框已接受。")
-            else:
+            dialog.setAttribute(Qt.WA_DeleteOnClose)
+            dialog.pick().add_done_callback(self._on_pick_done) # Non-blocking: the event loop keeps running
+        def _on_pick_done(self, future):
+            if future.cancelled():
                 print("\n[MainWindow]: 文件选择器对话框已取消。")
+            else:
+                print("\n[MainWindow]: 文件选择器对话框已接受。")
+                self._handle_picked_result(*future.result())
         def _handle_picked_result(self, files: list, dirs: list):
             result_text = "选择结果:\n"
             if files:
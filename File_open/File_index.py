@@ -0,0 +1,177 @@
+# File_index.py
+import bisect
+import os
+import re
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+def _scan_dir(directory: str):
+    """
+    读取单个目录，返回 (目录, [名称...], 各名称是否为目录, [子目录...])。
+    是否为目录与 os.path.isdir 一致（跟随符号链接），但不递归进入目录符号链接。
+    """
+    names, flags, subdirs = [], bytearray(), []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir() # scandir 自带类型，只有符号链接才需要额外 stat
+                    if is_dir and not entry.is_symlink():
+                        subdirs.append(entry.path)
+                except OSError:
+                    is_dir = False
+                names.append(entry.name)
+                flags.append(is_dir)
+    except OSError:
+        pass
+    return directory, names, bytes(flags), subdirs
+
+
+class FileIndex:
+    """
+    文件名索引，不依赖 Qt。
+    按目录保存名称列表（便于增量更新单个目录），查询时使用惰性构建的紧凑结构：
+    所有小写文件名用 "\\n" 连接成一个字符串，配合 array 记录的行首偏移和所属目录编号，
+    子串查询直接用 str.find 在 C 层扫描，百万级条目也只需几毫秒。
+    扫描时顺带记下每个条目是否为目录（每条一个字节），查询可以一并返回，调用方不必再逐个 stat。
+    """
+
+    def __init__(self, max_entries: int = 2_000_000):
+        self.max_entries = max_entries
+        self.truncated = False # 因达到 max_entries 或被取消而没有索引完整
+        self._lock = threading.Lock()
+        self._entries = {} # 目录 -> ([名称...], 各名称是否为目录的 bytes)
+        self._count = 0
+        self._flat = None # 惰性构建的 (blob, starts, dir_ids, dirs, names, is_dir)
+
+    def __len__(self):
+        return self._count
+
+    def directories(self) -> list:
+        with self._lock:
+            return list(self._entries)
+
+    # --- 构建与增量更新 ---
+    def build(self, roots, workers: int = 8, cancel_event: threading.Event = None):
+        """用线程池并行 os.scandir 索引若干根目录（覆盖已有内容）"""
+        cancel_event = cancel_event or threading.Event()
+        entries, count, truncated = {}, 0, False
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {pool.submit(_scan_dir, r) for r in roots if os.path.isdir(r)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    directory, names, flags, subdirs = fut.result()
+                    if truncated or cancel_event.is_set() or count + len(names) > self.max_entries:
+                        truncated = True # 之后完成的目录一律丢弃，保证结果是可预期的子集
+                        continue
+                    entries[directory] = (names, flags)
+                    count += len(names)
+                    pending.update(pool.submit(_scan_dir, d) for d in subdirs if d not in entries)
+                if truncated:
+                    for fut in pending:
+                        fut.cancel()
+                    pending = {f for f in pending if not f.cancelled()}
+        with self._lock:
+            self._entries = entries
+            self._count = count
+            self.truncated = truncated
+            self._flat = None
+
+    def update_directory(self, directory: str) -> list:
+        """重新读取单个目录（例如收到文件系统变更通知时），新出现的子目录会被递归索引；返回新子目录"""
+        _, names, flags, subdirs = _scan_dir(directory)
+        if not os.path.isdir(directory):
+            self.remove_directory(directory)
+            return []
+        with self._lock:
+            old = self._entries.get(directory, ((), b""))[0]
+            self._entries[directory] = (names, flags)
+            self._count += len(names) - len(old)
+            new_dirs = [d for d in subdirs if d not in self._entries]
+            kept = set(names)
+            gone = [d for d in (os.path.join(directory, n) for n in old if n not in kept) if d in self._entries]
+            self._flat = None
+        for d in gone:
+            self.remove_directory(d)
+        for d in new_dirs:
+            self.update_directory(d)
+        return new_dirs
+
+    def remove_directory(self, directory: str):
+        """移除一个目录及其所有子目录的索引"""
+        prefix = directory.rstrip(os.sep) + os.sep
+        with self._lock:
+            doomed = [d for d in self._entries if d == directory or d.startswith(prefix)]
+            for d in doomed:
+                self._count -= len(self._entries.pop(d)[0])
+            if doomed:
+                self._flat = None
+
+    # --- 查询 ---
+    def _flatten(self):
+        """把按目录保存的名称压平成查询用的紧凑结构（有变更后首次查询时构建一次）"""
+        with self._lock:
+            if self._flat is not None:
+                return self._flat
+            dirs, names, dir_ids, starts = [], [], array("I"), array("Q")
+            is_dir = bytearray()
+            pos = 0
+            for dir_id, (directory, (dir_names, flags)) in enumerate(self._entries.items()):
+                dirs.append(directory)
+                is_dir += flags
+                for n in dir_names:
+                    names.append(n)
+                    dir_ids.append(dir_id)
+                    starts.append(pos)
+                    pos += len(n) + 1
+            blob = "\n".join(names).lower() + "\n"
+            if len(blob) != pos: # 少数字符小写后长度会变化（如 "İ"），此时按实际小写结果重新计算偏移
+                lowered = [n.lower() for n in names]
+                starts, pos = array("Q"), 0
+                for n in lowered:
+                    starts.append(pos)
+                    pos += len(n) + 1
+                blob = "\n".join(lowered) + "\n"
+            self._flat = (blob, starts, dir_ids, dirs, names, bytes(is_dir))
+            return self._flat
+
+    def search(self, query: str, limit: int = 200, fuzzy: bool = False, with_kind: bool = False) -> list:
+        """
+        按文件名查询，返回完整路径列表（最多 limit 条）；with_kind=True 时返回 [(路径, 是否为目录)...]。
+        默认为忽略大小写的子串匹配；fuzzy=True 时按顺序包含查询中的各字符即可，匹配越紧凑越靠前。
+        """
+        query = query.strip().lower()
+        if not query or "\n" in query:
+            return []
+        blob, starts, dir_ids, dirs, names, is_dir = self._flatten()
+
+        def result(line):
+            path = os.path.join(dirs[dir_ids[line]], names[line])
+            return (path, bool(is_dir[line])) if with_kind else path
+
+        if not fuzzy:
+            results, pos = [], blob.find(query)
+            while pos != -1 and len(results) < limit:
+                results.append(result(bisect.bisect_right(starts, pos) - 1))
+                pos = blob.find("\n", pos) # 同一行只计一次
+                pos = blob.find(query, pos)
+            return results
+        pattern = re.compile("[^\\n]*?".join(re.escape(c) for c in query))
+        candidates = []
+        for m in pattern.finditer(blob):
+            candidates.append((m.end() - m.start(), m.start()))
+            if len(candidates) >= limit * 5:
+                break
+        candidates.sort()
+        seen, results = set(), []
+        for _, offset in candidates:
+            line = bisect.bisect_right(starts, offset) - 1
+            if line not in seen:
+                seen.add(line)
+                results.append(result(line))
+                if len(results) >= limit:
+                    break
+        return results
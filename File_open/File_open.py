@@ -1,25 +1,46 @@
 # File_open.py
 import sys
+from concurrent.futures import Future
 from pathlib import Path
 from PySide6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLabel, QMainWindow,)
-from PySide6.QtCore import Signal
-from .File_dialog import FilePickerDialog
+from PySide6.QtCore import Signal, QTimer
 from .Drop_receiver import DropReceiverWidget, DropMode
+from .Selection_store import SelectionSnapshot
+from .Selection_session import save_selection, load_selection
+from .Instrumentation import stage, stage_start, stage_end
 
 class FileOpenWidget(QWidget):
-    picked = Signal(list, list) # 最终选中的文件和目录列表
-
-    def __init__(self, parent=None):
+    # 列表类信号声明为 object，与 DropReceiverWidget 一样原样传递 Python 列表，不逐项转换
+    picked = Signal(object, object) # 最终选中的文件和目录列表（list，每次发出新的列表）
+    items_added = Signal(object, object) # 增量信号：本次新增的文件和目录（在 picked 之前发出）
+    items_removed = Signal(object, object) # 增量信号：本次移除的文件和目录（在 picked 之前发出）
+    selection_reset = Signal(int) # 选择被整体替换（恢复会话），代替增量信号；参数为新的选择代数（在 picked 之前发出）
+    files_expanded = Signal(list) # 目录展开模式：一块展开得到的文件
+    expansion_progress = Signal(int, object) # 目录展开模式：已展开的文件数、字节数（object：可能超过 2 GiB）
+    expansion_finished = Signal(bool) # 目录展开模式：一个目录的展开结束（每个目录一次），True 表示被截断
+    duplicates_found = Signal(list) # 重复检测：内容相同的文件分组（每组第一个为保留项），没有重复时为空列表
+    disk_changes = Signal(list, list) # 监视模式：磁盘上已删除的路径、[(旧路径, 新路径)...]（在更新后的 picked 之前发出）
+    history_changed = Signal(bool, bool) # 撤销历史变化：是否可撤销、是否可重做
+    unverified = Signal(list) # 对话框确定时未能在超时内校验的路径（按原来的类型保留在结果中），在 picked 之前发出
+
+    def __init__(self, parent=None, use_list_view: bool = False, compact_paths: bool = False, prewarm_dialog: bool = False):
         super().__init__(parent)
+        self._use_list_view = use_list_view # 大量条目时使用虚拟化的列表视图显示
+        self._compact_paths = compact_paths # 上百万条目时以共享父目录前缀的紧凑形式存储选择
         self._build_ui()
         self._connect_signals()
 
-        # 用于存储 DropReceiverWidget 和 FilePickerDialog 整合后的最终结果
-        self._final_selected_files = []
-        self._final_selected_dirs = []
+        # DropReceiverWidget 和 FilePickerDialog 整合后的最终结果，与 DropReceiverWidget 共享同一个存储
+        self._selection = self.drop_receiver.selection_store()
+
+        # 重复检测（默认关闭，首次开启时才创建后台检查器）
+        self._duplicate_checker = None
+        self._remove_duplicates = False
 
-        # 初始化 DropReceiverWidget 显示
-        self._update_drop_receiver_display()
+        # prewarm_dialog=True 时，空闲时（首帧之后）再导入并预热进程内共享的文件选择对话框，首次点击即可立即打开；
+        # 默认不预热，不用对话框的程序不必为它付出内存和文件系统模型的监视线程
+        if prewarm_dialog:
+            QTimer.singleShot(0, self.warm_up_dialog)
 
     def _build_ui(self):
         main_layout = QVBoxLayout(self)
@@ -27,7 +48,7 @@ class FileOpenWidget(QWidget):
         main_layout.setSpacing(0)
 
         # 顶部是 DropReceiverWidget
-        self.drop_receiver = DropReceiverWidget()
+        self.drop_receiver = DropReceiverWidget(use_list_view=self._use_list_view, compact_paths=self._compact_paths)
         main_layout.addWidget(self.drop_receiver)
 
     def _connect_signals(self):
@@ -37,62 +58,105 @@ class FileOpenWidget(QWidget):
         # 连接 DropReceiverWidget 的 dropped 信号，以同步内部状态和转发
         self.drop_receiver.dropped.connect(self._on_drop_receiver_dropped)
 
+        # 增量信号直接转发（拖放、清除和对话框结果引起的变化都会经过 DropReceiverWidget）
+        self.drop_receiver.items_added.connect(self.items_added)
+        self.drop_receiver.items_removed.connect(self.items_removed)
+        self.drop_receiver.selection_reset.connect(self.selection_reset)
+        self.drop_receiver.files_expanded.connect(self.files_expanded)
+        self.drop_receiver.expansion_progress.connect(self.expansion_progress)
+        self.drop_receiver.expansion_finished.connect(self.expansion_finished)
+        self.drop_receiver.disk_changes.connect(self._on_disk_changes)
+        self.drop_receiver.history_changed.connect(self.history_changed)
+
+        # 有文件加入选择时，在重复检测开启的情况下重新检查
+        self.drop_receiver.items_added.connect(self._on_items_added)
+        self.drop_receiver.selection_reset.connect(lambda _: self.find_duplicates())
+
+    @staticmethod
+    def warm_up_dialog():
+        """提前创建进程内共享的文件选择对话框（及其文件系统模型），之后首次打开无需等待；已创建时什么也不做"""
+        from .File_dialog import warm_up_picker_dialog # 对话框相关模块较重，推迟到首次使用时导入
+        warm_up_picker_dialog()
+
     def _open_file_dialog(self):
-        """打开文件选择对话框，并处理其返回结果"""
-        dialog = FilePickerDialog(self) # 以此widget为父级
+        """点击拖放区：以非阻塞方式打开文件选择对话框，结果在确定时通过 picked 发出"""
+        self.pick()
+
+    def pick(self) -> Future:
+        """
+        以非阻塞方式打开文件选择对话框（不运行嵌套事件循环，其他工作照常进行），返回 concurrent.futures.Future。
+        确定时按当前模式更新选择、发出 picked，并以更新后的 (files, dirs) 完成；取消对话框时 Future 被取消。
+        取消 Future 会关闭对话框。回调在 GUI 线程中执行；在 asyncio 中可使用 pick_async()。
+        """
+        from .File_dialog import acquire_picker_dialog
+        started = stage_start()
+        dialog = acquire_picker_dialog(self) # 复用进程内共享的对话框（保留目录缓存、展开状态和滚动位置），以此widget为父级
 
         # 预加载当前 FileOpenWidget 维护的最终文件列表到 FilePickerDialog 的暂存区
-        # 注意：这里需要访问 dialog.picker (FilePickerWidget实例) 来调用其 add_to_staging 方法
-        for f_path in self._final_selected_files:
-            dialog.picker.add_to_staging(f_path)
-        for d_path in self._final_selected_dirs:
-            dialog.picker.add_to_staging(d_path)
-
-        # 连接对话框的picked信号，处理其返回结果
-        dialog.picked.connect(self._on_file_dialog_picked_result)
-
-        dialog.exec() # 以模态方式运行对话框
+        # 一次批量插入；这些路径已经识别过，点击确定时 get_result 还会再校验，这里不必逐个检查存在性，
+        # 同时记下已知的类型，校验超时（例如网络挂载卡住）时按原类型保留
+        dialog.picker.set_path_filter(self.drop_receiver.get_path_filter()) # 共享对话框：每次打开都同步本组件的过滤条件
+        dialog.picker.set_canonicalize(self.drop_receiver.get_canonicalize())
+        dialog.picker.add_many_to_staging(self._selection.files, validate=False, is_dir=False)
+        dialog.picker.add_many_to_staging(self._selection.dirs, validate=False, is_dir=True)
+
+        # 对话框结束时处理其返回结果
+        dialog.unverified.connect(self.unverified)
+        result = Future()
+        dialog_gone = []
+
+        def on_dialog_destroyed():
+            # 对话框随借用的父级（即本组件）一起被删除：连接已随之断开，之后不能再碰它
+            dialog_gone.append(True)
+
+        def on_dialog_done(dialog_future: Future):
+            if not dialog_gone:
+                dialog.unverified.disconnect(self.unverified)
+                dialog.destroyed.disconnect(on_dialog_destroyed)
+            if dialog_future.cancelled():
+                result.cancel()
+                return
+            self._on_file_dialog_picked_result(*dialog_future.result())
+            # 规范路径去重开启时结果在后台解析规范键后才并入选择
+            self.drop_receiver.when_applied(lambda: result.done() or result.set_result(self.get_current_selection()))
+
+        dialog.destroyed.connect(on_dialog_destroyed) # 先于 dialog.pick() 的连接，Future 被取消时已经知道对话框没了
+        dialog_future = dialog.pick() # 窗口模态地显示，立即返回
+        dialog_future.add_done_callback(on_dialog_done)
+        result.add_done_callback(lambda f: f.cancelled() and dialog_future.cancel())
+        stage_end("dialog_ready", started, len(self._selection))
+        return result
+
+    async def pick_async(self) -> tuple[list, list]:
+        """
+        可 await 的 pick()：返回确定后的 (files, dirs)，取消对话框时抛出 asyncio.CancelledError；
+        需要运行在 Qt 事件循环上的 asyncio 事件循环（例如 PySide6.QtAsyncio 或 qasync）。
+        """
+        import asyncio
+        return await asyncio.wrap_future(self.pick())
 
     def _on_file_dialog_picked_result(self, files: list, dirs: list):
-        """处理 FilePickerDialog 返回的结果，并同步到 _final_selected_files/_dirs"""
+        """处理 FilePickerDialog 返回的结果，并同步到共享的选择存储"""
         current_mode = self.drop_receiver.get_mode()
 
+        # 通过 DropReceiverWidget 更新共享存储，同时刷新其显示（去重和排序由存储完成）
         if current_mode == DropMode.ONE_SHOT:
-            self._final_selected_files = files
-            self._final_selected_dirs = dirs
+            self.drop_receiver.set_items(files, dirs)
         elif current_mode == DropMode.ACCUMULATE:
-            # 避免重复添加
-            for f in files:
-                if f not in self._final_selected_files:
-                    self._final_selected_files.append(f)
-            for d in dirs:
-                if d not in self._final_selected_dirs:
-                    self._final_selected_dirs.append(d)
+            self.drop_receiver.add_items(files, dirs)
 
-        # 始终排序以保持显示一致性
-        self._final_selected_files.sort()
-        self._final_selected_dirs.sort()
+        # 结果并入选择之后发出 FileOpenWidget 自己的 picked 信号
+        self.drop_receiver.when_applied(self._emit_picked)
 
-        # 更新 DropReceiverWidget 的显示，使其反映最终结果
-        self._update_drop_receiver_display()
-        # 发出 FileOpenWidget 自己的 picked 信号
-        self.picked.emit(self._final_selected_files, self._final_selected_dirs)
+    def _emit_picked(self):
+        with stage("signal_emit", len(self._selection)):
+            self.picked.emit(list(self._selection.files), list(self._selection.dirs))
 
 
     def _on_drop_receiver_dropped(self, files: list, dirs: list):
-        """当 DropReceiverWidget 内部状态改变时（例如外部拖放或清除），同步到 _final_selected_files/_dirs 并发出信号"""
-        # DropReceiverWidget 的 dropped 信号已经包含了根据其模式处理后的完整列表
-        # 所以直接用它的结果更新 _final_selected_files/_dirs
-        self._final_selected_files = files
-        self._final_selected_dirs = dirs
-        # 更新 DropReceiverWidget 的显示（尽管它自己已经更新，这里是确保一致性）
-        self._update_drop_receiver_display()
-        # 转发 FileOpenWidget 自己的 picked 信号
-        self.picked.emit(self._final_selected_files, self._final_selected_dirs)
-
-    def _update_drop_receiver_display(self):
-        """更新 DropReceiverWidget 的显示内容，使其与 _final_selected_files/_dirs 同步"""
-        self.drop_receiver.set_items(self._final_selected_files, self._final_selected_dirs)
+        """当 DropReceiverWidget 内部状态改变时（例如外部拖放或清除），转发 picked 信号"""
+        # 存储是共享的，DropReceiverWidget 已经更新了它和自己的显示，这里无需再同步列表
+        self.picked.emit(files, dirs)
 
 
     # --- 外部集成接口 ---
@@ -104,15 +168,138 @@ class FileOpenWidget(QWidget):
         """获取当前拖放接收模式"""
         return self.drop_receiver.get_mode()
 
+    def set_expand_dirs(self, enabled: bool, max_depth=None, max_items=100_000, max_bytes=None):
+        """开启/关闭目录展开模式：拖放或对话框选中的目录在后台递归展开，文件通过 files_expanded 分块发出"""
+        self.drop_receiver.set_expand_dirs(enabled, max_depth, max_items, max_bytes)
+
+    def set_path_filter(self, path_filter):
+        """设置 PathFilter（None 表示不过滤），同时作用于拖放识别、目录展开和文件选择对话框"""
+        self.drop_receiver.set_path_filter(path_filter)
+
+    def set_canonicalize(self, enabled: bool):
+        """
+        开启/关闭规范路径去重：经由符号链接、".." 或不同大小写指向同一对象的路径在选择和对话框暂存区中只保留一个，
+        选择的同一性按规范键判断，显示和发出的仍是用户给出的路径。规范键在后台解析，
+        开启后对话框结果、恢复的会话等要等解析完成才并入选择，随后才发出 picked。
+        """
+        self.drop_receiver.set_canonicalize(enabled)
+
+    def set_watch_selection(self, enabled: bool, max_watched: int = 1000):
+        """
+        开启/关闭监视模式：选中的条目在磁盘上被删除或改名时，选择随之增量更新（items_removed/items_added），
+        随后发出 disk_changes 和更新后的 picked，使用方无需自行重新检查整个列表。
+        为了不超出系统的监视数量限制，监视的是条目的父目录，最多 max_watched 个。
+        """
+        self.drop_receiver.set_watch_selection(enabled, max_watched)
+
+    def _on_disk_changes(self, removed: list, renamed: list):
+        self.disk_changes.emit(removed, renamed)
+        self.picked.emit(list(self._selection.files), list(self._selection.dirs))
+
+    def undo(self) -> bool:
+        """
+        撤销最近一次选择变化（拖放、清除、对话框结果、恢复会话等都各算一步），发出增量信号和更新后的 picked；
+        没有可撤销的步骤时返回 False。焦点在拖放区内时 Ctrl+Z/Ctrl+Shift+Z 同样可用。
+        """
+        return self.drop_receiver.undo() # 经由 dropped 转发 picked
+
+    def redo(self) -> bool:
+        """重做最近撤销的一步；没有可重做的步骤时返回 False"""
+        return self.drop_receiver.redo()
+
+    def can_undo(self) -> bool:
+        return self.drop_receiver.can_undo()
+
+    def can_redo(self) -> bool:
+        return self.drop_receiver.can_redo()
+
+    def set_undo_depth(self, depth: int):
+        """
+        设置撤销历史最多保留的步数（默认 20，0 表示不记录）。每一步只保存该次变化的增量，路径字符串与选择共享，
+        大选择保留多步历史也不会成倍占用内存；但清除一个大选择的那一步会一直持有被清除的路径，直到它被挤出历史。
+        """
+        self.drop_receiver.set_history_depth(depth)
+
+    def cancel_expansion(self):
+        """取消所有未完成的目录展开，每个被取消的目录发出 expansion_finished(True)"""
+        self.drop_receiver.cancel_expansion()
+
+    def set_duplicate_detection(self, enabled: bool, auto_remove: bool = False):
+        """
+        开启/关闭重复检测：每次有文件加入选择后在后台按大小、前部摘要、完整摘要依次比较，
+        结果通过 duplicates_found 发出；auto_remove=True 时每组只保留第一个文件，
+        其余从选择中移除（发出 items_removed，随后以更新后的选择再次发出 picked）。
+        """
+        self._remove_duplicates = auto_remove
+        if enabled:
+            if self._duplicate_checker is None:
+                from .Duplicate_checker import DuplicateChecker # 会导入 multiprocessing 等，默认关闭时不必加载
+                self._duplicate_checker = DuplicateChecker(self)
+                self._duplicate_checker.duplicates_found.connect(self._on_duplicates_found)
+            self.find_duplicates()
+        elif self._duplicate_checker is not None:
+            self._duplicate_checker.duplicates_found.disconnect(self._on_duplicates_found)
+            self._duplicate_checker.shutdown()
+            self._duplicate_checker.deleteLater()
+            self._duplicate_checker = None
+
+    def find_duplicates(self):
+        """对当前选择的文件立即发起一次重复检查（需先开启重复检测）"""
+        if self._duplicate_checker is not None and len(self._selection.files) > 1:
+            self._duplicate_checker.check(self._selection.files.as_list())
+
+    def _on_items_added(self, files: list, dirs: list):
+        if files:
+            self.find_duplicates()
+
+    def _on_duplicates_found(self, groups: list):
+        groups = [[p for p in g if p in self._selection.files] for g in groups] # 检查期间可能有文件被移出
+        groups = [g for g in groups if len(g) > 1]
+        if groups and self._remove_duplicates:
+            self.drop_receiver.remove_items([p for g in groups for p in g[1:]], [])
+            self.drop_receiver.when_applied(self._emit_picked)
+        self.duplicates_found.emit(groups)
+
     def clear_all_items(self):
         """清除所有已选择/拖放的文件和目录"""
         # 调用 drop_receiver 的清除方法，它会更新其内部状态并发出 dropped 信号，
-        # 进而触发 _on_drop_receiver_dropped 来更新 _final_selected_files/_dirs 并发出 picked 信号。
+        # 进而触发 _on_drop_receiver_dropped 发出 picked 信号。
         self.drop_receiver.clear_dropped_items()
 
+    def selection_generation(self) -> int:
+        """返回当前选择代数（单调递增），轮询时可据此跳过未变化的情况"""
+        return self._selection.generation
+
     def get_current_selection(self) -> tuple[list, list]:
-        """获取当前最终选择的文件和目录"""
-        return list(self._final_selected_files), list(self._final_selected_dirs)
+        """获取当前最终选择的文件和目录（每次调用都复制为新列表，频繁轮询请用 get_snapshot()）"""
+        return list(self._selection.files), list(self._selection.dirs)
+
+    def save_session(self, path: str):
+        """把当前选择保存到 path（紧凑的二进制格式，见 Selection_session），原子替换已有文件"""
+        snapshot = self._selection.snapshot()
+        save_selection(path, snapshot.files, snapshot.dirs, presorted=True)
+
+    def restore_session(self, path: str, revalidate: bool = True):
+        """
+        从 save_session() 保存的文件恢复选择（替换当前选择，与模式无关），发出一次 selection_reset（不发出逐项的增量信号）
+        和一次 picked。文件中的路径已排序，恢复时不重新排序、也不逐个检查路径；百万条目约需 0.7 秒
+        （compact_paths=True 时拆分路径另需约半秒）。大选择请用 use_list_view=True，QLabel 显示模式只列出前
+        DropReceiverWidget.LABEL_MAX_ITEMS 项。revalidate=True 时随后在后台核对，
+        已不存在的条目被移除、类型变化的条目被更正，并通过 disk_changes 和更新后的 picked 通知。
+        文件不存在时抛出 OSError，格式不符时抛出 ValueError。
+        """
+        files, dirs = load_selection(path)
+        self.drop_receiver.load_items(files, dirs)
+        self.drop_receiver.when_applied(self._emit_picked)
+        if revalidate:
+            self.drop_receiver.revalidate_items()
+
+    def get_snapshot(self) -> SelectionSnapshot:
+        """
+        获取当前选择的不可变快照 SelectionSnapshot(files, dirs, generation)。
+        选择未变化时返回同一个对象，不分配也不复制；轮询方可以只比较 generation 来跳过处理。
+        """
+        return self._selection.snapshot()
 
 
 # --- 独立运行演示 ---
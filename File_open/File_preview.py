@@ -0,0 +1,208 @@
+#File_preview
+import hashlib
+import os
+import stat
+from collections import OrderedDict
+from typing import NamedTuple
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, QSize, Signal
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPlainTextEdit, QStackedWidget, QSizePolicy
+class Preview(NamedTuple):
+    kind: str # "image", "text" or "info"
+    data: object # QImage for "image", the leading lines for "text", None for "info"
+    info: str # One-line description shown under the preview
+    cost: int # Approximate bytes held, used to bound the memory cache
+def _human_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+def _info(text: str) -> Preview:
+    return Preview("info", None, text, len(text) * 2)
+class _PreviewSignals(QObject):
+    ready = Signal(str, object, object) # path, (path, mtime_ns, size) or None, Preview (None: unchanged since known)
+class _PreviewTask(QRunnable):
+    def __init__(self, path: str, known_key, loader: "PreviewLoader"):
+        super().__init__()
+        self._path = path
+        self._known_key = known_key
+        self._max_side = loader.max_side
+        self._text_lines = loader.text_lines
+        self._text_bytes = loader.text_bytes
+        self._image_suffixes = loader.image_suffixes
+        self._disk_dir = loader.disk_cache_dir
+        self._signals = loader._signals
+    def run(self):
+        try:
+            st = os.stat(self._path)
+        except (OSError, ValueError) as e:
+            self._signals.ready.emit(self._path, None, _info(f"无法读取：{e}"))
+            return
+        key = (self._path, st.st_mtime_ns, st.st_size)
+        if key == self._known_key:
+            self._signals.ready.emit(self._path, key, None) # Cached preview is still current, skip decoding
+            return
+        try:
+            preview = self._decode(key, st)
+        except OSError as e:
+            preview = _info(f"无法读取：{e}")
+        self._signals.ready.emit(self._path, key, preview)
+    def _decode(self, key, st) -> Preview:
+        if stat.S_ISDIR(st.st_mode):
+            with os.scandir(self._path) as it:
+                count = sum(1 for _ in it)
+            return _info(f"目录，{count} 项")
+        suffix = os.path.splitext(self._path)[1][1:].lower()
+        if suffix in self._image_suffixes:
+            preview = self._decode_image(key, st)
+            if preview is not None:
+                return preview
+        with open(self._path, "rb") as f:
+            head = f.read(self._text_bytes)
+        if b"\0" in head:
+            return _info(f"二进制文件，{_human_size(st.st_size)}")
+        lines = head.decode("utf-8", "replace").splitlines()[:self._text_lines]
+        text = "\n".join(lines)
+        return Preview("text", text, f"文本，{_human_size(st.st_size)}", len(text) * 2)
+    def _decode_image(self, key, st):
+        cached_file = None
+        if self._disk_dir:
+            digest = hashlib.sha1("\0".join(map(str, key)).encode("utf-8", "surrogatepass")).hexdigest()
+            cached_file = os.path.join(self._disk_dir, digest + ".png")
+            image = QImage(cached_file)
+            if not image.isNull():
+                return Preview("image", image, f"图片，{_human_size(st.st_size)}", image.sizeInBytes())
+        reader = QImageReader(self._path)
+        reader.setAutoTransform(True) # Honour EXIF orientation
+        full = reader.size()
+        downscaled = full.isValid() and max(full.width(), full.height()) > self._max_side
+        if downscaled:
+            # Decoders such as JPEG can downscale while decoding, far cheaper than decoding then scaling
+            reader.setScaledSize(full.scaled(QSize(self._max_side, self._max_side), Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return None # Unreadable as an image; shown as text/binary instead
+        if max(image.width(), image.height()) > self._max_side: # Formats that ignore setScaledSize
+            image = image.scaled(self._max_side, self._max_side, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        dims = f"{full.width()}×{full.height()}，" if full.isValid() else ""
+        if cached_file is not None and downscaled: # Small images decode about as fast as their cached PNG would
+            try:
+                os.makedirs(self._disk_dir, exist_ok=True)
+                tmp = f"{cached_file}.tmp{os.getpid()}"
+                if image.save(tmp, "PNG"):
+                    os.replace(tmp, cached_file)
+            except OSError:
+                pass # The disk cache is best-effort
+        return Preview("image", image, f"图片，{dims}{_human_size(st.st_size)}", image.sizeInBytes())
+class PreviewLoader(QObject):
+    """Decodes previews (image thumbnails, the first lines of text files, directory entry counts) on its own worker
+    pool. Results are kept in an LRU cache bounded by max_bytes and keyed by path, each entry remembering the
+    (path, mtime_ns, size) it was decoded from; a cached preview is handed out immediately and re-checked by one
+    background stat, so an edited file is decoded again. Image thumbnails can additionally be cached as PNG files
+    in disk_cache_dir under the same key. Nothing here touches the disk on the GUI thread.
+    request() drops queued requests that have not started, so only the latest few are decoded while scrolling."""
+    preview_ready = Signal(str, object) # path, Preview
+    def __init__(self, parent=None, max_bytes: int = 64 * 2**20, disk_cache_dir: str = None, max_side: int = 256):
+        super().__init__(parent)
+        self.max_bytes = max_bytes
+        self.disk_cache_dir = disk_cache_dir
+        self.max_side = max_side
+        self.text_lines = 40
+        self.text_bytes = 16 * 1024
+        self.image_suffixes = frozenset(bytes(f).decode().lower() for f in QImageReader.supportedImageFormats())
+        self._cache = OrderedDict() # path -> ((path, mtime_ns, size), Preview), least recently used first
+        self._cached_bytes = 0
+        self._pool = QThreadPool(self) # Own pool: a slow mount or a huge image must not starve the global one
+        self._pool.setMaxThreadCount(2)
+        self._signals = _PreviewSignals(self)
+        self._signals.ready.connect(self._on_ready)
+    def cached(self, path: str):
+        """The cached Preview for path (possibly stale until the next request() re-checks it), or None."""
+        entry = self._cache.get(path)
+        if entry is None:
+            return None
+        self._cache.move_to_end(path)
+        return entry[1]
+    def request(self, path: str):
+        """Queues a background check/decode of path; preview_ready follows unless the cached preview is current."""
+        self._pool.clear() # Forget requests for items the user has already scrolled past
+        entry = self._cache.get(path)
+        self._pool.start(_PreviewTask(path, entry[0] if entry else None, self))
+    def clear_cache(self):
+        self._cache.clear()
+        self._cached_bytes = 0
+    def _on_ready(self, path: str, key, preview):
+        if preview is None:
+            return
+        old = self._cache.pop(path, None)
+        if old is not None:
+            self._cached_bytes -= old[1].cost
+        if key is not None: # Not cached when the stat failed: the next request tries again
+            self._cache[path] = (key, preview)
+            self._cached_bytes += preview.cost
+            while self._cached_bytes > self.max_bytes and len(self._cache) > 1:
+                _, (_, evicted) = self._cache.popitem(last=False)
+                self._cached_bytes -= evicted.cost
+        self.preview_ready.emit(path, preview)
+class PreviewPane(QWidget):
+    """Shows the preview of one path: a thumbnail, the first lines of a text file, or a short description.
+    show_path() only reads the loader's cache and queues work (debounced by DELAY ms), so it is cheap to call on
+    every current-item change while scrolling."""
+    DELAY = 80 # ms the current item must stay put before its preview is requested
+    def __init__(self, parent=None, loader: PreviewLoader = None):
+        super().__init__(parent)
+        self.loader = loader if loader is not None else PreviewLoader(self)
+        self.loader.preview_ready.connect(self._on_preview_ready)
+        self._path = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DELAY)
+        self._timer.timeout.connect(lambda: self._path and self.loader.request(self._path))
+        lay = QVBoxLayout(self)
+        lay.setContentsMargins(0, 0, 0, 0)
+        self.stack = QStackedWidget()
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignCenter)
+        self.image_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+        self.text_view = QPlainTextEdit()
+        self.text_view.setReadOnly(True)
+        self.text_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.stack.addWidget(self.image_label)
+        self.stack.addWidget(self.text_view)
+        lay.addWidget(self.stack, 1)
+        self.info_label = QLabel()
+        self.info_label.setWordWrap(True)
+        self.info_label.setStyleSheet("color: gray;")
+        lay.addWidget(self.info_label)
+    def show_path(self, path: str):
+        if path == self._path:
+            return
+        self._path = path
+        if not path:
+            self._timer.stop()
+            self._show(None)
+            return
+        self._show(self.loader.cached(path)) # Instant for items seen before; refreshed if the file changed
+        self._timer.start()
+    def current_path(self):
+        return self._path
+    def _on_preview_ready(self, path: str, preview: Preview):
+        if path == self._path:
+            self._show(preview)
+    def _show(self, preview):
+        if preview is None:
+            self.image_label.clear()
+            self.stack.setCurrentWidget(self.image_label)
+            self.info_label.setText(os.path.basename(self._path) if self._path else "")
+        elif preview.kind == "image":
+            self.image_label.setPixmap(QPixmap.fromImage(preview.data)) # Thumbnails are small, conversion is cheap
+            self.stack.setCurrentWidget(self.image_label)
+            self.info_label.setText(preview.info)
+        elif preview.kind == "text":
+            self.text_view.setPlainText(preview.data)
+            self.stack.setCurrentWidget(self.text_view)
+            self.info_label.setText(preview.info)
+        else:
+            self.image_label.clear()
+            self.stack.setCurrentWidget(self.image_label)
+            self.info_label.setText(preview.info)
@@ -0,0 +1,97 @@
+#File_search
+import threading
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, QFileSystemWatcher, Signal
+from .File_index import FileIndex
+class _IndexSignals(QObject):
+    built = Signal(int) # generation
+    updated = Signal(int, list) # generation, newly discovered directories
+class _BuildTask(QRunnable):
+    def __init__(self, index: FileIndex, roots: list, generation: int, cancel_event: threading.Event, signals: _IndexSignals):
+        super().__init__()
+        self._index, self._roots, self._generation = index, roots, generation
+        self._cancel_event, self._signals = cancel_event, signals
+    def run(self):
+        self._index.build(self._roots, cancel_event=self._cancel_event)
+        self._signals.built.emit(self._generation)
+class _UpdateTask(QRunnable):
+    def __init__(self, index: FileIndex, dirs: list, generation: int, signals: _IndexSignals):
+        super().__init__()
+        self._index, self._dirs, self._generation, self._signals = index, dirs, generation, signals
+    def run(self):
+        new_dirs = []
+        for d in self._dirs:
+            new_dirs.extend(self._index.update_directory(d))
+        self._signals.updated.emit(self._generation, new_dirs)
+class FileSearchService(QObject):
+    """Keeps a FileIndex of some root directories up to date in the background.
+    The index is built with parallel os.scandir workers; afterwards up to max_watched directories (shallowest
+    first, to stay within OS watch limits) are watched and change notifications are coalesced and applied per
+    directory. search() runs on the caller's thread and only touches the compact in-memory index."""
+    index_ready = Signal(int) # Number of indexed entries, after a (re)build
+    index_updated = Signal() # After incremental updates were applied
+    def __init__(self, parent=None, max_watched: int = 1000):
+        super().__init__(parent)
+        self._index = FileIndex()
+        self._roots = []
+        self._generation = 0
+        self._ready = False
+        self._cancel_event = threading.Event()
+        self._max_watched = max_watched
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1) # Builds/updates are serialized; the build itself fans out to scandir threads
+        self._signals = _IndexSignals(self)
+        self._signals.built.connect(self._on_built)
+        self._signals.updated.connect(self._on_updated)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._changed = set()
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(300)
+        self._debounce.timeout.connect(self._flush_changes)
+    def set_roots(self, roots: list):
+        """(Re)builds the index for these root directories in the background."""
+        roots = list(dict.fromkeys(roots))
+        if roots == self._roots and (self._ready or self._pool.activeThreadCount()):
+            return
+        self._roots = roots
+        self._cancel_event.set()
+        self._cancel_event = threading.Event()
+        self._generation += 1
+        self._ready = False
+        self._changed.clear()
+        watched = self._watcher.directories()
+        if watched:
+            self._watcher.removePaths(watched)
+        self._pool.start(_BuildTask(self._index, roots, self._generation, self._cancel_event, self._signals))
+    def roots(self) -> list:
+        return list(self._roots)
+    def is_ready(self) -> bool:
+        return self._ready
+    def search(self, query: str, limit: int = 200, fuzzy: bool = False, with_kind: bool = False) -> list:
+        """Paths matching query, or (path, is_dir) pairs with with_kind (kinds as recorded by the index scan)."""
+        return self._index.search(query, limit, fuzzy, with_kind) if self._ready else []
+    def _watch(self, dirs):
+        room = self._max_watched - len(self._watcher.directories())
+        if room > 0:
+            dirs = sorted(dirs, key=lambda d: d.count("/") + d.count("\\"))[:room] # Shallowest first
+            if dirs:
+                self._watcher.addPaths(dirs)
+    def _on_built(self, generation: int):
+        if generation != self._generation:
+            return
+        self._ready = True
+        self._watch(self._index.directories())
+        self.index_ready.emit(len(self._index))
+    def _on_directory_changed(self, path: str):
+        self._changed.add(path)
+        self._debounce.start() # Coalesce bursts (e.g. a large copy) into one update pass
+    def _flush_changes(self):
+        if self._changed and self._ready:
+            dirs, self._changed = sorted(self._changed), set()
+            self._pool.start(_UpdateTask(self._index, dirs, self._generation, self._signals))
+    def _on_updated(self, generation: int, new_dirs: list):
+        if generation != self._generation:
+            return
+        self._watch(new_dirs)
+        self.index_updated.emit()
@@ -0,0 +1,244 @@
+#File_tree
+import os
+import threading
+import time
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, QSortFilterProxyModel, QTimer, QLocale, Signal
+from PySide6.QtWidgets import QFileSystemModel
+from .Stat_cache import StatCache, dir_size
+SIZE_COLUMN = 1 # QFileSystemModel's Size column; directories get their recursive size here when enabled
+class _DirSizeSignals(QObject):
+    sized = Signal(int, str, object) # generation, directory, recursive size in bytes (None: unknown/too large)
+class _DirSizeTask(QRunnable):
+    def __init__(self, generation: int, dirs: list, cache: StatCache, cancel_event: threading.Event,
+                 signals: _DirSizeSignals):
+        super().__init__()
+        self._generation, self._dirs, self._cache = generation, dirs, cache
+        self._cancel_event, self._signals = cancel_event, signals
+    def run(self):
+        for d in self._dirs:
+            size = dir_size(d, self._cache, self._cancel_event, FileTreeProxyModel.DIR_SIZE_MAX_ENTRIES)
+            if self._cancel_event.is_set():
+                return
+            self._signals.sized.emit(self._generation, d, size) # One by one, small directories show up first
+class FileTreeProxyModel(QSortFilterProxyModel):
+    """Filters hidden entries, and files not matching set_name_filter(), on top of a QFileSystemModel that always
+    loads everything. Changing either only re-runs the row filter over already-loaded nodes; nothing is rescanned,
+    and the source model (possibly shared with other pickers) is left alone.
+    Sorting is delegated to the source model so its directories-first ordering is kept, except when sorting by
+    size with recursive directory sizes enabled: then the proxy sorts using the sizes it already knows.
+    Directory sizes are only requested for rows the view actually paints and computed on a worker thread; the
+    sizes already shown are kept for sorting and scrolling back, and each directory's own listing is kept in a
+    StatCache keyed by (dev, inode, mtime), so a recount after a change only re-reads directories that changed.
+    Walks stay on the directory's own filesystem and give up after DIR_SIZE_MAX_ENTRIES entries (shown as "—")."""
+    DIR_SIZE_MAX_ENTRIES = 500_000
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._show_hidden = False
+        self._pinned = "" # Ancestors of this path stay visible even when hidden (e.g. navigating into ~/.config)
+        self._name_filter = None # Callable(file name) -> bool; directories are never hidden by it
+        self._dir_sizes_enabled = False
+        self._proxy_sorted = False # True while the proxy (not the source) orders the rows
+        self._stat_cache = StatCache()
+        self._dir_sizes = {} # directory -> recursive size (None: unknown), for display and sorting without any I/O
+        self._requested = set() # Directories queued or being sized
+        self._queue = []
+        self._generation = 0
+        self._cancel_event = threading.Event()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1) # One walker at a time, the disk is the bottleneck anyway
+        self._size_signals = _DirSizeSignals(self)
+        self._size_signals.sized.connect(self._on_sized)
+        self._flush_timer = QTimer(self) # Collects the rows painted in one pass into a single task
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(50)
+        self._flush_timer.timeout.connect(self._flush_requests)
+        self._resort_timer = QTimer(self)
+        self._resort_timer.setSingleShot(True)
+        self._resort_timer.setInterval(200)
+        self._resort_timer.timeout.connect(self._resort)
+    def set_show_hidden(self, show: bool):
+        if show != self._show_hidden:
+            self._show_hidden = show
+            self.invalidateFilter()
+    def show_hidden(self) -> bool:
+        return self._show_hidden
+    def set_name_filter(self, name_filter):
+        """Hides files whose name name_filter(name) rejects (None shows all); directories always stay visible."""
+        if name_filter != self._name_filter: # Bound methods compare equal, not identical
+            self._name_filter = name_filter
+            self.invalidateFilter()
+    def set_pinned_path(self, path: str):
+        """Keeps path and its ancestors visible regardless of the hidden filter."""
+        path = os.path.normpath(path) if path else ""
+        if path != self._pinned:
+            self._pinned = path
+            if not self._show_hidden:
+                self.invalidateFilter()
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._show_hidden and self._name_filter is None:
+            return True
+        model = self.sourceModel()
+        idx = model.index(source_row, 0, source_parent)
+        if self._name_filter is not None and not model.isDir(idx) and not self._name_filter(model.fileName(idx)):
+            return False
+        if self._show_hidden or not model.fileInfo(idx).isHidden():
+            return True
+        if self._pinned:
+            path = os.path.normpath(model.filePath(idx))
+            return self._pinned == path or self._pinned.startswith(path.rstrip(os.sep) + os.sep)
+        return False
+    def set_dir_sizes_enabled(self, enabled: bool):
+        """Shows recursive sizes for directories in the Size column (computed lazily for visible rows)."""
+        if enabled == self._dir_sizes_enabled:
+            return
+        self._dir_sizes_enabled = enabled
+        if not enabled:
+            self._cancel_event.set()
+            self._cancel_event = threading.Event()
+            self._generation += 1
+            self._requested.clear()
+            self._queue.clear()
+        self._emit_size_changed(list(self._dir_sizes))
+    def dir_sizes_enabled(self) -> bool:
+        return self._dir_sizes_enabled
+    def invalidate_dir_sizes(self, path: str):
+        """Forgets the displayed size of path and its ancestors; unchanged subtrees are still served by the cache."""
+        path = os.path.normpath(path)
+        stale = [d for d in self._dir_sizes if d == path or path.startswith(d.rstrip(os.sep) + os.sep)]
+        for d in stale:
+            del self._dir_sizes[d]
+            self._requested.discard(d)
+        if self._dir_sizes_enabled:
+            self._emit_size_changed(stale)
+    def dir_size(self, path: str):
+        """The known recursive size of a directory, or None if it is not known (yet)."""
+        return self._dir_sizes.get(os.path.normpath(path))
+    def data(self, index, role=Qt.DisplayRole):
+        if self._dir_sizes_enabled and index.column() == SIZE_COLUMN and role == Qt.DisplayRole:
+            model = self.sourceModel()
+            src = self.mapToSource(index)
+            if model.isDir(src):
+                path = os.path.normpath(model.filePath(src))
+                if path in self._dir_sizes:
+                    size = self._dir_sizes[path]
+                    return "—" if size is None else QLocale().formattedDataSize(size)
+                self._request(path)
+                return "…"
+        return super().data(index, role)
+    def _request(self, path: str):
+        if path not in self._requested:
+            self._requested.add(path)
+            self._queue.append(path)
+            self._flush_timer.start()
+    def _flush_requests(self):
+        if self._queue:
+            dirs, self._queue = self._queue, []
+            self._pool.start(_DirSizeTask(self._generation, dirs, self._stat_cache, self._cancel_event,
+                                          self._size_signals))
+    def _on_sized(self, generation: int, path: str, size):
+        if generation != self._generation:
+            return
+        self._dir_sizes[path] = size
+        self._requested.discard(path)
+        if self._proxy_sorted and not self._resort_timer.isActive():
+            self._resort_timer.start() # New sizes can change the order; re-sort once per burst
+        self._emit_size_changed((path,))
+    def _resort(self):
+        if self._proxy_sorted:
+            super().sort(self.sortColumn(), self.sortOrder())
+    def _emit_size_changed(self, dirs):
+        model = self.sourceModel()
+        for d in dirs:
+            idx = self.mapFromSource(model.index(d, SIZE_COLUMN))
+            if idx.isValid():
+                self.dataChanged.emit(idx, idx, [Qt.DisplayRole])
+    def lessThan(self, left, right):
+        model = self.sourceModel()
+        left_dir, right_dir = model.isDir(left), model.isDir(right)
+        if left_dir != right_dir:
+            return left_dir if self.sortOrder() == Qt.AscendingOrder else right_dir # Directories stay on top
+        if left_dir:
+            l = self._dir_sizes.get(os.path.normpath(model.filePath(left)))
+            r = self._dir_sizes.get(os.path.normpath(model.filePath(right)))
+            l, r = (-1 if l is None else l), (-1 if r is None else r)
+        else:
+            l, r = model.size(left), model.size(right) # Cached by the model's gatherer, no stat here
+        if l != r:
+            return l < r
+        return model.fileName(left).lower() < model.fileName(right).lower()
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column == SIZE_COLUMN and self._dir_sizes_enabled:
+            self._proxy_sorted = True
+            super().sort(column, order)
+            return
+        if self._proxy_sorted:
+            self._proxy_sorted = False
+            super().sort(-1) # Back to the source order
+        self.sourceModel().sort(column, order) # The proxy itself never reorders rows
+class _MtimeCheckSignals(QObject):
+    done = Signal(list) # Directories whose mtime is newer than when they were loaded
+class _MtimeCheckTask(QRunnable):
+    def __init__(self, loaded: dict, signals: _MtimeCheckSignals):
+        super().__init__()
+        self._loaded = loaded
+        self._signals = signals
+    def run(self):
+        changed = []
+        for path, loaded_at in self._loaded.items():
+            try:
+                if os.stat(path).st_mtime >= loaded_at - DirectoryRefresher.MTIME_SLACK:
+                    changed.append(path)
+            except OSError:
+                changed.append(path) # Gone or unreadable: re-list so the model drops it
+        self._signals.done.emit(changed)
+class DirectoryRefresher(QObject):
+    """Re-reads only the directories of a QFileSystemModel that changed since they were loaded.
+    refresh() stats the tracked directories on a worker thread; those with a newer mtime are marked dirty and
+    re-listed by the model's own gatherer thread, which adds/removes just the affected rows. Expanded state,
+    the directory cache and everything else stay untouched."""
+    MTIME_SLACK = 2.0 # Seconds of tolerance for coarse or skewed mtimes on network filesystems
+    finished = Signal(list) # Directories that were re-read
+    def __init__(self, model: QFileSystemModel, parent=None):
+        super().__init__(parent)
+        self._model = model
+        self._loaded_at = {} # path -> time.time() when the model finished loading it
+        self._signals = _MtimeCheckSignals(self)
+        self._signals.done.connect(self._on_checked)
+        self._busy = False
+        model.directoryLoaded.connect(self._on_directory_loaded)
+    def _on_directory_loaded(self, path: str):
+        self._loaded_at[path] = time.time()
+    def refresh(self, paths=None):
+        """Checks the given directories (default: every directory loaded so far) and re-reads the changed ones."""
+        if self._busy:
+            return
+        loaded = {p: self._loaded_at.get(p, 0.0) for p in (paths if paths is not None else self._loaded_at)}
+        if not loaded:
+            self.finished.emit([])
+            return
+        self._busy = True
+        QThreadPool.globalInstance().start(_MtimeCheckTask(loaded, self._signals))
+    def _on_checked(self, changed: list):
+        self._busy = False
+        if changed:
+            self.reload_directories(changed)
+        self.finished.emit(changed)
+    def reload_directories(self, dirs: list):
+        """Forces the model to re-list exactly these directories.
+        QFileSystemModel marks a directory as unpopulated when the root path moves away from it, and the next
+        fetchMore() on it re-lists it in the gatherer thread (stale rows are removed, new ones added)."""
+        model = self._model
+        root = model.rootPath()
+        dirs = [d for d in dirs if model.index(d).isValid()]
+        if not dirs:
+            return
+        for d in dirs:
+            model.setRootPath(d)
+        if dirs[-1] == root:
+            model.setRootPath(os.path.dirname(root.rstrip(os.sep)) or os.sep) # Move off it so it is marked too
+        model.setRootPath(root)
+        for d in dirs:
+            idx = model.index(d)
+            if idx.isValid():
+                self._loaded_at.pop(d, None)
+                model.fetchMore(idx)
@@ -0,0 +1,129 @@
+# Instrumentation.py
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# 埋点使用的阶段名
+STAGES = (
+    "url_extract",  # dropEvent 中从 QMimeData 提取本地路径
+    "classify",     # 后台识别拖入路径（从开始识别到全部完成）
+    "dedup_sort",   # 选择存储的去重、排序插入/移除
+    "render",       # 刷新拖放区显示
+    "signal_emit",  # 发出增量信号和 dropped/picked 信号（含槽函数耗时）
+    "dialog_ready", # 点击拖放区到文件选择对话框预加载完成、即将显示
+    "revalidate",   # 对话框确定时重新校验暂存区路径
+)
+
+_enabled = False
+_callback = None
+_log_timings = False
+
+
+def configure(callback=None, log_timings: bool = False):
+    """
+    开启/关闭分阶段计时，不依赖 Qt。
+    callback(stage, seconds, count) 在埋点所在的线程（目前都是 GUI 线程）同步调用，应尽快返回；
+    log_timings=True 时每个阶段还以 DEBUG 级别写入本模块的 logger。
+    两者都未给出时计时关闭，各埋点只剩一次布尔判断，不读时钟也不分配对象。
+    """
+    global _enabled, _callback, _log_timings
+    _callback = callback
+    _log_timings = log_timings
+    _enabled = callback is not None or log_timings
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def record(stage: str, seconds: float, count: int = 0):
+    """上报一个阶段的耗时和处理的条目数（计时关闭时忽略）"""
+    if not _enabled:
+        return
+    if _log_timings:
+        logger.debug("%s: %.3f ms (%d items)", stage, seconds * 1000, count)
+    if _callback is not None:
+        try:
+            _callback(stage, seconds, count)
+        except Exception:
+            logger.exception("metrics callback failed for stage %r", stage)
+
+
+def stage_start():
+    """跨函数计时的起点；计时关闭时返回 None，对应的 stage_end() 什么都不做"""
+    return time.perf_counter() if _enabled else None
+
+
+def stage_end(stage: str, started, count: int = 0):
+    if started is not None:
+        record(stage, time.perf_counter() - started, count)
+
+
+class _Stage:
+    __slots__ = ("name", "count", "_started")
+
+    def __init__(self, name: str, count: int):
+        self.name = name
+        self.count = count
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self._started, self.count)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+    count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass # 计时关闭时忽略对 count 的修改
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str, count: int = 0):
+    """
+    with stage("render", n): ... 计时一段代码。计时关闭时返回共享的空上下文。
+    开启时可在块内修改返回对象的 count（例如只有做完才知道实际处理了多少条）。
+    """
+    return _Stage(name, count) if _enabled else _NULL_STAGE
+
+
+class StageStats:
+    """
+    简单的汇总器，可直接作为 configure() 的 callback：按阶段累计调用次数、条目数、总耗时和最大耗时。
+    """
+
+    def __init__(self):
+        self._stats = {}
+
+    def __call__(self, stage: str, seconds: float, count: int):
+        s = self._stats.get(stage)
+        if s is None:
+            self._stats[stage] = [1, count, seconds, seconds]
+        else:
+            s[0] += 1
+            s[1] += count
+            s[2] += seconds
+            if seconds > s[3]:
+                s[3] = seconds
+
+    def summary(self) -> dict:
+        """返回 {阶段: {"calls", "items", "total", "max"}}，时间单位为秒"""
+        return {stage: {"calls": calls, "items": items, "total": total, "max": longest}
+                for stage, (calls, items, total, longest) in self._stats.items()}
+
+    def reset(self):
+        self._stats.clear()
@@ -0,0 +1,128 @@
+#Path_completer
+import os
+import sys
+import time
+from collections import OrderedDict
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, QStringListModel, Signal
+from PySide6.QtWidgets import QCompleter, QLineEdit
+class _ListSignals(QObject):
+    listed = Signal(str, list) # directory, [(name, is_dir)...] (empty if unreadable)
+class _ListTask(QRunnable):
+    def __init__(self, directory: str, signals: _ListSignals):
+        super().__init__()
+        self._directory = directory
+        self._signals = signals
+    def run(self):
+        entries = []
+        try:
+            with os.scandir(self._directory) as it:
+                for entry in it:
+                    try:
+                        entries.append((entry.name, entry.is_dir()))
+                    except OSError:
+                        entries.append((entry.name, False))
+        except OSError:
+            pass
+        entries.sort(key=lambda e: (not e[1], e[0].lower())) # Directories first, like the tree
+        self._signals.listed.emit(self._directory, entries)
+class PathCompleter(QCompleter):
+    """Path completer whose directory listings are read by background os.scandir workers.
+    Listings live in a bounded LRU cache, so a keystroke only ever does a dict lookup on the GUI thread; a cache
+    miss (or an entry older than MAX_AGE) queues a listing and the popup is updated when it arrives. Once the typed
+    prefix narrows down to a few directories their listings are prefetched, so descending into one is instant."""
+    MAX_AGE = 30.0 # Seconds before a cached listing is re-read in the background (it is still used meanwhile)
+    PREFETCH_LIMIT = 4 # Prefetch the next level only when at most this many directories match the prefix
+    def __init__(self, parent=None, max_dirs: int = 256):
+        super().__init__(parent)
+        self._max_dirs = max_dirs
+        self._cache = OrderedDict() # directory -> (listed_at, [(name, is_dir)...]), least recently used first
+        self._in_flight = set()
+        self._current_dir = None # Directory whose listing the popup shows
+        self._pool = QThreadPool(self) # Own pool: a hanging network mount must not starve the global one
+        self._pool.setMaxThreadCount(4)
+        self._signals = _ListSignals(self)
+        self._signals.listed.connect(self._on_listed)
+        self._string_model = QStringListModel(self)
+        self.setModel(self._string_model)
+        self.setCompletionMode(QCompleter.PopupCompletion)
+        self.setCaseSensitivity(Qt.CaseInsensitive if sys.platform == "win32" else Qt.CaseSensitive)
+        self.setMaxVisibleItems(12)
+    def attach(self, line_edit: QLineEdit):
+        line_edit.setCompleter(self)
+        line_edit.textEdited.connect(self._on_text_edited)
+    def splitPath(self, path: str) -> list:
+        return [path] # Model entries are full paths, so match the whole text as one prefix
+    def pathFromIndex(self, index) -> str:
+        return index.data()
+    def known_kind(self, path: str):
+        """True/False if path is a cached directory/file, None if its parent's listing is not cached."""
+        parent, name = os.path.split(os.path.normpath(path))
+        cached = self._cache.get(parent)
+        if cached is None or not name:
+            return None
+        for entry_name, is_dir in cached[1]:
+            if entry_name == name:
+                return is_dir
+        return None
+    def prefetch(self, directory: str):
+        """Queues a background listing of directory unless a fresh one is cached or already queued."""
+        cached = self._cache.get(directory)
+        if directory in self._in_flight or (cached is not None and time.monotonic() - cached[0] < self.MAX_AGE):
+            return
+        self._in_flight.add(directory)
+        self._pool.start(_ListTask(directory, self._signals))
+    def invalidate(self, directory: str = None):
+        """Forgets one cached listing, or all of them."""
+        if directory is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(directory, None)
+    def _on_text_edited(self, text: str):
+        if not os.path.isabs(text):
+            self._current_dir = None
+            return
+        directory = text if text.endswith(("/", "\\")) else os.path.dirname(text)
+        directory = os.path.normpath(directory) if directory else text
+        if directory != self._current_dir:
+            self._current_dir = directory
+            self._show(directory)
+        self.prefetch(directory) # No-op when fresh; refreshes stale entries in the background
+        self._prefetch_next_level(text)
+        if directory in self._cache:
+            self.setCompletionPrefix(text)
+            self.complete()
+    def _show(self, directory: str):
+        cached = self._cache.get(directory)
+        if cached is None:
+            self._string_model.setStringList([])
+            return
+        self._cache.move_to_end(directory)
+        base = directory if directory.endswith(("/", "\\")) else directory + os.sep
+        self._string_model.setStringList([base + name + (os.sep if is_dir else "") for name, is_dir in cached[1]])
+    def _prefetch_next_level(self, text: str):
+        cached = self._cache.get(self._current_dir)
+        if cached is None:
+            return
+        prefix = "" if text.endswith(("/", "\\")) else os.path.basename(text)
+        if sys.platform == "win32":
+            prefix = prefix.lower()
+            matches = [n for n, is_dir in cached[1] if is_dir and n.lower().startswith(prefix)]
+        else:
+            matches = [n for n, is_dir in cached[1] if is_dir and n.startswith(prefix)]
+        if len(matches) <= self.PREFETCH_LIMIT:
+            for name in matches:
+                self.prefetch(os.path.join(self._current_dir, name))
+    def _on_listed(self, directory: str, entries: list):
+        self._in_flight.discard(directory)
+        self._cache[directory] = (time.monotonic(), entries)
+        self._cache.move_to_end(directory)
+        while len(self._cache) > self._max_dirs:
+            self._cache.popitem(last=False)
+        if directory != self._current_dir:
+            return
+        widget = self.widget()
+        self._show(directory)
+        if widget is not None and widget.hasFocus():
+            self._prefetch_next_level(widget.text())
+            self.setCompletionPrefix(widget.text())
+            self.complete() # The listing arrived after the keystroke, so refresh the popup now
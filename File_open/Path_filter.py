@@ -0,0 +1,68 @@
+# Path_filter.py
+import fnmatch
+import os
+import re
+
+
+class PathFilter:
+    """
+    编译后的文件过滤规则，不依赖 Qt。
+    patterns: 文件名通配符（如 "*.csv"），extensions: 扩展名（如 "csv" 或 ".csv"），两者任一命中即可；
+    regex: 在完整路径上搜索的正则表达式；
+    min_size/max_size: 字节数范围；modified_after/modified_before: 修改时间范围（Unix 时间戳）。
+    所有给出的条件都必须满足。默认只过滤文件，目录总是放行（apply_to_dirs=True 时目录也要匹配名称规则）。
+    """
+
+    def __init__(self, patterns=(), extensions=(), regex=None, min_size=None, max_size=None,
+                 modified_after=None, modified_before=None, apply_to_dirs=False, case_sensitive=False):
+        self.patterns = list(patterns)
+        self.extensions = [e if e.startswith(".") else "." + e for e in extensions]
+        self.min_size = min_size
+        self.max_size = max_size
+        self.modified_after = modified_after
+        self.modified_before = modified_before
+        self.apply_to_dirs = apply_to_dirs
+        self.case_sensitive = case_sensitive
+        flags = 0 if case_sensitive else re.IGNORECASE
+        globs = self.patterns + ["*" + e for e in self.extensions]
+        # 所有通配符合并成一个正则，每个名字只匹配一次
+        self._name_re = re.compile("|".join(fnmatch.translate(g) for g in globs), flags) if globs else None
+        self._path_re = re.compile(regex, flags) if isinstance(regex, str) else regex
+        self.needs_stat = any(v is not None for v in (min_size, max_size, modified_after, modified_before))
+
+    @classmethod
+    def from_string(cls, spec: str, **kwargs) -> "PathFilter":
+        """由 "*.csv;*.parquet" 这样以分号或空格分隔的通配符串构造"""
+        return cls(patterns=[p for p in re.split(r"[;\s]+", spec) if p], **kwargs)
+
+    def matches_name(self, name: str) -> bool:
+        """只按文件名通配符判断（没有通配符时总是 True），供界面在列出目录时逐行过滤"""
+        return self._name_re is None or self._name_re.match(name) is not None
+
+    def matches(self, path: str, is_dir: bool = False, st: os.stat_result = None) -> bool:
+        """
+        判断路径是否满足过滤条件。needs_stat 为 True 且未提供 st 时会自行 os.stat；
+        stat 失败的文件视为不满足。
+        """
+        if is_dir and not self.apply_to_dirs:
+            return True
+        if self._name_re is not None and not self._name_re.match(os.path.basename(path)):
+            return False
+        if self._path_re is not None and not self._path_re.search(path):
+            return False
+        if is_dir or not self.needs_stat:
+            return True
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False
+        if self.min_size is not None and st.st_size < self.min_size:
+            return False
+        if self.max_size is not None and st.st_size > self.max_size:
+            return False
+        if self.modified_after is not None and st.st_mtime < self.modified_after:
+            return False
+        if self.modified_before is not None and st.st_mtime > self.modified_before:
+            return False
+        return True
@@ -0,0 +1,99 @@
+# Path_resolver.py
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+_shared_resolver = None
+
+
+class PathResolver:
+    """
+    把路径解析为规范键：解析符号链接和 "..", 在大小写不敏感的文件系统上统一为小写。不依赖 Qt，线程安全。
+    结果按原始路径缓存；父目录的 realpath 单独缓存，同一目录下的大量文件只需各做一次 lstat。
+    缓存不会感知之后的符号链接变化，需要时调用 clear()。
+    """
+
+    def __init__(self, max_entries: int = 200_000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._keys = OrderedDict() # 原始路径 -> 规范键
+        self._dirs = OrderedDict() # 原始目录 -> (realpath, 是否大小写不敏感)
+        self._case_insensitive = {} # st_dev -> 该文件系统是否大小写不敏感
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+            self._dirs.clear()
+            self._case_insensitive.clear()
+
+    def _remember(self, table: OrderedDict, key, value):
+        with self._lock:
+            table[key] = value
+            table.move_to_end(key)
+            while len(table) > self.max_entries:
+                table.popitem(last=False)
+
+    def _lookup(self, table: OrderedDict, key):
+        with self._lock:
+            value = table.get(key)
+            if value is not None:
+                table.move_to_end(key)
+            return value
+
+    def _dir_info(self, directory: str) -> tuple:
+        info = self._lookup(self._dirs, directory)
+        if info is None:
+            real = os.path.realpath(directory)
+            info = (real, self._folds_case(real))
+            self._remember(self._dirs, directory, info)
+        return info
+
+    def _folds_case(self, directory: str) -> bool:
+        """目录所在文件系统是否大小写不敏感：按设备缓存，通过比较大小写互换后的路径是否指向同一目录来探测"""
+        if sys.platform == "win32":
+            return True # normcase 已经处理
+        try:
+            st = os.stat(directory)
+        except OSError:
+            return False
+        folds = self._case_insensitive.get(st.st_dev)
+        if folds is None:
+            probe = directory.swapcase()
+            if probe == directory:
+                return sys.platform == "darwin" # 路径中没有字母时无法探测，按平台默认值处理且不缓存
+            try:
+                folds = os.path.samestat(st, os.stat(probe))
+            except OSError:
+                folds = False
+            self._case_insensitive[st.st_dev] = folds
+        return folds
+
+    def canonical(self, path: str) -> str:
+        """返回 path 的规范键（不存在的路径按现有部分尽量解析）"""
+        key = self._lookup(self._keys, path)
+        if key is not None:
+            return key
+        full = path if os.path.isabs(path) else os.path.join(os.getcwd(), path)
+        parent, name = os.path.split(full)
+        if not name or name in (".", ".."):
+            real, folds = self._dir_info(full)
+        else:
+            real_parent, folds = self._dir_info(parent)
+            real = os.path.join(real_parent, name)
+            if os.path.islink(real):
+                real = os.path.realpath(real)
+                folds = self._dir_info(os.path.dirname(real))[1]
+        key = os.path.normcase(real)
+        if folds:
+            key = key.lower()
+        self._remember(self._keys, path, key)
+        return key
+
+
+def shared_path_resolver() -> PathResolver:
+    """进程内共享的 PathResolver，拖放区和文件选择对话框共用同一份缓存"""
+    global _shared_resolver
+    if _shared_resolver is None:
+        _shared_resolver = PathResolver()
+    return _shared_resolver
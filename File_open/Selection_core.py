@@ -0,0 +1,192 @@
+# Selection_core.py
+import os
+import queue
+import stat
+import threading
+import time
+from collections import defaultdict
+from enum import Enum
+
+_SCANDIR_THRESHOLD = 64  # 同一父目录下的拖入项达到该数量时，改用一次 os.scandir 批量识别
+_STAT_CHUNK = 128        # 零散路径按此数量打包成一个任务，逐个 os.stat
+
+FILE, DIR, MISSING, SKIPPED = "file", "dir", "missing", "skipped" # iter_classified 产出的类别
+
+
+class DropMode(Enum):
+    """定义拖放接收模式"""
+    ONE_SHOT = 1    # 一次性模式：每次拖放都清除旧的，只显示新的
+    ACCUMULATE = 2  # 积累模式：每次拖放都添加到现有列表中
+
+
+def _stat(path: str):
+    """跟随符号链接的 os.stat，不存在时返回 None（与 Path.exists()/is_dir() 语义一致）"""
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _classify_by_stat(path: str):
+    st = _stat(path)
+    return (path, None, None) if st is None else (path, stat.S_ISDIR(st.st_mode), st)
+
+
+def classify_group(parent: str, paths: list, cancel_event: threading.Event, need_stat: bool = False):
+    """
+    生成器：识别同一父目录下的一组路径，逐个产出 (path, is_dir, st)，不存在时 is_dir 为 None。
+    st 是 os.stat_result；走 scandir 分支且 need_stat 为 False 时为 None。
+    数量较多时只读取一次父目录（os.scandir 自带文件类型，无需逐个 stat），
+    列表中找不到或是符号链接的条目再回退到 os.stat。
+    """
+    if parent and len(paths) >= _SCANDIR_THRESHOLD:
+        wanted = {}
+        for p in paths:
+            wanted.setdefault(os.path.basename(p), []).append(p)
+        try:
+            with os.scandir(parent) as it:
+                for entry in it:
+                    if cancel_event.is_set():
+                        return
+                    hits = wanted.pop(entry.name, None)
+                    if hits is None:
+                        continue
+                    if entry.is_symlink():
+                        _, is_dir, st = _classify_by_stat(entry.path)
+                    else:
+                        try:
+                            is_dir = entry.is_dir()
+                            st = entry.stat() if need_stat else None
+                        except OSError:
+                            is_dir, st = None, None
+                    for p in hits:
+                        yield p, is_dir, st
+                    if not wanted:
+                        return # 所有目标都已找到，无需读完整个目录
+        except OSError:
+            pass
+        paths = [p for hits in wanted.values() for p in hits]
+    for p in paths:
+        if cancel_event.is_set():
+            return
+        yield _classify_by_stat(p)
+
+
+def plan_groups(paths, chunk: int = _STAT_CHUNK) -> list:
+    """
+    把路径划分成识别任务：[[(parent, [paths...])], ...]，每个元素是一个任务。
+    同一父目录下足够多的路径单独成为一个 scandir 任务，其余零散路径按 chunk 个一组逐个 stat。
+    """
+    groups = defaultdict(list)
+    for p in paths:
+        groups[os.path.dirname(p) if os.path.basename(p) else ""].append(p)
+    tasks, small = [], []
+    for parent, group in groups.items():
+        if parent and len(group) >= _SCANDIR_THRESHOLD:
+            tasks.append([(parent, group)])
+        else:
+            small.extend(group)
+    for i in range(0, len(small), chunk):
+        tasks.append([("", small[i:i + chunk])])
+    return tasks
+
+
+def iter_classified(groups, cancel_event: threading.Event, path_filter=None, resolver=None):
+    """
+    生成器：识别 [(parent, [paths...]), ...]，逐个产出 (path, 类别)，类别为 FILE/DIR/MISSING/SKIPPED。
+    给定 PathFilter 时不满足条件的路径产出 SKIPPED；给定 PathResolver 时顺带预先解析存在路径的规范键。
+    """
+    need_stat = path_filter is not None and path_filter.needs_stat
+    for parent, paths in groups:
+        for path, is_dir, st in classify_group(parent, paths, cancel_event, need_stat):
+            if is_dir is None:
+                yield path, MISSING
+                continue
+            if resolver is not None:
+                resolver.canonical(path)
+            if path_filter is not None and not path_filter.matches(path, is_dir, st):
+                yield path, SKIPPED # 在进入选择之前就被过滤掉
+            else:
+                yield path, DIR if is_dir else FILE
+        if cancel_event.is_set():
+            return
+
+
+def revalidate_paths(paths, path_filter=None, timeout: float = 2.0, max_workers: int = 8,
+                     total_timeout: float = 10.0) -> tuple[list, list, list, list]:
+    """
+    并行地对一批路径做一次识别，返回 (files, dirs, missing, unverified)，各列表保持输入顺序，
+    被 PathFilter 过滤掉的路径不出现在结果中。零散路径每个单独成为一个任务（同目录的大批路径仍是一次 scandir），
+    任一工作线程在同一个路径（或同一次 scandir）上卡住超过 timeout 秒（例如卡住的 NFS/SMB 挂载），
+    该路径归入 unverified，并另起线程继续处理队列中的其余路径（总线程数以 max_workers 的 4 倍为上限）。
+    调用线程最多等待 total_timeout 秒（None 表示不限），到时仍未识别的路径同样归入 unverified。
+    工作线程是守护线程：卡在系统调用里的线程不会阻止退出，调用返回后它们在系统调用结束时自行停止。
+    """
+    paths = list(paths)
+    if not paths:
+        return [], [], [], []
+    tasks = queue.SimpleQueue()
+    n_tasks = 0
+    for task in plan_groups(paths, chunk=1):
+        tasks.put(task)
+        n_tasks += 1
+    results = {}
+    progress = threading.Condition()
+    cancel_event = threading.Event()
+    busy_since = {} # 正常工作的线程 -> 它开始等待当前路径的时间；被判定卡住的线程从中移除
+
+    def work():
+        me = threading.get_ident()
+        while not cancel_event.is_set():
+            with progress: # 取任务和登记在同一把锁内，等待方不会看到"队列空了但没人在处理"的中间状态
+                try:
+                    task = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                busy_since[me] = time.monotonic()
+            for path, kind in iter_classified(task, cancel_event, path_filter):
+                with progress:
+                    results[path] = kind
+                    busy_since[me] = time.monotonic() # 卡住后又恢复的线程重新算作正常
+                    progress.notify()
+        with progress:
+            busy_since.pop(me, None)
+            progress.notify()
+
+    def spawn():
+        threading.Thread(target=work, name="File_open-revalidate", daemon=True).start()
+
+    n_threads = min(max_workers, n_tasks)
+    max_threads = max_workers * 4 # 卡住的线程无法回收，替补线程的数量要有上限
+    for _ in range(n_threads):
+        spawn()
+    expected = len(set(paths))
+    deadline = None if total_timeout is None else time.monotonic() + total_timeout
+    with progress:
+        while len(results) < expected:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            for ident in [i for i, since in busy_since.items() if now - since >= timeout]:
+                del busy_since[ident] # 放弃这个线程手上的路径
+                if n_threads < max_threads and not tasks.empty():
+                    spawn()
+                    n_threads += 1
+            if not busy_since and (tasks.empty() or n_threads >= max_threads):
+                break # 剩下的路径都在卡住的线程手里，或者已无法再起线程
+            wake = min(busy_since.values(), default=now) + timeout
+            if deadline is not None:
+                wake = min(wake, deadline)
+            progress.wait(max(wake - now, 0.01))
+        cancel_event.set()
+        snapshot = dict(results) # 之后卡住的线程仍可能写入 results，只使用此刻的快照
+
+    files, dirs, missing, unverified = [], [], [], []
+    buckets = {FILE: files, DIR: dirs, MISSING: missing}
+    for p in paths:
+        kind = snapshot.get(p)
+        if kind is None:
+            unverified.append(p)
+        elif kind != SKIPPED:
+            buckets[kind].append(p)
+    return files, dirs, missing, unverified
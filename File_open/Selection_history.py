@@ -0,0 +1,64 @@
+# Selection_history.py
+from collections import deque
+from .Selection_store import SelectionChange, SelectionStore
+
+
+class SelectionHistory:
+    """
+    选择的撤销/重做历史，不依赖 Qt。
+    每一步只保存一次变更的净增量（SelectionStore.take_changes() 返回的 SelectionChange），而不是整个选择的副本；
+    增量中的路径字符串与选择存储共享同一批对象，十万条目的选择保留多步历史，额外内存只是各步增量的列表本身。
+    最多保留 max_depth 步（0 表示不记录），超出时丢弃最旧的一步；记录新的变更会清空重做栈。
+    """
+
+    def __init__(self, max_depth: int = 20):
+        self._undo = deque()
+        self._redo = []
+        self.max_depth = max_depth
+
+    def set_max_depth(self, max_depth: int):
+        """调整最多保留的步数：两个栈都丢弃离当前状态最远的步骤（撤销栈的开头、重做栈的开头）"""
+        self.max_depth = max_depth
+        keep = max(max_depth, 0)
+        while len(self._undo) > keep:
+            self._undo.popleft()
+        del self._redo[:len(self._redo) - keep] # 栈顶（下一个要重做的）在列表末尾
+
+    def record(self, change: SelectionChange):
+        """记录一次已经发生的变更（空变更忽略）"""
+        if change.is_empty() or self.max_depth <= 0:
+            return
+        self._undo.append(change)
+        self._redo.clear()
+        if len(self._undo) > self.max_depth:
+            self._undo.popleft()
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self, store: SelectionStore) -> bool:
+        """在 store 上撤销最近一步（移除它新增的、恢复它移除的）；没有可撤销的步骤时返回 False"""
+        if not self._undo:
+            return False
+        change = self._undo.pop()
+        store.remove(change.added_files, change.added_dirs)
+        store.add(change.removed_files, change.removed_dirs)
+        self._redo.append(change)
+        return True
+
+    def redo(self, store: SelectionStore) -> bool:
+        """在 store 上重做最近撤销的一步；没有可重做的步骤时返回 False"""
+        if not self._redo:
+            return False
+        change = self._redo.pop()
+        store.remove(change.removed_files, change.removed_dirs)
+        store.add(change.added_files, change.added_dirs)
+        self._undo.append(change)
+        return True
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
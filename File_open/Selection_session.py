@@ -0,0 +1,122 @@
+# Selection_session.py
+import json
+import operator
+import os
+import struct
+from itertools import islice
+
+_MAGIC = b"FOSEL\x00\x01\x00" # 文件头标识 + 格式版本
+_HEADER = struct.Struct("<8sQQ") # 标识, 文件数, 目录数
+_SECTION = struct.Struct("<Q") # 每个分区的字节数
+
+
+def _pack(paths) -> bytes:
+    # 路径中不会出现 NUL，用它分隔；surrogatepass 保证无法用 UTF-8 表示的文件名也能原样往返
+    return "\0".join(paths).encode("utf-8", "surrogatepass")
+
+
+def _unpack(blob: bytes, count: int) -> list:
+    if not count:
+        return []
+    paths = blob.decode("utf-8", "surrogatepass").split("\0")
+    if len(paths) != count:
+        raise ValueError("corrupt selection file: path count does not match the header")
+    if not all(map(operator.lt, paths, islice(paths, 1, None))): # 一次线性比较，远比重新排序便宜
+        raise ValueError("corrupt selection file: paths are not sorted")
+    return paths
+
+
+def _write_atomic(path: str, data: bytes):
+    """先写临时文件再替换，写入中途失败不会留下半个文件"""
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def save_selection(path: str, files, dirs, presorted: bool = False):
+    """
+    把选择保存为紧凑的二进制文件，不依赖 Qt：文件头（标识、文件数、目录数）之后是两个长度前缀的分区，
+    每个分区是以 NUL 分隔、已排序且无重复的 UTF-8 路径。读取时整块解码再切分，百万条路径也只需零点几秒，
+    读回的列表可以直接交给 SelectionStore.replace_sorted() 而无需重新排序。
+    files/dirs 已经排序且无重复时（例如 SelectionStore 的快照）传 presorted=True 跳过排序。
+    """
+    if presorted:
+        files, dirs = list(files), list(dirs)
+    else:
+        files, dirs = sorted(set(files)), sorted(set(dirs))
+    files_blob, dirs_blob = _pack(files), _pack(dirs)
+    _write_atomic(path, b"".join((_HEADER.pack(_MAGIC, len(files), len(dirs)),
+                                  _SECTION.pack(len(files_blob)), files_blob,
+                                  _SECTION.pack(len(dirs_blob)), dirs_blob)))
+
+
+def load_selection(path: str) -> tuple[list, list]:
+    """读取 save_selection() 保存的文件，返回已排序且无重复的 (files, dirs)；格式不符时抛出 ValueError"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size or data[:len(_MAGIC)] != _MAGIC:
+        raise ValueError(f"{path!r} is not a saved selection")
+    _, n_files, n_dirs = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    sections = []
+    for count in (n_files, n_dirs):
+        if offset + _SECTION.size > len(data):
+            raise ValueError("corrupt selection file: truncated")
+        (size,) = _SECTION.unpack_from(data, offset)
+        offset += _SECTION.size
+        if offset + size > len(data):
+            raise ValueError("corrupt selection file: truncated")
+        sections.append(_unpack(data[offset:offset + size], count))
+        offset += size
+    return sections[0], sections[1]
+
+
+class RecentLocations:
+    """
+    最近使用的位置列表（最新的在前，去重，最多 max_entries 个），不依赖 Qt。
+    给定 path 时从该 JSON 文件加载，每次变化后立即写回；文件损坏或不可读时从空列表开始。
+    """
+
+    def __init__(self, path: str = None, max_entries: int = 10):
+        self.path = path
+        self.max_entries = max_entries
+        self._locations = []
+        if path is not None:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    loaded = json.load(f)
+                self._locations = [p for p in loaded if isinstance(p, str)][:max_entries]
+            except (OSError, ValueError, TypeError):
+                pass
+
+    def locations(self) -> list:
+        return list(self._locations)
+
+    def touch(self, location: str):
+        """把 location 移到最前面"""
+        if self._locations and self._locations[0] == location:
+            return
+        if location in self._locations:
+            self._locations.remove(location)
+        self._locations.insert(0, location)
+        del self._locations[self.max_entries:]
+        self._save()
+
+    def remove(self, location: str):
+        if location in self._locations:
+            self._locations.remove(location)
+            self._save()
+
+    def clear(self):
+        self._locations.clear()
+        self._save()
+
+    def _save(self):
+        if self.path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            _write_atomic(self.path, json.dumps(self._locations, ensure_ascii=False).encode("utf-8"))
+        except OSError:
+            pass # 最近位置只是便利功能，写不了就算了
@@ -0,0 +1,637 @@
+# Selection_store.py
+import bisect
+import os
+from array import array
+from itertools import groupby
+from operator import add
+from pathlib import Path
+from typing import NamedTuple
+
+_INSORT_LIMIT = 32 # 新增项不多时逐个二分插入；更多时追加后整体排序（Timsort 合并两段有序序列是线性的）
+_MAX_NOTIFY_RUNS = 64 # 有观察者时，变更分散成太多段则改为整体重置通知
+
+
+class SelectionChange(NamedTuple):
+    """一次变更的净增量（各列表已排序）及变更后的选择代数"""
+    added_files: list
+    added_dirs: list
+    removed_files: list
+    removed_dirs: list
+    generation: int
+
+    def is_empty(self) -> bool:
+        return not (self.added_files or self.added_dirs or self.removed_files or self.removed_dirs)
+
+
+class SelectionSnapshot(NamedTuple):
+    """
+    某一代选择的不可变快照：排序后的文件、目录元组及其选择代数。
+    同一代的快照只构建一次，之后所有读取者共享同一个对象；generation 没变就说明内容没变。
+    """
+    files: tuple
+    dirs: tuple
+    generation: int
+
+
+class SelectionObserver:
+    """
+    选择存储的变更观察者接口（默认实现什么都不做）。
+    kind 为 "files" 或 "dirs"；first/count 是变更前列表中的位置和数量。
+    about_to_* 在修改前调用，其余在修改后调用，顺序与 Qt 模型的 begin/end 通知一致。
+    """
+
+    def rows_about_to_be_inserted(self, kind: str, first: int, count: int):
+        pass
+
+    def rows_inserted(self, kind: str):
+        pass
+
+    def rows_about_to_be_removed(self, kind: str, first: int, count: int):
+        pass
+
+    def rows_removed(self, kind: str):
+        pass
+
+    def about_to_reset(self):
+        pass
+
+    def reset_done(self):
+        pass
+
+
+def _group_runs(positions: list, contiguous: bool) -> list:
+    """
+    把升序的 (位置, 路径) 合并成 [(起始位置, [路径...]), ...]。
+    插入时同一插入点的路径为一段（contiguous=False）；移除时位置连续的路径为一段（contiguous=True）。
+    """
+    runs = []
+    for pos, path in positions:
+        if runs and runs[-1][0] + (len(runs[-1][1]) if contiguous else 0) == pos:
+            runs[-1][1].append(path)
+        else:
+            runs.append((pos, [path]))
+    return runs
+
+
+class SortedPathSet:
+    """
+    有序且去重的路径集合。
+    成员判断通过哈希集合完成（O(1)），列表始终保持排序，新增项按排序位置插入，
+    不再需要 `if p not in list` 去重和每次整体重新排序。
+    """
+
+    def __init__(self, paths=(), kind: str = "", observers: list = None, on_change=None):
+        self._items = sorted(set(paths))
+        self._members = set(self._items)
+        self._kind = kind
+        self._observers = observers if observers is not None else []
+        self._on_change = on_change # on_change(kind, added, removed)，内容确实变化时调用
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __contains__(self, path):
+        return path in self._members
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def index(self, path) -> int:
+        """返回路径在排序列表中的位置，不存在时抛出 ValueError"""
+        if path not in self._members:
+            raise ValueError(f"{path!r} is not in the set")
+        return bisect.bisect_left(self._items, path)
+
+    def as_list(self) -> list:
+        """返回内部排序列表本身（不复制），调用方不得修改"""
+        return self._items
+
+    def basename(self, index: int) -> str:
+        """排序位置 index 上路径的最后一段名称（用于显示）"""
+        return Path(self._items[index]).name
+
+    def add(self, path) -> bool:
+        """添加单个路径，返回是否为新增"""
+        return bool(self.update((path,)))
+
+    def update(self, paths) -> list:
+        """批量添加路径，返回本次真正新增的路径（已排序）"""
+        new = sorted({p for p in paths if p not in self._members})
+        if not new:
+            return new
+        self._members.update(new)
+        if self._observers:
+            self._insert_notified(new)
+        elif len(new) <= _INSORT_LIMIT:
+            for p in new:
+                bisect.insort(self._items, p)
+        else:
+            self._items.extend(new)
+            self._items.sort()
+        if self._on_change:
+            self._on_change(self._kind, new, ())
+        return new
+
+    def _insert_notified(self, new: list):
+        """有观察者时按连续段插入，每段前后通知观察者"""
+        runs = _group_runs([(bisect.bisect_left(self._items, p), p) for p in new], contiguous=False)
+        if len(runs) > _MAX_NOTIFY_RUNS:
+            self._notify("about_to_reset")
+            self._items.extend(new)
+            self._items.sort()
+            self._notify("reset_done")
+            return
+        offset = 0 # 前面各段已插入的数量
+        for pos, run in runs:
+            first = pos + offset
+            self._notify("rows_about_to_be_inserted", self._kind, first, len(run))
+            self._items[first:first] = run
+            self._notify("rows_inserted", self._kind)
+            offset += len(run)
+
+    def discard(self, path) -> bool:
+        """移除单个路径，返回是否确实移除"""
+        return bool(self.difference_update((path,)))
+
+    def difference_update(self, paths) -> list:
+        """批量移除路径，返回本次真正移除的路径（已排序）"""
+        gone = sorted({p for p in paths if p in self._members})
+        if not gone:
+            return gone
+        self._members.difference_update(gone)
+        if self._observers:
+            self._remove_notified(gone)
+        elif len(gone) <= _INSORT_LIMIT:
+            for p in gone:
+                del self._items[bisect.bisect_left(self._items, p)]
+        else:
+            self._items = [p for p in self._items if p in self._members]
+        if self._on_change:
+            self._on_change(self._kind, (), gone)
+        return gone
+
+    def _remove_notified(self, gone: list):
+        """有观察者时按连续段移除（从后往前，位置不受前面移除的影响）"""
+        runs = _group_runs([(bisect.bisect_left(self._items, p), p) for p in gone], contiguous=True)
+        if len(runs) > _MAX_NOTIFY_RUNS:
+            self._notify("about_to_reset")
+            self._items = [p for p in self._items if p in self._members]
+            self._notify("reset_done")
+            return
+        for pos, run in reversed(runs):
+            self._notify("rows_about_to_be_removed", self._kind, pos, len(run))
+            del self._items[pos:pos + len(run)]
+            self._notify("rows_removed", self._kind)
+
+    def replace(self, paths):
+        """用一组新路径整体替换当前内容"""
+        new_members = set(paths)
+        if self._on_change:
+            added, removed = new_members - self._members, self._members - new_members
+            if not added and not removed:
+                return
+        self._notify("about_to_reset")
+        self._items = sorted(new_members)
+        self._members = new_members
+        self._notify("reset_done")
+        if self._on_change:
+            self._on_change(self._kind, added, removed)
+
+    def replace_sorted(self, paths) -> tuple[list, list]:
+        """
+        用已排序且无重复的路径整体替换，不再去重排序；不调用 on_change，
+        而是直接返回 (新增, 移除)（均已排序），由调用方负责记账
+        """
+        items = list(paths)
+        members = set(items)
+        if self._items:
+            added = [p for p in items if p not in self._members]
+            removed = [p for p in self._items if p not in members]
+        else:
+            added, removed = list(items), [] # 复制一份：返回值不能与内部列表共享
+        if added or removed:
+            self._notify("about_to_reset")
+            self._items, self._members = items, members
+            self._notify("reset_done")
+        return added, removed
+
+    def clear(self):
+        self.replace(())
+
+    def _notify(self, method: str, *args):
+        for observer in self._observers:
+            getattr(observer, method)(*args)
+
+
+if os.sep == "\\":
+    def _name_starts(paths: list) -> list:
+        """各路径中名称的起始位置（最后一个分隔符之后）"""
+        return [max(p.rfind("/"), p.rfind("\\")) + 1 for p in paths]
+
+    def _split_last(path: str) -> tuple[str, str]:
+        """按最后一个分隔符拆成 (父目录前缀含分隔符, 名称)，两段直接拼接即为原路径（不做任何规范化）"""
+        i = max(path.rfind("/"), path.rfind("\\"))
+        return path[:i + 1], path[i + 1:]
+else:
+    def _name_starts(paths: list) -> list:
+        """各路径中名称的起始位置（最后一个分隔符之后）"""
+        return [p.rfind("/") + 1 for p in paths] # 整批在一个推导式里完成，百万条目时省下逐个函数调用
+
+    def _split_last(path: str) -> tuple[str, str]:
+        """按最后一个分隔符拆成 (父目录前缀含分隔符, 名称)，两段直接拼接即为原路径（不做任何规范化）"""
+        i = path.rfind("/")
+        return path[:i + 1], path[i + 1:]
+
+
+class CompactPathSet:
+    """
+    与 SortedPathSet 接口相同的有序去重路径集合，但不保存完整的路径字符串。
+    每个路径拆成「父目录前缀 + 名称」：父目录字符串只保存一份，按编号引用；
+    各排序位置上的父目录编号放在 array 中，名称放在列表中，成员判断按父目录分组的名称集合完成。
+    大量条目共享较长的父目录时，内存明显少于完整字符串（见 benchmarks/bench_memory.py）。
+    按位置读取、迭代和 as_list() 时才临时拼出完整路径，因此 as_list() 每次都新建列表。
+    不再被使用的父目录字符串在 replace()/clear() 时才释放。
+    """
+
+    def __init__(self, paths=(), kind: str = "", observers: list = None, on_change=None):
+        self._kind = kind
+        self._observers = observers if observers is not None else []
+        self._on_change = on_change # on_change(kind, added, removed)，内容确实变化时调用
+        self._reset(sorted(set(paths)))
+
+    def _reset(self, sorted_paths):
+        self._dirs = [] # 编号 -> 父目录前缀
+        self._dir_ids = {} # 父目录前缀 -> 编号
+        self._members = {} # 编号 -> {名称...}
+        self._parents = array("I") # 排序位置 -> 父目录编号
+        self._names = [] # 排序位置 -> 名称
+        self._append(sorted_paths)
+
+    def _dir_id(self, parent: str) -> int:
+        did = self._dir_ids.get(parent)
+        if did is None:
+            did = self._dir_ids[parent] = len(self._dirs)
+            self._dirs.append(parent)
+            self._members[did] = set()
+        return did
+
+    def _append(self, sorted_paths):
+        # 按连续相同的父目录分段，每段只查一次编号，编号整段写入 array。有序输入中同一父目录的条目
+        # 多半相邻，但子目录会把它们隔开（如 a/b、a/b/c、a/c 中 a/ 分成两段），这时 _dir_id 对后一段返回同一编号
+        paths = sorted_paths if isinstance(sorted_paths, list) else list(sorted_paths)
+        cuts = _name_starts(paths)
+        names = [p[i:] for p, i in zip(paths, cuts)]
+        self._names.extend(names)
+        pos = 0
+        for parent, run in groupby([p[:i] for p, i in zip(paths, cuts)]):
+            n = len(tuple(run)) # 在 C 层数完一段
+            did = self._dir_id(parent)
+            self._members[did].update(names[pos:pos + n])
+            self._parents.extend(array("I", (did,)) * n)
+            pos += n
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        # 全部在 C 层拼接（map + operator.add），百万条目的 list(self) 比逐个 yield 快数倍
+        return map(add, map(self._dirs.__getitem__, self._parents), self._names)
+
+    def __contains__(self, path):
+        parent, name = _split_last(path)
+        did = self._dir_ids.get(parent)
+        return did is not None and name in self._members[did]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._dirs[did] + name for did, name in zip(self._parents[index], self._names[index])]
+        return self._dirs[self._parents[index]] + self._names[index]
+
+    def index(self, path) -> int:
+        """返回路径在排序列表中的位置，不存在时抛出 ValueError"""
+        if path not in self:
+            raise ValueError(f"{path!r} is not in the set")
+        return bisect.bisect_left(self, path)
+
+    def as_list(self) -> list:
+        """返回新建的完整路径列表"""
+        return list(self)
+
+    def basename(self, index: int) -> str:
+        name = self._names[index]
+        return name if name else Path(self[index]).name # 以分隔符结尾的路径
+
+    def add(self, path) -> bool:
+        return bool(self.update((path,)))
+
+    def update(self, paths) -> list:
+        """批量添加路径，返回本次真正新增的路径（已排序）"""
+        new = sorted({p for p in paths if p not in self})
+        if not new:
+            return new
+        if self._observers:
+            self._insert_notified(new)
+        elif len(new) <= _INSORT_LIMIT:
+            for p in new:
+                self._insert(bisect.bisect_left(self, p), (p,))
+        else:
+            self._splice(_group_runs([(bisect.bisect_left(self, p), p) for p in new], contiguous=False))
+        if self._on_change:
+            self._on_change(self._kind, new, ())
+        return new
+
+    def _insert(self, first: int, run):
+        parents, names = array("I"), []
+        for p in run:
+            parent, name = _split_last(p)
+            did = self._dir_id(parent)
+            self._members[did].add(name)
+            parents.append(did)
+            names.append(name)
+        self._parents[first:first] = parents
+        self._names[first:first] = names
+
+    def _splice(self, runs: list):
+        """
+        一次性插入多段 [(原位置, [路径...]), ...]：新的父目录编号数组和名称列表由原有切片与新段依次拼接而成，
+        只拆分新路径，已有条目不拼出完整路径也不重新拆分，整体是一次线性复制
+        """
+        parents, names = array("I"), []
+        prev = 0
+        for pos, run in runs:
+            parents.extend(self._parents[prev:pos])
+            names.extend(self._names[prev:pos])
+            for p in run:
+                parent, name = _split_last(p)
+                did = self._dir_id(parent)
+                self._members[did].add(name)
+                parents.append(did)
+                names.append(name)
+            prev = pos
+        parents.extend(self._parents[prev:])
+        names.extend(self._names[prev:])
+        self._parents, self._names = parents, names
+
+    def _insert_notified(self, new: list):
+        runs = _group_runs([(bisect.bisect_left(self, p), p) for p in new], contiguous=False)
+        if len(runs) > _MAX_NOTIFY_RUNS:
+            self._notify("about_to_reset")
+            self._splice(runs)
+            self._notify("reset_done")
+            return
+        offset = 0
+        for pos, run in runs:
+            first = pos + offset
+            self._notify("rows_about_to_be_inserted", self._kind, first, len(run))
+            self._insert(first, run)
+            self._notify("rows_inserted", self._kind)
+            offset += len(run)
+
+    def discard(self, path) -> bool:
+        return bool(self.difference_update((path,)))
+
+    def difference_update(self, paths) -> list:
+        """批量移除路径，返回本次真正移除的路径（已排序）"""
+        gone = sorted({p for p in paths if p in self})
+        if not gone:
+            return gone
+        positions = [bisect.bisect_left(self, p) for p in gone]
+        for p in gone:
+            parent, name = _split_last(p)
+            self._members[self._dir_ids[parent]].discard(name)
+        runs = _group_runs(list(zip(positions, gone)), contiguous=True)
+        if self._observers and len(runs) > _MAX_NOTIFY_RUNS:
+            self._notify("about_to_reset")
+            self._drop_positions(positions)
+            self._notify("reset_done")
+        elif len(runs) > _MAX_NOTIFY_RUNS:
+            self._drop_positions(positions)
+        else:
+            for pos, run in reversed(runs): # 从后往前，位置不受前面移除的影响
+                self._notify("rows_about_to_be_removed", self._kind, pos, len(run))
+                del self._parents[pos:pos + len(run)]
+                del self._names[pos:pos + len(run)]
+                self._notify("rows_removed", self._kind)
+        if self._on_change:
+            self._on_change(self._kind, (), gone)
+        return gone
+
+    def _drop_positions(self, positions: list):
+        """移除升序的各个位置：保留的区间按切片整体复制，不逐个条目处理"""
+        parents, names = array("I"), []
+        prev = 0
+        for pos in positions:
+            parents.extend(self._parents[prev:pos])
+            names.extend(self._names[prev:pos])
+            prev = pos + 1
+        parents.extend(self._parents[prev:])
+        names.extend(self._names[prev:])
+        self._parents, self._names = parents, names
+
+    def replace(self, paths):
+        """用一组新路径整体替换当前内容"""
+        new_members = set(paths)
+        if self._on_change:
+            added = [p for p in new_members if p not in self]
+            removed = [p for p in self if p not in new_members]
+            if not added and not removed:
+                return
+        self._notify("about_to_reset")
+        self._reset(sorted(new_members))
+        self._notify("reset_done")
+        if self._on_change:
+            self._on_change(self._kind, added, removed)
+
+    def replace_sorted(self, paths) -> tuple[list, list]:
+        """同 SortedPathSet.replace_sorted：paths 须已排序且无重复，返回 (新增, 移除)，不调用 on_change"""
+        items = paths if isinstance(paths, list) else list(paths)
+        if len(self):
+            members = set(items)
+            added = [p for p in items if p not in self]
+            removed = [p for p in self if p not in members]
+        else:
+            added, removed = items, [] # 内部不保存完整字符串，可以直接返回调用方的列表
+        if added or removed:
+            self._notify("about_to_reset")
+            self._reset(items)
+            self._notify("reset_done")
+        return added, removed
+
+    def clear(self):
+        self.replace(())
+
+    def _notify(self, method: str, *args):
+        for observer in self._observers:
+            getattr(observer, method)(*args)
+
+
+class SelectionStore:
+    """
+    文件/目录选择结果的统一存储，供 DropReceiverWidget 与 FileOpenWidget 共享。
+    不依赖 Qt，可以在没有 QApplication 的情况下单独使用；
+    显示模型通过 add_observer() 注册 SelectionObserver 获得增量变更通知。
+    每次内容确实变化，选择代数 generation 加一；track_changes=True 时还会记录
+    自上次 take_changes() 以来的净增量，供增量信号使用。
+    通过 set_key_func() 设置规范键函数（例如 PathResolver.canonical）后，选择的同一性按规范键判断：
+    指向同一对象的不同写法只保留最先加入的那个，存储和显示的仍是用户给出的原始路径。
+    compact=True 时文件和目录改用共享父目录前缀的 CompactPathSet 保存，适合上百万条目的选择；
+    此时 files/dirs.as_list() 每次都会新建列表。
+    """
+
+    def __init__(self, track_changes: bool = False, compact: bool = False):
+        self._observers = []
+        self._key_func = None
+        self._keys = {"files": {}, "dirs": {}} # kind -> {规范键: 存储的路径}，仅在设置了 key_func 时维护
+        self._generation = 0
+        self._versions = {"files": 0, "dirs": 0} # 各分区的内容版本，快照据此只重建变化的分区
+        self._snapshot = SelectionSnapshot((), (), 0)
+        self._snapshot_versions = (0, 0)
+        self._track_changes = track_changes
+        self._journal = {"files": (set(), set()), "dirs": (set(), set())} # kind -> (新增, 移除)
+        path_set = CompactPathSet if compact else SortedPathSet
+        self.compact = compact
+        self.files = path_set(kind="files", observers=self._observers, on_change=self._on_change)
+        self.dirs = path_set(kind="dirs", observers=self._observers, on_change=self._on_change)
+
+    def __len__(self):
+        return len(self.files) + len(self.dirs)
+
+    @property
+    def generation(self) -> int:
+        """单调递增的选择代数，内容每变化一次加一"""
+        return self._generation
+
+    def snapshot(self) -> SelectionSnapshot:
+        """
+        返回当前内容的不可变快照。内容没变时直接返回上一次的对象（不复制）；
+        变化后第一次调用才重建，且只重建发生变化的分区，另一分区的元组继续共享。
+        """
+        snap = self._snapshot
+        if snap.generation == self._generation:
+            return snap
+        versions = (self._versions["files"], self._versions["dirs"])
+        files = snap.files if versions[0] == self._snapshot_versions[0] else tuple(self.files)
+        dirs = snap.dirs if versions[1] == self._snapshot_versions[1] else tuple(self.dirs)
+        self._snapshot = SelectionSnapshot(files, dirs, self._generation)
+        self._snapshot_versions = versions
+        return self._snapshot
+
+    def _on_change(self, kind: str, added, removed):
+        self._generation += 1
+        self._versions[kind] += 1
+        if not self._track_changes:
+            return
+        pending_added, pending_removed = self._journal[kind]
+        for p in added:
+            if p in pending_removed:
+                pending_removed.discard(p) # 先移除又加回：相互抵消
+            else:
+                pending_added.add(p)
+        for p in removed:
+            if p in pending_added:
+                pending_added.discard(p)
+            else:
+                pending_removed.add(p)
+
+    def take_changes(self) -> SelectionChange:
+        """取出并清空自上次调用以来的净增量（需要 track_changes=True）"""
+        (added_files, removed_files), (added_dirs, removed_dirs) = self._journal["files"], self._journal["dirs"]
+        self._journal = {"files": (set(), set()), "dirs": (set(), set())}
+        return SelectionChange(sorted(added_files), sorted(added_dirs),
+                               sorted(removed_files), sorted(removed_dirs), self._generation)
+
+    def add_observer(self, observer: SelectionObserver):
+        if observer not in self._observers:
+            self._observers.append(observer)
+
+    def remove_observer(self, observer: SelectionObserver):
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def set_key_func(self, key_func):
+        """
+        设置规范键函数（None 表示按原始字符串判断）。已有内容按新的键重新去重，
+        每组等价路径中保留排序最前的一个，其余被移除。
+        """
+        self._key_func = key_func
+        self._keys = {"files": {}, "dirs": {}}
+        if key_func is None:
+            return
+        for kind, paths in (("files", self.files), ("dirs", self.dirs)):
+            keys, dups = self._keys[kind], []
+            for p in paths:
+                k = key_func(p)
+                if k in keys:
+                    dups.append(p)
+                else:
+                    keys[k] = p
+            if dups:
+                paths.difference_update(dups)
+
+    def key_func(self):
+        return self._key_func
+
+    def _unseen(self, kind: str, paths) -> list:
+        """过滤掉规范键已在选择中（或在本批中重复）的路径，并登记剩余路径的键"""
+        keys, key_func, fresh = self._keys[kind], self._key_func, []
+        for p in paths:
+            k = key_func(p)
+            if k not in keys:
+                keys[k] = p
+                fresh.append(p)
+        return fresh
+
+    def _stored(self, kind: str, paths) -> list:
+        """把给出的路径映射为选择中实际存储的等价路径，并注销它们的键"""
+        keys, key_func, stored = self._keys[kind], self._key_func, []
+        for p in paths:
+            hit = keys.pop(key_func(p), None)
+            if hit is not None:
+                stored.append(hit)
+        return stored
+
+    def add(self, files, dirs) -> tuple[list, list]:
+        """追加文件和目录，返回 (新增文件, 新增目录)"""
+        if self._key_func is not None:
+            files, dirs = self._unseen("files", files), self._unseen("dirs", dirs)
+        return self.files.update(files), self.dirs.update(dirs)
+
+    def remove(self, files, dirs) -> tuple[list, list]:
+        """移除文件和目录（设置了 key_func 时可以用任意等价写法），返回 (移除的文件, 移除的目录)"""
+        if self._key_func is not None:
+            files, dirs = self._stored("files", files), self._stored("dirs", dirs)
+        return self.files.difference_update(files), self.dirs.difference_update(dirs)
+
+    def replace(self, files, dirs):
+        """整体替换为新的文件和目录"""
+        if self._key_func is not None:
+            self._keys = {"files": {}, "dirs": {}}
+            files, dirs = self._unseen("files", files), self._unseen("dirs", dirs)
+        self.files.replace(files)
+        self.dirs.replace(dirs)
+
+    def replace_sorted(self, files, dirs) -> SelectionChange:
+        """
+        用已排序且无重复的文件和目录整体替换（例如从会话文件恢复），不再去重排序，也不经过增量日志，
+        直接返回这次替换的净增量；之后的 take_changes() 不再包含它。
+        设置了 key_func 或日志中还有未取出的增量时退回普通的 replace() + take_changes()。
+        """
+        pending = any(paths for pair in self._journal.values() for paths in pair)
+        if self._key_func is not None or pending:
+            self.replace(files, dirs)
+            return self.take_changes()
+        added_files, removed_files = self.files.replace_sorted(files)
+        added_dirs, removed_dirs = self.dirs.replace_sorted(dirs)
+        for kind, changed in (("files", added_files or removed_files), ("dirs", added_dirs or removed_dirs)):
+            if changed:
+                self._generation += 1
+                self._versions[kind] += 1
+        return SelectionChange(added_files, added_dirs, removed_files, removed_dirs, self._generation)
+
+    def clear(self):
+        self._keys = {"files": {}, "dirs": {}}
+        self.files.clear()
+        self.dirs.clear()
@@ -0,0 +1,97 @@
+# Selection_view.py
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PySide6.QtGui import QFont
+from .Selection_store import SelectionStore, SelectionObserver
+
+
+class SelectionListModel(QAbstractListModel, SelectionObserver):
+    """
+    直接读取 SelectionStore 的列表模型，配合 QListView 只渲染可见行。
+    行布局与原 QLabel 显示一致：「文件:」标题 + 文件名，「目录:」标题 + 目录名。
+    作为存储的观察者，追加/移除按连续段增量通知视图，不再整体重建。
+    """
+
+    def __init__(self, store: SelectionStore, parent=None):
+        super().__init__(parent)
+        self._store = store
+        store.add_observer(self)
+        self._header_font = QFont()
+        self._header_font.setBold(True)
+
+    # --- 行号与存储位置的映射 ---
+    def _dirs_header_row(self) -> int:
+        n_files = len(self._store.files)
+        return n_files + 1 if n_files else 0
+
+    def _locate(self, row: int):
+        """返回 (kind, index)，kind 为 'files_header'/'file'/'dirs_header'/'dir'"""
+        n_files = len(self._store.files)
+        if n_files:
+            if row == 0:
+                return "files_header", -1
+            if row <= n_files:
+                return "file", row - 1
+            row -= n_files + 1
+        if row == 0:
+            return "dirs_header", -1
+        return "dir", row - 1
+
+    # --- QAbstractListModel 接口 ---
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        n_files, n_dirs = len(self._store.files), len(self._store.dirs)
+        return (n_files + 1 if n_files else 0) + (n_dirs + 1 if n_dirs else 0)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        kind, i = self._locate(index.row())
+        if role == Qt.DisplayRole:
+            if kind == "files_header":
+                return "文件:"
+            if kind == "dirs_header":
+                return "目录:"
+            return f"- {self._section(kind + 's').basename(i)}"
+        if role == Qt.ToolTipRole and kind in ("file", "dir"):
+            return self._store.files[i] if kind == "file" else self._store.dirs[i]
+        if role == Qt.FontRole and kind in ("files_header", "dirs_header"):
+            return self._header_font
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled if index.isValid() else Qt.NoItemFlags
+
+    # --- SelectionObserver 接口：把存储的变更翻译成行插入/移除通知 ---
+    def _section(self, kind: str):
+        return self._store.files if kind == "files" else self._store.dirs
+
+    def _section_start(self, kind: str) -> int:
+        """该分区标题行所在的行号"""
+        return 0 if kind == "files" else self._dirs_header_row()
+
+    def rows_about_to_be_inserted(self, kind: str, first: int, count: int):
+        start = self._section_start(kind)
+        if not self._section(kind): # 分区原本为空：连同标题行一起插入
+            self.beginInsertRows(QModelIndex(), start, start + count)
+        else:
+            self.beginInsertRows(QModelIndex(), start + 1 + first, start + first + count)
+
+    def rows_inserted(self, kind: str):
+        self.endInsertRows()
+
+    def rows_about_to_be_removed(self, kind: str, first: int, count: int):
+        start = self._section_start(kind)
+        if count == len(self._section(kind)): # 分区被清空：标题行一起移除
+            self.beginRemoveRows(QModelIndex(), start, start + count)
+        else:
+            self.beginRemoveRows(QModelIndex(), start + 1 + first, start + first + count)
+
+    def rows_removed(self, kind: str):
+        self.endRemoveRows()
+
+    def about_to_reset(self):
+        self.beginResetModel()
+
+    def reset_done(self):
+        self.endResetModel()
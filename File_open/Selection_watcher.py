@@ -0,0 +1,165 @@
+# Selection_watcher.py
+import os
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, QFileSystemWatcher, Signal
+
+
+def _list_inodes(directory: str):
+    """读取目录，返回 {名称: inode}；目录不存在或不可读时返回 None"""
+    listing = {}
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    listing[entry.name] = entry.inode()
+                except OSError:
+                    listing[entry.name] = None
+    except OSError:
+        return None
+    return listing
+
+
+class _ScanSignals(QObject):
+    scanned = Signal(int, str, object) # generation, 目录, {名称: inode}（不可读时为 None）
+
+
+class _ScanTask(QRunnable):
+    def __init__(self, generation: int, dirs: list, signals: _ScanSignals):
+        super().__init__()
+        self._generation = generation
+        self._dirs = dirs
+        self._signals = signals
+
+    def run(self):
+        for d in self._dirs:
+            self._signals.scanned.emit(self._generation, d, _list_inodes(d))
+
+
+class SelectionWatcher(QObject):
+    """
+    监视选择中的条目在磁盘上被删除或改名。
+    不逐个监视条目，而是通过 QFileSystemWatcher 监视它们的父目录：同一目录下的所有条目只占一个监视名额，
+    最多监视 max_watched 个目录，超出的目录排队，有空位时再补上（排队期间的变化不会被发现）。
+    目录变化通知经防抖合并，之后在后台线程中每个目录只读取一次，与记录的条目 inode 比较：
+    条目消失且同一目录中出现 inode 相同的新名字视为改名，否则视为删除。
+    结果通过 `changes_found` 发出，由调用方应用到选择上；watcher 自己的记录已同步更新，
+    调用方随后对同样的变化调用 track()/untrack() 不会引起重复检查。
+    """
+    changes_found = Signal(list, list, list) # 删除的文件, 删除的目录, [(旧路径, 新路径, 是否目录)...]
+
+    def __init__(self, parent=None, max_watched: int = 1000, debounce_ms: int = 300):
+        super().__init__(parent)
+        self._max_watched = max_watched
+        self._children = {} # 父目录 -> {名称: [路径, 是否目录, inode（未知时为 None）]}
+        self._watched = set()
+        self._overflow = [] # 因名额不足而等待监视的父目录
+        self._pending = set() # 等待读取的父目录
+        self._generation = 0 # clear() 时递增，丢弃在途的读取结果
+        self._pool = QThreadPool(self) # 独立线程池：卡住的网络挂载不会占用全局线程池
+        self._pool.setMaxThreadCount(2)
+        self._signals = _ScanSignals(self)
+        self._signals.scanned.connect(self._on_scanned)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._flush)
+
+    def track(self, files, dirs):
+        """开始监视这些条目；新条目的 inode 在下一次防抖后于后台读取（届时已不存在的条目按删除报告）"""
+        for paths, is_dir in ((files, False), (dirs, True)):
+            for path in paths:
+                parent, name = os.path.split(os.path.normpath(path))
+                if not name:
+                    continue # 根目录没有父目录可监视
+                children = self._children.get(parent)
+                if children is None:
+                    children = self._children[parent] = {}
+                    self._watch(parent)
+                if name not in children:
+                    children[name] = [path, is_dir, None]
+                    self._pending.add(parent)
+        if self._pending:
+            self._debounce.start()
+
+    def untrack(self, files, dirs):
+        """停止监视这些条目；父目录下不再有被监视的条目时释放其监视名额"""
+        emptied = []
+        for path in (*files, *dirs):
+            parent, name = os.path.split(os.path.normpath(path))
+            children = self._children.get(parent)
+            if children is not None and children.pop(name, None) is not None and not children:
+                del self._children[parent]
+                emptied.append(parent)
+        self._release(emptied)
+
+    def clear(self):
+        """停止监视所有条目"""
+        self._generation += 1
+        self._children.clear()
+        self._pending.clear()
+        self._overflow.clear()
+        self._debounce.stop()
+        if self._watched:
+            self._watcher.removePaths(list(self._watched))
+            self._watched.clear()
+
+    def watched_directories(self) -> list:
+        return sorted(self._watched)
+
+    def _watch(self, directory: str):
+        if len(self._watched) < self._max_watched:
+            self._watched.add(directory)
+            self._watcher.addPath(directory)
+        else:
+            self._overflow.append(directory)
+
+    def _release(self, dirs: list):
+        for d in dirs:
+            if d in self._watched:
+                self._watched.discard(d)
+                self._watcher.removePath(d)
+        while self._overflow and len(self._watched) < self._max_watched:
+            d = self._overflow.pop(0)
+            if d in self._children:
+                self._watch(d)
+                self._pending.add(d) # 排队期间的变化没有被监视到，补读一次
+                self._debounce.start()
+
+    def _on_directory_changed(self, path: str):
+        if path in self._children:
+            self._pending.add(path)
+            self._debounce.start() # 合并一连串变化（例如批量移动）为一次读取
+
+    def _flush(self):
+        if self._pending:
+            dirs, self._pending = sorted(self._pending), set()
+            self._pool.start(_ScanTask(self._generation, dirs, self._signals))
+
+    def _on_scanned(self, generation: int, directory: str, listing):
+        children = self._children.get(directory)
+        if generation != self._generation or children is None:
+            return
+        removed_files, removed_dirs, renamed = [], [], []
+        by_inode = None # 目录中未被跟踪的新名字：inode -> 名称，需要时才建立
+        for name, record in list(children.items()):
+            path, is_dir, inode = record
+            if listing is not None and name in listing:
+                record[2] = listing[name]
+                continue
+            del children[name]
+            if listing is not None and inode is not None:
+                if by_inode is None:
+                    by_inode = {ino: n for n, ino in listing.items() if n not in children and ino is not None}
+                new_name = by_inode.pop(inode, None)
+                if new_name is not None:
+                    new_path = os.path.join(directory, new_name)
+                    children[new_name] = [new_path, is_dir, inode]
+                    renamed.append((path, new_path, is_dir))
+                    continue
+            (removed_dirs if is_dir else removed_files).append(path)
+        if not children:
+            del self._children[directory]
+            self._release([directory])
+        if removed_files or removed_dirs or renamed:
+            self.changes_found.emit(removed_files, removed_dirs, renamed)
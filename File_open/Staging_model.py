@@ -0,0 +1,105 @@
+#Staging_model
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+class StagingModel(QAbstractListModel):
+    """Insertion-ordered list of staged paths with a path -> row hash index.
+    Membership checks are O(1) and add_many() inserts a whole batch with a single row notification.
+    With a key function set (e.g. PathResolver.canonical) paths are identified by their key, so two spellings
+    of the same file are staged once; the path as given is what is displayed and returned. Each row's key is
+    computed once, when it is staged, so removals never call the key function again."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._paths = []
+        self._keys = [] # Key of each row, parallel to _paths
+        self._rows = {} # key -> row
+        self._key_func = None
+    def _key(self, path: str):
+        return path if self._key_func is None else self._key_func(path)
+    def set_key_func(self, key_func):
+        """Sets the identity key function (None: the path string); rows that become duplicates are removed."""
+        self._key_func = key_func
+        seen, kept, keys = set(), [], []
+        for p in self._paths:
+            k = self._key(p)
+            if k not in seen:
+                seen.add(k)
+                kept.append(p)
+                keys.append(k)
+        if len(kept) != len(self._paths):
+            self.beginResetModel()
+            self._paths = kept
+            self._keys = keys
+            self.endResetModel()
+        else:
+            self._keys = keys
+        self._rows = {k: row for row, k in enumerate(keys)}
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self._paths[index.row()]
+        return None
+    def __contains__(self, path):
+        return self._key(path) in self._rows
+    def __len__(self):
+        return len(self._paths)
+    def paths(self) -> list:
+        """The staged paths in insertion order (the internal list, do not modify)."""
+        return self._paths
+    def path_at(self, row: int) -> str:
+        return self._paths[row]
+    def add(self, path: str) -> bool:
+        return bool(self.add_many((path,)))
+    def add_many(self, paths) -> list:
+        """Appends every path not already staged in one batch; returns the paths actually added."""
+        new, keys = [], []
+        seen = set()
+        for p in paths:
+            k = self._key(p)
+            if k not in self._rows and k not in seen:
+                seen.add(k)
+                new.append(p)
+                keys.append(k)
+        if not new:
+            return new
+        first = len(self._paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+        self._paths.extend(new)
+        self._keys.extend(keys)
+        for row, k in enumerate(keys, first):
+            self._rows[k] = row
+        self.endInsertRows()
+        return new
+    def remove_rows(self, rows) -> list:
+        """Removes the given rows (any order); returns the removed paths."""
+        rows = sorted(set(rows), reverse=True)
+        if not rows:
+            return []
+        if len(rows) > 64: # Many scattered rows: one reset is cheaper than per-row notifications
+            self.beginResetModel()
+            doomed = set(rows)
+            removed = [self._paths[row] for row in rows]
+            removed_keys = [self._keys[row] for row in rows]
+            self._paths = [p for row, p in enumerate(self._paths) if row not in doomed]
+            self._keys = [k for row, k in enumerate(self._keys) if row not in doomed]
+            self.endResetModel()
+        else:
+            removed, removed_keys = [], []
+            for row in rows: # Bottom-up so earlier row numbers stay valid
+                self.beginRemoveRows(QModelIndex(), row, row)
+                removed.append(self._paths.pop(row))
+                removed_keys.append(self._keys.pop(row))
+                self.endRemoveRows()
+        for k in removed_keys:
+            del self._rows[k]
+        for row in range(rows[-1], len(self._keys)): # Re-index only the rows that shifted
+            self._rows[self._keys[row]] = row
+        return removed
+    def remove(self, path: str) -> bool:
+        row = self._rows.get(self._key(path))
+        return row is not None and bool(self.remove_rows((row,)))
+    def clear(self):
+        self.beginResetModel()
+        self._paths = []
+        self._keys = []
+        self._rows = {}
+        self.endResetModel()
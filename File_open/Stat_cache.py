@@ -0,0 +1,103 @@
+# Stat_cache.py
+import os
+import threading
+from collections import OrderedDict
+
+
+class StatCache:
+    """
+    以 (st_dev, st_ino, st_mtime_ns) 为键的有界 LRU 缓存，不依赖 Qt，可在多个线程中使用。
+    同一个文件/目录只要没有被修改，键就不变，缓存的结果（例如目录的递归大小）就可以直接复用；
+    被修改后 mtime 变化，旧条目自然失效，最终被 LRU 淘汰。
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key_of(st: os.stat_result) -> tuple:
+        return st.st_dev, st.st_ino, st.st_mtime_ns
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _scan_dir_size(path: str, cache: StatCache, device=None):
+    """
+    读取单个目录：返回 (键, 直属文件字节数, [子目录...], 本次实际读取的条目数)。
+    缓存中只保存目录自身的直属文件字节数和子目录名，按目录自己的 (dev, inode, mtime) 为键：
+    直属条目有增删改名时 mtime 改变，缓存自然失效；命中时只需一次 stat，不再 scandir。
+    指定 device 而目录位于其他设备上时返回 None（不读取）。
+    """
+    key = StatCache.key_of(os.stat(path, follow_symlinks=False))
+    if device is not None and key[0] != device:
+        return None
+    cached = cache.get(key)
+    if cached is not None:
+        total, names = cached
+        return key, total, [os.path.join(path, name) for name in names], 0
+    total, names, count = 0, [], 0
+    with os.scandir(path) as it:
+        for entry in it:
+            count += 1
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    names.append(entry.name)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+    cache.put(key, (total, tuple(names)))
+    return key, total, [os.path.join(path, name) for name in names], count
+
+
+def dir_size(path: str, cache: StatCache, cancel_event: threading.Event = None, max_entries: int = None):
+    """
+    计算目录的递归大小（字节），不跟随符号链接，也不进入挂载在其他设备上的子目录（同 du -x）。
+    被取消、根目录不可读或未命中缓存的条目超过 max_entries 时返回 None。
+    缓存的是每个目录自身的直属内容（见 _scan_dir_size），合计每次由各子目录重新累加：
+    深处的变化只让变化的那个目录重新读取，其余目录各只需一次 stat，合计总是反映当前的目录结构。
+    注意目录的 mtime 只随直属条目的增删改名变化，已有文件原地改写（大小改变）不会使缓存失效。
+    """
+    try:
+        key, total, subdirs, scanned = _scan_dir_size(path, cache)
+    except OSError:
+        return None
+    device = key[0]
+    stack = subdirs
+    while stack:
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        if max_entries is not None and scanned > max_entries:
+            return None
+        try:
+            child = _scan_dir_size(stack.pop(), cache, device)
+        except OSError:
+            continue # 无权限或已被删除的子目录按 0 计
+        if child is None:
+            continue # 其他文件系统的挂载点
+        _, child_total, child_subdirs, count = child
+        scanned += count
+        total += child_total
+        stack.extend(child_subdirs)
+    return total
@@ -0,0 +1,311 @@
+# bench_hot_paths.py
+"""
+拖放、选择存储和文件选择对话框热点路径的基准测试，在 QT_QPA_PLATFORM=offscreen 下运行，不需要显示器。
+
+用法：
+    python benchmarks/bench_hot_paths.py                      # 运行全部，结果写入 benchmarks/results/<git 版本>.json
+    python benchmarks/bench_hot_paths.py --sizes 1000 10000   # 只测部分规模
+    python benchmarks/bench_hot_paths.py --compare abc1234    # 运行后与 results/abc1234.json 对比
+    python benchmarks/bench_hot_paths.py --compare-only a b   # 只对比两份已有结果
+    python benchmarks/bench_hot_paths.py --sizes              # 只测启动（导入耗时和首帧）
+
+每项重复 --repeat 次，记录最小值和中位数（秒）。启动相关的各项在全新的子进程中测量。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+from PySide6 import __version__ as PYSIDE_VERSION
+from PySide6.QtCore import Qt, QMimeData, QUrl, QPointF
+from PySide6.QtGui import QDropEvent
+from PySide6.QtWidgets import QApplication
+
+from File_open.Drop_receiver import DropReceiverWidget, DropMode
+from File_open.File_open import FileOpenWidget
+from File_open.File_dialog import FilePickerDialog, FilePickerWidget, acquire_picker_dialog, warm_up_picker_dialog
+
+
+def _revision() -> str:
+    """当前 git 短版本号，工作区有未提交修改时加 -dirty"""
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                             check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _wait_until(app: QApplication, predicate, timeout: float = 60.0):
+    """处理事件直到 predicate() 为真；超时抛出 TimeoutError"""
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark step did not finish in time")
+        app.processEvents()
+        time.sleep(0.0005)
+
+
+# 启动测量：各自在全新的解释器中运行，打印以秒为单位的耗时
+_STARTUP_SNIPPETS = {
+    # 不依赖 Qt 的核心，导入后不应加载任何 PySide6 模块
+    "import_core": """
+import sys, time
+t0 = time.perf_counter()
+import File_open.Selection_core
+dt = time.perf_counter() - t0
+assert not any(m.startswith("PySide6") for m in sys.modules), "Selection_core pulled in PySide6"
+print(dt)
+""",
+    "import_file_open_widget": """
+import time
+t0 = time.perf_counter()
+import File_open.File_open
+print(time.perf_counter() - t0)
+""",
+    # 从开始导入到 FileOpenWidget 第一次绘制完成
+    "first_frame": """
+import time
+t0 = time.perf_counter()
+from PySide6.QtCore import QObject, QEvent, QTimer
+from PySide6.QtWidgets import QApplication
+from File_open.File_open import FileOpenWidget
+app = QApplication([])
+widget = FileOpenWidget()
+class _FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and not hasattr(self, "dt"):
+            self.dt = time.perf_counter() - t0
+            QTimer.singleShot(0, app.quit)
+        return False
+probe = _FirstPaint()
+widget.installEventFilter(probe)
+QTimer.singleShot(10_000, app.quit)
+widget.show()
+app.exec()
+print(probe.dt)
+""",
+}
+
+
+def _make_fixture(root: Path, count: int, per_dir: int = 1000) -> list:
+    """在 root 下生成 count 个空文件（每个子目录 per_dir 个），返回其路径列表"""
+    paths = []
+    for i in range(count):
+        d = root / f"d{i // per_dir:04d}"
+        if i % per_dir == 0:
+            d.mkdir(exist_ok=True)
+        p = d / f"file_{i:06d}.dat"
+        p.touch()
+        paths.append(str(p))
+    return paths
+
+
+def _drop_event(paths: list) -> tuple:
+    """构造拖放事件；QDropEvent 不持有 QMimeData，调用方需要一并保留返回的 mime"""
+    mime = QMimeData()
+    mime.setUrls([QUrl.fromLocalFile(p) for p in paths])
+    return QDropEvent(QPointF(10, 10), Qt.CopyAction, mime, Qt.LeftButton, Qt.NoModifier), mime
+
+
+class Bench:
+    def __init__(self, app: QApplication, repeat: int):
+        self.app = app
+        self.repeat = repeat
+        self.results = {}
+
+    def record(self, name: str, n: int, fn, setup=None):
+        """运行 fn（可选每次先调用不计时的 setup）repeat 次并记录耗时"""
+        times = []
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+            self.app.processEvents()
+        self.results[name] = {"n": n, "min": min(times), "median": statistics.median(times)}
+        print(f"{name:<32} n={n:<7} min={min(times) * 1000:10.2f} ms  median={statistics.median(times) * 1000:10.2f} ms")
+
+    def record_values(self, name: str, n: int, times: list):
+        """记录在别处测得的 repeat 个耗时"""
+        self.results[name] = {"n": n, "min": min(times), "median": statistics.median(times)}
+        print(f"{name:<32} n={n:<7} min={min(times) * 1000:10.2f} ms  median={statistics.median(times) * 1000:10.2f} ms")
+
+    # --- 启动 ---
+    def startup(self):
+        """包的导入耗时和首帧时间，每次都在新的子进程中测量（不受本进程已导入模块的影响）"""
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONDONTWRITEBYTECODE="1")
+        for name, code in _STARTUP_SNIPPETS.items():
+            times = []
+            for _ in range(self.repeat):
+                out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True,
+                                     check=True).stdout
+                times.append(float(out.strip().splitlines()[-1]))
+            self.record_values(name, 1, times)
+
+    # --- 拖放与选择 ---
+    def drop(self, paths: list):
+        n = len(paths)
+        widget = DropReceiverWidget()
+        widget.set_mode(DropMode.ONE_SHOT)
+        done = []
+        widget.dropped.connect(lambda files, dirs: done.append(len(files)))
+
+        def run():
+            done.clear()
+            event, _mime = _drop_event(paths)
+            widget.dropEvent(event)
+            _wait_until(self.app, lambda: done)
+        self.record(f"drop_to_dropped_{n}", n, run)
+
+        events = []
+        def prepare():
+            widget.clear_dropped_items()
+            events.append(_drop_event(paths)) # 构造 QMimeData 不计入
+        def dispatch():
+            event, _mime = events.pop()
+            widget.dropEvent(event) # 只计 GUI 线程上 dropEvent 本身的耗时
+        self.record(f"drop_event_dispatch_{n}", n, dispatch, setup=prepare)
+        _wait_until(self.app, lambda: not widget.is_classifying())
+        widget.deleteLater()
+
+    def selection(self, paths: list):
+        n = len(paths)
+        for use_list_view in (False, True):
+            tag = "list" if use_list_view else "label"
+            widget = DropReceiverWidget(use_list_view=use_list_view)
+            self.record(f"set_items_{tag}_{n}", n, lambda: widget.set_items(paths, []),
+                        setup=lambda: widget.set_items([], []))
+            self.record(f"update_display_{tag}_{n}", n, widget._update_display)
+            widget.deleteLater()
+
+    # --- 文件选择对话框 ---
+    def dialog_preload(self, paths: list):
+        """FileOpenWidget.pick() 的耗时：取得共享对话框、把当前选择预加载到暂存区并显示（每次计时前关闭上一次的对话框）"""
+        n = len(paths)
+        widget = FileOpenWidget()
+        widget.drop_receiver.set_items(paths, [])
+        warm_up_picker_dialog()
+        futures = []
+
+        def close_previous():
+            while futures:
+                futures.pop().cancel() # 取消 Future 即关闭对话框
+        self.record(f"dialog_preload_{n}", n, lambda: futures.append(widget.pick()), setup=close_previous)
+        close_previous()
+        widget.deleteLater()
+
+    def get_result(self, paths: list):
+        n = len(paths)
+        picker = FilePickerWidget()
+        picker.add_many_to_staging(paths, validate=False)
+        self.record(f"picker_get_result_{n}", n, picker.get_result)
+        picker.deleteLater()
+
+    def dialog_open(self):
+        """对话框从创建/取得到就绪（当前目录已加载并定位）的耗时：冷启动（新模型）与复用共享对话框"""
+        def ready(dialog):
+            return dialog.picker.tree.currentIndex().isValid()
+
+        def cold():
+            dialog = FilePickerDialog() # 自带新的 QFileSystemModel
+            dialog.show()
+            _wait_until(self.app, lambda: ready(dialog))
+            dialog.hide()
+            dialog.deleteLater()
+        self.record("dialog_open_cold", 1, cold)
+
+        warm_up_picker_dialog()
+        _wait_until(self.app, lambda: ready(acquire_picker_dialog()))
+
+        def warm():
+            dialog = acquire_picker_dialog()
+            dialog.show()
+            _wait_until(self.app, lambda: ready(dialog))
+            dialog.hide()
+        self.record("dialog_open_warm", 1, warm)
+
+
+def _load(label_or_path: str) -> dict:
+    path = Path(label_or_path)
+    if not path.suffix:
+        path = RESULTS_DIR / f"{label_or_path}.json"
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base: dict, new: dict):
+    """打印两份结果的中位数对比（比值 > 1 表示变慢）"""
+    print(f"\n{'benchmark':<32} {base['revision']:>14} {new['revision']:>14}   ratio")
+    for name, res in new["results"].items():
+        old = base["results"].get(name)
+        if old is None:
+            print(f"{name:<32} {'-':>14} {res['median'] * 1000:11.2f} ms")
+            continue
+        ratio = res["median"] / old["median"] if old["median"] else float("inf")
+        flag = "  <-- slower" if ratio > 1.2 else ("  faster" if ratio < 0.8 else "")
+        print(f"{name:<32} {old['median'] * 1000:11.2f} ms {res['median'] * 1000:11.2f} ms {ratio:7.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="File_open hot path benchmarks (offscreen)")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--label", default=None, help="result name (default: git revision)")
+    parser.add_argument("--compare", default=None, help="revision label or JSON path to compare against")
+    parser.add_argument("--compare-only", nargs=2, metavar=("BASE", "NEW"), help="compare two stored results")
+    args = parser.parse_args()
+
+    if args.compare_only:
+        compare(_load(args.compare_only[0]), _load(args.compare_only[1]))
+        return
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    bench = Bench(app, args.repeat)
+    bench.startup()
+    if args.sizes:
+        with tempfile.TemporaryDirectory(prefix="file_open_bench_") as tmp:
+            all_paths = _make_fixture(Path(tmp), max(args.sizes))
+            for n in sorted(args.sizes):
+                paths = all_paths[:n]
+                bench.drop(paths)
+                bench.selection(paths)
+                bench.dialog_preload(paths)
+                bench.get_result(paths)
+            bench.dialog_open()
+
+    label = args.label or _revision()
+    report = {
+        "revision": label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pyside": PYSIDE_VERSION,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": bench.results,
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / f"{label}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {out}")
+    if args.compare:
+        compare(_load(args.compare), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# bench_memory.py
+"""
+选择存储的内存基准：比较 SelectionStore 默认的完整字符串存储（SortedPathSet）与
+共享父目录前缀的紧凑存储（CompactPathSet）。不依赖 Qt，也不需要真实文件。
+
+用法：
+    python benchmarks/bench_memory.py                 # 默认 1M 个路径，结果写入 benchmarks/results/<git 版本>-memory.json
+    python benchmarks/bench_memory.py --count 100000 --per-dir 500 --depth 6
+
+路径形如 /<depth 层目录>/dNNNN/file_NNNNNNN.dat，每个末级目录 per_dir 个文件。
+内存用 tracemalloc 统计构建完成、输入列表释放后存储仍占用的字节数；构建耗时在不开 tracemalloc 时单独测量。
+add_batch 是向建好的存储再加入一批（--batch 个，默认 512，即 DropClassifier 每次回传的数量）分散在各目录中的新路径的耗时，
+拖放识别时 GUI 线程每收到一批结果就付出一次这个代价。
+"""
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+from File_open.Selection_store import SelectionStore
+
+
+def _revision() -> str:
+    """当前 git 短版本号（与 bench_hot_paths.py 相同，这里不导入它以免引入 Qt）"""
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                             check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _make_paths(count: int, per_dir: int, depth: int) -> list:
+    prefix = "/" + "/".join(f"level{i}_project_data" for i in range(depth))
+    return [f"{prefix}/d{i // per_dir:04d}/file_{i:07d}.dat" for i in range(count)]
+
+
+def _make_batch(count: int, per_dir: int, depth: int, batch: int) -> list:
+    """batch 个尚不在存储中的新路径，均匀分散在各个末级目录里（插入位置各不相同）"""
+    prefix = "/" + "/".join(f"level{i}_project_data" for i in range(depth))
+    n_dirs = max(count // per_dir, 1)
+    return [f"{prefix}/d{(i * n_dirs // batch) % n_dirs:04d}/new_{i:07d}.dat" for i in range(batch)]
+
+
+def _measure(count: int, per_dir: int, depth: int, compact: bool, batch: int) -> dict:
+    """构建存储和追加一批路径所需的时间，以及存储建好、输入列表释放后仍占用的内存（包括存储持有的字符串）"""
+    store = SelectionStore(compact=compact)
+    t0 = time.perf_counter()
+    store.add(_make_paths(count, per_dir, depth), ())
+    elapsed = time.perf_counter() - t0
+    new = _make_batch(count, per_dir, depth, batch)
+    t0 = time.perf_counter()
+    store.add(new, ())
+    add_elapsed = time.perf_counter() - t0
+    assert len(store) == count + batch
+    del store
+    gc.collect()
+    tracemalloc.start() # 内存单独再测一遍：tracemalloc 会让构建本身慢很多
+    store = SelectionStore(compact=compact)
+    store.add(_make_paths(count, per_dir, depth), ())
+    gc.collect()
+    used, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(store) == count
+    return {"bytes": used, "peak": peak, "build_seconds": elapsed, "add_batch_seconds": add_elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SelectionStore memory benchmark")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--per-dir", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=5, help="number of shared leading directories")
+    parser.add_argument("--batch", type=int, default=512, help="size of the batch added to the built store")
+    parser.add_argument("--label", default=None, help="result name (default: git revision)")
+    args = parser.parse_args()
+
+    results = {}
+    for compact in (False, True):
+        name = f"store_{'compact' if compact else 'strings'}_{args.count}"
+        results[name] = _measure(args.count, args.per_dir, args.depth, compact, args.batch)
+        r = results[name]
+        print(f"{name:<28} {r['bytes'] / 2**20:9.1f} MiB  peak {r['peak'] / 2**20:9.1f} MiB"
+              f"  build {r['build_seconds']:6.2f} s  add {args.batch} {r['add_batch_seconds'] * 1000:8.1f} ms")
+    full, compact = results[f"store_strings_{args.count}"], results[f"store_compact_{args.count}"]
+    print(f"\ncompact / strings: {compact['bytes'] / full['bytes']:.2f}")
+
+    label = (args.label or _revision()) + "-memory"
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / f"{label}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"revision": label, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "count": args.count,
+                   "per_dir": args.per_dir, "depth": args.depth, "batch": args.batch, "results": results}, f, indent=2)
+    print(f"results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
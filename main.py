@@ -19,7 +19,7 @@ class MainApplicationWindow(QMainWindow):
         main_layout.setSpacing(15)
 
         # 1. 实例化 FileOpenWidget
-        self.file_selector = FileOpenWidget()
+        self.file_selector = FileOpenWidget(prewarm_dialog=True) # 演示程序会打开对话框，提前预热
 
         # 2. 外部显示 FileOpenWidget 实时更新的结果
         self.realtime_status_label = QLabel("FileOpenWidget 实时状态: (无选择)")
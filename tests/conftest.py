@@ -0,0 +1,30 @@
+# conftest.py
+import os
+import sys
+import time
+
+import pytest
+
+# File_open 没有打包配置，测试直接从仓库根目录导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """离屏的 QApplication；没有安装 PySide6 时跳过依赖 Qt 的测试"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def wait_until(qapp):
+    """处理事件直到 condition() 为真，超时则测试失败"""
+    def wait(condition, timeout: float = 5.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                pytest.fail("timed out waiting for the event loop")
+            qapp.processEvents()
+            time.sleep(0.005)
+    return wait
@@ -0,0 +1,36 @@
+# test_dir_expander.py
+import threading
+import warnings
+
+
+def test_expansion_streams_files_and_finishes(qapp, wait_until, tmp_path):
+    from File_open.Drop_receiver import DropReceiverWidget
+    (tmp_path / "d" / "sub").mkdir(parents=True)
+    for name in ("a", "sub/b", "sub/c"):
+        (tmp_path / "d" / name).write_bytes(b"x" * 10)
+    receiver = DropReceiverWidget()
+    files, progress, finished = [], [], []
+    receiver.files_expanded.connect(files.extend)
+    receiver.expansion_progress.connect(lambda n, size: progress.append((n, size)))
+    receiver.expansion_finished.connect(finished.append)
+    receiver.set_expand_dirs(True)
+    receiver.add_items([], [str(tmp_path / "d")])
+    wait_until(lambda: finished)
+    assert finished == [False]
+    assert sorted(files) == sorted(str(tmp_path / "d" / n) for n in ("a", "sub/b", "sub/c"))
+    assert progress[-1] == (3, 30)
+    receiver.deleteLater()
+
+
+def test_progress_carries_byte_counts_above_2_gib(qapp):
+    from File_open.File_open import FileOpenWidget
+    widget = FileOpenWidget()
+    expander = widget.drop_receiver._expander
+    expander._jobs[99] = ("/home", threading.Event()) # 模拟一个正在展开的大目录
+    received = []
+    widget.expansion_progress.connect(lambda n, size: received.append((n, size)))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error") # shiboken 溢出时只给出 RuntimeWarning
+        expander._signals.progress.emit(99, 5, 3 * 2**31)
+    assert received == [(5, 3 * 2**31)]
+    widget.deleteLater()
@@ -0,0 +1,52 @@
+# test_drop_classification.py
+from File_open import Drop_classifier
+
+
+def _drop(widget, paths):
+    from PySide6.QtCore import Qt, QMimeData, QUrl, QPointF
+    from PySide6.QtGui import QDropEvent
+    mime = QMimeData() # QDropEvent 不持有 QMimeData，事件分发完之前要保留它
+    mime.setUrls([QUrl.fromLocalFile(p) for p in paths])
+    widget.dropEvent(QDropEvent(QPointF(5, 5), Qt.CopyAction, mime, Qt.LeftButton, Qt.NoModifier))
+
+
+def _fixture(tmp_path, count):
+    files = []
+    for i in range(count):
+        d = tmp_path / f"d{i // 200}"
+        d.mkdir(exist_ok=True)
+        (d / f"f{i:05d}").touch()
+        files.append(str(d / f"f{i:05d}"))
+    return files
+
+
+def test_drop_is_classified_in_batches_and_dropped_once(qapp, wait_until, tmp_path):
+    from File_open.Drop_receiver import DropReceiverWidget
+    files = _fixture(tmp_path, 3 * Drop_classifier._BATCH_SIZE)
+    dirs = sorted(str(p) for p in tmp_path.iterdir())
+    widget = DropReceiverWidget()
+    batches, dropped = [], []
+    widget._classifier.batch_ready.connect(lambda f, d, m: batches.append((len(f), len(d), m)))
+    widget.dropped.connect(lambda f, d: dropped.append((f, d)))
+    _drop(widget, [str(tmp_path / "missing")] + dirs + files[::-1])
+    assert widget.is_classifying() # 识别在后台进行，dropEvent 立即返回
+    wait_until(lambda: dropped)
+    assert len(batches) > 1
+    assert sum(f for f, _, _ in batches) == len(files) and sum(d for _, d, _ in batches) == len(dirs)
+    assert [m for _, _, m in batches if m] == [[str(tmp_path / "missing")]]
+    assert dropped == [(sorted(files), dirs)] # 全部识别完才发出一次
+    widget.deleteLater()
+
+
+def test_new_drop_discards_the_unfinished_one(qapp, wait_until, tmp_path):
+    from File_open.Drop_receiver import DropReceiverWidget
+    files = _fixture(tmp_path, 2000)
+    widget = DropReceiverWidget() # 一次性模式：新的拖放替换之前的选择
+    dropped = []
+    widget.dropped.connect(lambda f, d: dropped.append((f, d)))
+    _drop(widget, files)
+    _drop(widget, files[:3])
+    wait_until(lambda: dropped and not widget.is_classifying())
+    qapp.processEvents()
+    assert dropped == [(files[:3], [])]
+    widget.deleteLater()
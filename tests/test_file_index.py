@@ -0,0 +1,31 @@
+# test_file_index.py
+import os
+
+from File_open.File_index import FileIndex
+
+
+def test_search_reports_kinds_and_follows_updates(tmp_path):
+    (tmp_path / "report_dir").mkdir()
+    (tmp_path / "report_dir" / "Report.txt").write_text("x")
+    (tmp_path / "other").write_text("x")
+    index = FileIndex()
+    index.build([str(tmp_path)], workers=2)
+    assert sorted(index.search("report", with_kind=True)) == [
+        (str(tmp_path / "report_dir"), True), (str(tmp_path / "report_dir" / "Report.txt"), False)]
+    assert (str(tmp_path / "report_dir" / "Report.txt"), False) in index.search("rprt", fuzzy=True, with_kind=True)
+    os.mkdir(tmp_path / "report_new")
+    index.update_directory(str(tmp_path))
+    assert (str(tmp_path / "report_new"), True) in index.search("report", with_kind=True)
+    index.remove_directory(str(tmp_path / "report_dir"))
+    assert str(tmp_path / "report_dir" / "Report.txt") not in index.search("report")
+    assert len(index) == 3
+
+
+def test_directory_symlinks_count_as_directories_but_are_not_followed(tmp_path):
+    (tmp_path / "real").mkdir()
+    (tmp_path / "real" / "inside").write_text("x")
+    os.symlink(tmp_path / "real", tmp_path / "link")
+    index = FileIndex()
+    index.build([str(tmp_path)], workers=2)
+    assert index.search("link", with_kind=True) == [(str(tmp_path / "link"), True)]
+    assert index.search("inside") == [str(tmp_path / "real" / "inside")]
@@ -0,0 +1,32 @@
+# test_file_tree_filter.py
+from File_open.Path_filter import PathFilter
+
+
+def _visible_names(picker, directory):
+    proxy = picker.proxy
+    parent = proxy.mapFromSource(picker.model.index(directory))
+    return sorted(proxy.index(r, 0, parent).data() for r in range(proxy.rowCount(parent)))
+
+
+def test_pickers_sharing_a_model_keep_their_own_globs(qapp, wait_until, tmp_path):
+    from PySide6.QtWidgets import QFileSystemModel
+    from File_open.File_dialog import FilePickerWidget
+    for name in ("a.csv", "b.txt", "c.CSV"):
+        (tmp_path / name).write_text("x")
+    (tmp_path / "sub.txt").mkdir()
+    (tmp_path / "data").mkdir()
+    model = QFileSystemModel()
+    model.setRootPath(str(tmp_path))
+    csv_picker, txt_picker = FilePickerWidget(model=model), FilePickerWidget(model=model)
+    csv_picker.set_path_filter(PathFilter(patterns=["*.csv"]))
+    txt_picker.set_path_filter(PathFilter(extensions=["txt"]))
+    wait_until(lambda: model.rowCount(model.index(str(tmp_path))) == 5)
+    # 目录不受通配符影响；两个对话框的过滤互不覆盖，共享模型本身不设置 nameFilters
+    assert _visible_names(csv_picker, str(tmp_path)) == ["a.csv", "c.CSV", "data", "sub.txt"]
+    assert _visible_names(txt_picker, str(tmp_path)) == ["b.txt", "data", "sub.txt"]
+    assert model.nameFilters() == []
+    txt_picker.set_path_filter(None)
+    assert len(_visible_names(txt_picker, str(tmp_path))) == 5
+    assert _visible_names(csv_picker, str(tmp_path)) == ["a.csv", "c.CSV", "data", "sub.txt"]
+    csv_picker.deleteLater()
+    txt_picker.deleteLater()
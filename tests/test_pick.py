@@ -0,0 +1,74 @@
+# test_pick.py
+import warnings
+
+
+def _open(qapp, tmp_path):
+    from File_open.File_open import FileOpenWidget
+    widget = FileOpenWidget()
+    (tmp_path / "a.txt").write_text("x")
+    widget.drop_receiver.set_items([str(tmp_path / "a.txt")], [])
+    future = widget.pick()
+    from File_open import File_dialog
+    return widget, File_dialog._pooled_dialog, future
+
+
+def test_pick_resolves_with_the_updated_selection(qapp, wait_until, tmp_path):
+    widget, dialog, future = _open(qapp, tmp_path)
+    (tmp_path / "d").mkdir()
+    dialog.picker.add_many_to_staging([str(tmp_path / "d")])
+    picked = []
+    widget.picked.connect(lambda f, d: picked.append((f, d)))
+    dialog.btn_box.accepted.emit()
+    wait_until(future.done)
+    assert future.result() == ([str(tmp_path / "a.txt")], [str(tmp_path / "d")])
+    assert picked == [future.result()]
+    assert not dialog.isVisible()
+    widget.deleteLater()
+
+
+def test_rejecting_or_cancelling_cancels_the_other_side(qapp, wait_until, tmp_path):
+    widget, dialog, future = _open(qapp, tmp_path)
+    dialog.reject()
+    assert future.cancelled()
+    future = widget.pick()
+    assert dialog.isVisible()
+    future.cancel() # 取消 Future 关闭对话框，选择不变
+    assert not dialog.isVisible()
+    assert widget.get_current_selection() == ([str(tmp_path / "a.txt")], [])
+    widget.deleteLater()
+
+
+def test_deleting_the_parent_mid_pick_cancels_quietly(qapp, tmp_path, capfd):
+    import shiboken6
+    widget, dialog, future = _open(qapp, tmp_path)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error") # 不应再有 libpyside 的 RuntimeWarning
+        shiboken6.delete(widget) # 对话框借用它作父级，随之一起被删除
+    assert future.cancelled()
+    assert "No such signal" not in capfd.readouterr().err
+
+
+def test_pooled_dialog_is_reused_and_outlives_a_finished_parent(qapp, tmp_path):
+    import shiboken6
+    from File_open import File_dialog
+    widget, dialog, future = _open(qapp, tmp_path)
+    future.cancel() # 对话框结束后不再借用父级
+    shiboken6.delete(widget)
+    assert File_dialog._pooled_dialog is dialog and shiboken6.isValid(dialog)
+    widget, reused, future = _open(qapp, tmp_path)
+    assert reused is dialog
+    future.cancel()
+    widget.deleteLater()
+
+
+def test_pooled_dialog_deleted_with_its_parent_is_replaced(qapp, tmp_path):
+    import shiboken6
+    from File_open import File_dialog
+    widget, dialog, future = _open(qapp, tmp_path)
+    shiboken6.delete(widget) # 打开期间父级被删除，对话框随之销毁
+    assert File_dialog._pooled_dialog is None
+    widget, fresh, future = _open(qapp, tmp_path)
+    assert shiboken6.isValid(fresh) and fresh.isVisible()
+    future.cancel()
+    assert not fresh.isVisible()
+    widget.deleteLater()
@@ -0,0 +1,61 @@
+# test_selection_core.py
+import os
+import threading
+import time
+
+from File_open import Selection_core
+from File_open.Selection_core import plan_groups, revalidate_paths
+
+
+def test_plan_groups_covers_every_path(tmp_path):
+    paths = [str(tmp_path / f"f{i}") for i in range(300)] + ["/elsewhere/a", "/elsewhere/b"]
+    planned = [p for task in plan_groups(paths) for _, group in task for p in group]
+    assert sorted(planned) == sorted(paths)
+
+
+def test_revalidate_classifies_in_input_order(tmp_path):
+    (tmp_path / "f").write_text("x")
+    (tmp_path / "d").mkdir()
+    paths = [str(tmp_path / "d"), str(tmp_path / "gone"), str(tmp_path / "f")]
+    files, dirs, missing, unverified = revalidate_paths(paths)
+    assert (files, dirs, missing, unverified) == ([paths[2]], [paths[0]], [paths[1]], [])
+
+
+def test_revalidate_abandons_only_the_stalled_path(tmp_path, monkeypatch):
+    (tmp_path / "f").write_text("x")
+    stalled, release = str(tmp_path / "stall"), threading.Event()
+    real_stat = Selection_core._stat
+
+    def slow_stat(path):
+        if path == stalled:
+            release.wait(5) # 模拟卡住的网络挂载
+        return real_stat(path)
+
+    monkeypatch.setattr(Selection_core, "_stat", slow_stat)
+    paths = [stalled, str(tmp_path / "f"), str(tmp_path), str(tmp_path / "gone")]
+    started = time.monotonic()
+    try:
+        files, dirs, missing, unverified = revalidate_paths(paths, timeout=0.2, max_workers=1)
+    finally:
+        release.set()
+    assert time.monotonic() - started < 2
+    assert (files, dirs, missing, unverified) == ([paths[1]], [paths[2]], [paths[3]], [stalled])
+
+
+def test_revalidate_total_timeout_bounds_the_wait(tmp_path, monkeypatch):
+    release = threading.Event()
+    real_stat = Selection_core._stat
+
+    def slow_stat(path):
+        release.wait(0.15)
+        return real_stat(path)
+
+    monkeypatch.setattr(Selection_core, "_stat", slow_stat)
+    paths = [os.path.join(str(tmp_path), f"p{i}") for i in range(50)]
+    started = time.monotonic()
+    try:
+        files, dirs, missing, unverified = revalidate_paths(paths, timeout=1.0, max_workers=2, total_timeout=0.5)
+    finally:
+        release.set()
+    assert time.monotonic() - started < 1.5
+    assert unverified and len(missing) + len(unverified) == len(paths)
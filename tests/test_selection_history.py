@@ -0,0 +1,42 @@
+# test_selection_history.py
+from File_open.Selection_history import SelectionHistory
+from File_open.Selection_store import SelectionStore
+
+
+def _step(store, history, files):
+    store.add(files, [])
+    history.record(store.take_changes())
+
+
+def test_undo_redo_round_trip():
+    store, history = SelectionStore(track_changes=True), SelectionHistory()
+    _step(store, history, ["/a"])
+    store.clear()
+    history.record(store.take_changes())
+    assert list(store.files) == []
+    assert history.undo(store)
+    assert list(store.files) == ["/a"]
+    assert history.redo(store)
+    assert list(store.files) == []
+    assert not history.redo(store)
+
+
+def test_max_depth_drops_oldest_step():
+    store, history = SelectionStore(track_changes=True), SelectionHistory(max_depth=2)
+    for name in ("/1", "/2", "/3"):
+        _step(store, history, [name])
+    assert history.undo(store) and history.undo(store)
+    assert not history.undo(store)
+    assert list(store.files) == ["/1"]
+
+
+def test_reducing_depth_keeps_the_next_redo_step():
+    store, history = SelectionStore(track_changes=True), SelectionHistory()
+    for name in ("/1", "/2", "/3"):
+        _step(store, history, [name])
+    for _ in range(3):
+        history.undo(store)
+    history.set_max_depth(1)
+    assert history.redo(store) # 应重做最近撤销的 "/1"，而不是最早撤销的 "/3"
+    assert list(store.files) == ["/1"]
+    assert not history.redo(store)
@@ -0,0 +1,29 @@
+# test_selection_session.py
+import pytest
+
+from File_open.Selection_session import RecentLocations, load_selection, save_selection
+
+
+def test_round_trip_sorts_and_deduplicates(tmp_path):
+    path = str(tmp_path / "sel.bin")
+    save_selection(path, ["/b", "/a", "/b", "/\udcff-undecodable"], [])
+    assert load_selection(path) == (["/a", "/b", "/\udcff-undecodable"], [])
+
+
+def test_rejects_foreign_and_unsorted_files(tmp_path):
+    path = str(tmp_path / "sel.bin")
+    (tmp_path / "sel.bin").write_bytes(b"not a selection")
+    with pytest.raises(ValueError):
+        load_selection(path)
+    save_selection(path, ["/b", "/a"], [], presorted=True) # 声称已排序但实际没有
+    with pytest.raises(ValueError):
+        load_selection(path)
+
+
+def test_recent_locations_persist_most_recent_first(tmp_path):
+    path = str(tmp_path / "recent.json")
+    recent = RecentLocations(path, max_entries=2)
+    for location in ("/1", "/2", "/1", "/3"):
+        recent.touch(location)
+    assert recent.locations() == ["/3", "/1"]
+    assert RecentLocations(path).locations() == ["/3", "/1"]
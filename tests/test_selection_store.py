@@ -0,0 +1,61 @@
+# test_selection_store.py
+import random
+
+from File_open.Selection_store import CompactPathSet, SelectionStore, SortedPathSet
+
+
+def _random_paths(rng, n):
+    dirs = [f"/r/d{i}" for i in range(8)] + [f"/r/d{i}/s{j}" for i in range(4) for j in range(3)]
+    return [f"{rng.choice(dirs)}/f{rng.randrange(400)}" for _ in range(n)]
+
+
+def test_compact_set_matches_sorted_set():
+    rng = random.Random(7)
+    plain, compact = SortedPathSet(), CompactPathSet()
+    for _ in range(60):
+        batch = _random_paths(rng, rng.randrange(1, 200))
+        if rng.random() < 0.6:
+            assert plain.update(batch) == compact.update(batch)
+        else:
+            assert plain.difference_update(batch) == compact.difference_update(batch)
+        assert compact.as_list() == plain.as_list()
+    for path in plain.as_list()[::17]:
+        assert path in compact
+        assert compact.index(path) == plain.index(path)
+
+
+def test_replace_sorted_reports_net_change():
+    for path_set in (SortedPathSet, CompactPathSet):
+        paths = path_set(["/a/1", "/a/2", "/b/1"])
+        added, removed = paths.replace_sorted(["/a/2", "/b/1", "/c/1"])
+        assert (added, removed) == (["/c/1"], ["/a/1"])
+        assert paths.as_list() == ["/a/2", "/b/1", "/c/1"]
+
+
+def test_store_journal_cancels_out_and_snapshot_is_shared():
+    store = SelectionStore(track_changes=True)
+    store.add(["/x/a", "/x/b"], ["/x"])
+    store.remove(["/x/a"], [])
+    change = store.take_changes()
+    assert (change.added_files, change.added_dirs, change.removed_files) == (["/x/b"], ["/x"], [])
+    assert store.snapshot() is store.snapshot()
+    assert store.take_changes().is_empty()
+
+
+def test_store_key_func_deduplicates_equivalent_paths():
+    store = SelectionStore()
+    store.add(["/A/x", "/a/x", "/a/y"], [])
+    store.set_key_func(str.lower)
+    assert list(store.files) == ["/A/x", "/a/y"]
+    store.add(["/A/Y"], [])
+    assert len(store.files) == 2
+    store.remove(["/a/X"], [])
+    assert list(store.files) == ["/a/y"]
+
+
+def test_store_replace_sorted_bypasses_journal():
+    store = SelectionStore(track_changes=True, compact=True)
+    change = store.replace_sorted(["/p/1", "/p/2"], ["/p"])
+    assert (change.added_files, change.added_dirs) == (["/p/1", "/p/2"], ["/p"])
+    assert store.take_changes().is_empty()
+    assert store.snapshot().files == ("/p/1", "/p/2")
@@ -0,0 +1,40 @@
+# test_selection_watcher.py
+import os
+import time
+
+
+def test_watch_mode_follows_renames_and_deletions(qapp, wait_until, tmp_path):
+    from File_open.Drop_receiver import DropReceiverWidget
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_text(name)
+    (tmp_path / "sub").mkdir()
+    a, b, c, sub = (str(tmp_path / n) for n in ("a.txt", "b.txt", "c.txt", "sub"))
+    widget = DropReceiverWidget()
+    widget.set_items([a, b, c], [sub])
+    widget.set_watch_selection(True)
+    watcher = widget._watcher
+    # 等后台读到各条目的 inode，之后的改名才能按 inode 认出来
+    wait_until(lambda: all(entry[2] is not None for entry in watcher._children[str(tmp_path)].values()))
+    assert watcher.watched_directories() == [str(tmp_path)] # 同一父目录只占一个监视名额
+
+    added, removed, changes = [], [], []
+    widget.items_added.connect(lambda f, d: added.append((f, d)))
+    widget.items_removed.connect(lambda f, d: removed.append((f, d)))
+    widget.disk_changes.connect(lambda gone, renamed: changes.append((gone, renamed)))
+    os.rename(a, a + ".bak")
+    os.rename(sub, sub + "2")
+    os.remove(b)
+    wait_until(lambda: widget.get_dropped_items() == ([a + ".bak", c], [sub + "2"]))
+    assert sorted(p for gone, _ in changes for p in gone) == [b]
+    assert sorted(pair for _, renamed in changes for pair in renamed) == [(a, a + ".bak"), (sub, sub + "2")]
+    # 增量信号与完整列表一致
+    assert sorted(p for f, d in removed for p in f + d) == [a, b, sub]
+    assert sorted(p for f, d in added for p in f + d) == [a + ".bak", sub + "2"]
+
+    widget.set_watch_selection(False)
+    os.remove(c)
+    deadline = time.monotonic() + 0.6 # 超过防抖间隔
+    while time.monotonic() < deadline:
+        qapp.processEvents()
+    assert widget.get_dropped_items() == ([a + ".bak", c], [sub + "2"]) # 关闭后不再跟随
+    widget.deleteLater()
@@ -0,0 +1,32 @@
+# test_session_restore.py
+import pytest
+
+
+@pytest.mark.parametrize("options", [{}, {"use_list_view": True}, {"compact_paths": True}])
+def test_restore_emits_one_reset_and_one_picked(qapp, tmp_path, options):
+    from File_open.File_open import FileOpenWidget
+    from File_open.Drop_receiver import DropReceiverWidget
+    path = str(tmp_path / "session.bin")
+    source = FileOpenWidget(**options)
+    files = [f"/data/d{i // 100}/f{i:05d}" for i in range(3000)]
+    source.drop_receiver.set_items(files, ["/data"])
+    source.save_session(path)
+
+    widget = FileOpenWidget(**options)
+    widget.drop_receiver.set_items(["/old"], [])
+    resets, deltas, picked = [], [], []
+    widget.selection_reset.connect(resets.append)
+    widget.items_added.connect(lambda f, d: deltas.append("added"))
+    widget.items_removed.connect(lambda f, d: deltas.append("removed"))
+    widget.picked.connect(lambda f, d: picked.append((f, d)))
+    widget.restore_session(path, revalidate=False)
+    assert resets == [widget.selection_generation()]
+    assert deltas == [] # 整体替换不逐项发出增量
+    assert picked == [(sorted(files), ["/data"])]
+    assert widget.get_snapshot().files == tuple(sorted(files))
+    if not options.get("use_list_view"): # QLabel 模式只列出前 LABEL_MAX_ITEMS 项
+        text = widget.drop_receiver._display_label.text()
+        assert text.count("- f") == DropReceiverWidget.LABEL_MAX_ITEMS and "另外 2000 项" in text
+    assert widget.undo() and widget.get_current_selection() == (["/old"], [])
+    source.deleteLater()
+    widget.deleteLater()
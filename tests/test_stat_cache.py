@@ -0,0 +1,29 @@
+# test_stat_cache.py
+from File_open.Stat_cache import StatCache, dir_size
+
+
+def test_dir_size_sees_changes_deep_in_the_tree(tmp_path):
+    deep = tmp_path / "a" / "b"
+    deep.mkdir(parents=True)
+    (tmp_path / "top").write_bytes(b"x" * 100)
+    cache = StatCache()
+    assert dir_size(str(tmp_path), cache) == 100
+    (deep / "new").write_bytes(b"y" * 1000) # 只改变了 a/b 的 mtime，根目录和 a 的缓存仍然命中
+    assert dir_size(str(tmp_path), cache) == 1100
+    assert dir_size(str(tmp_path / "a"), cache) == 1000
+
+
+def test_dir_size_gives_up_past_max_entries(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for i in range(10):
+        (tmp_path / f"f{i}").write_bytes(b"z")
+    assert dir_size(str(tmp_path), StatCache(), max_entries=3) is None
+    assert dir_size(str(tmp_path), StatCache(), max_entries=100) == 10
+    assert dir_size(str(tmp_path / "missing"), StatCache()) is None
+
+
+def test_stat_cache_is_bounded():
+    cache = StatCache(max_entries=2)
+    for i in range(3):
+        cache.put(i, i)
+    assert len(cache) == 2 and cache.get(0) is None and cache.get(2) == 2
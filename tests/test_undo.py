@@ -0,0 +1,47 @@
+# test_undo.py
+
+
+def test_undo_redo_reemit_picked_and_deltas(qapp):
+    from File_open.File_open import FileOpenWidget
+    widget = FileOpenWidget()
+    history, picked, deltas = [], [], []
+    widget.history_changed.connect(lambda u, r: history.append((u, r)))
+    widget.picked.connect(lambda f, d: picked.append((f, d)))
+    widget.items_added.connect(lambda f, d: deltas.append(("+", f, d)))
+    widget.items_removed.connect(lambda f, d: deltas.append(("-", f, d)))
+    widget.drop_receiver.set_items(["/x/a", "/x/b"], ["/x"])
+    widget.clear_all_items() # 误点清除也是一步
+    assert widget.get_current_selection() == ([], [])
+    picked.clear()
+    deltas.clear()
+    assert widget.undo()
+    assert widget.get_current_selection() == (["/x/a", "/x/b"], ["/x"])
+    assert picked == [(["/x/a", "/x/b"], ["/x"])]
+    assert deltas == [("+", ["/x/a", "/x/b"], ["/x"])]
+    assert history[-1] == (True, True) and widget.can_redo()
+    assert widget.redo() and widget.get_current_selection() == ([], [])
+    assert history[-1] == (True, False)
+    assert widget.undo() and widget.undo() and not widget.undo() # 最早一步之前就是空选择
+    assert not widget.can_undo() and widget.can_redo()
+    widget.deleteLater()
+
+
+def test_undo_shortcut_and_depth(qapp):
+    from PySide6.QtGui import QKeySequence
+    from PySide6.QtTest import QTest
+    from File_open.File_open import FileOpenWidget
+    widget = FileOpenWidget()
+    widget.show()
+    widget.activateWindow()
+    assert QTest.qWaitForWindowActive(widget) # 快捷键只在活动窗口中生效
+    widget.drop_receiver.setFocus()
+    widget.drop_receiver.set_items(["/x/a"], [])
+    widget.drop_receiver.add_items(["/x/b"], [])
+    QTest.keySequence(widget.drop_receiver, QKeySequence.Undo)
+    assert widget.get_current_selection() == (["/x/a"], [])
+    QTest.keySequence(widget.drop_receiver, QKeySequence.Redo)
+    assert widget.get_current_selection() == (["/x/a", "/x/b"], [])
+    widget.set_undo_depth(0) # 不再记录，已有历史同时丢弃
+    widget.drop_receiver.set_items([], [])
+    assert not widget.can_undo() and not widget.undo()
+    widget.deleteLater()